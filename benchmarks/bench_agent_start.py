@@ -0,0 +1,48 @@
+"""
+Measures the cold start time of the blue agent, from starting the interpreter until run() returns, for the agent source
+and for the precompiled agent bundle. The agent is executed with a missing blue file, so run() returns immediately.
+
+Usage: python -m benchmarks.bench_agent_start [NUMBER_OF_RUNS]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from cc_core.commons.agent_bundle import build_agent_bundle
+from cc_core.commons.docker_utils import get_blue_agent_host_path
+
+
+def measure(agent_path, number_of_runs):
+    durations = []
+    for _ in range(number_of_runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, agent_path, 'missing_blue_file.json'], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - start)
+    return sum(durations) / number_of_runs, min(durations)
+
+
+def main():
+    number_of_runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    work_dir = tempfile.mkdtemp()
+    try:
+        source_path = os.path.join(work_dir, 'blue_agent_source.py')
+        shutil.copy(get_blue_agent_host_path(), source_path)
+
+        bundle_path = os.path.join(work_dir, 'blue_agent_bundle.py')
+        with open(bundle_path, 'wb') as f:
+            f.write(build_agent_bundle(get_blue_agent_host_path()))
+
+        print('runs: {}'.format(number_of_runs))
+        for name, path in [('source', source_path), ('bundle', bundle_path)]:
+            mean, best = measure(path, number_of_runs)
+            print('{:<7} mean: {:.1f} ms  min: {:.1f} ms'.format(name, mean * 1000, best * 1000))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
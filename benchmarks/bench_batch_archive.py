@@ -0,0 +1,33 @@
+"""
+Measures the throughput of create_batch_archive() for many batches.
+
+Usage: python -m benchmarks.bench_batch_archive [NUMBER_OF_BATCHES]
+"""
+import sys
+import time
+
+from cc_core.commons.docker_utils import create_batch_archive
+from cc_core.commons.red_to_blue import convert_red_to_blue
+
+from benchmarks.bench_batch_table import CLI, create_batch
+
+
+def main():
+    number_of_batches = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    red_data = {'redVersion': '9', 'cli': CLI, 'batches': [create_batch(i) for i in range(number_of_batches)]}
+    blue_batches = convert_red_to_blue(red_data)
+
+    start = time.perf_counter()
+    archive_bytes = 0
+    for blue_batch in blue_batches:
+        archive_bytes += len(create_batch_archive(blue_batch).getvalue())
+    duration = time.perf_counter() - start
+
+    print('batches:           {}'.format(number_of_batches))
+    print('archive time:      {:.3f} s'.format(duration))
+    print('archives / second: {:.0f}'.format(number_of_batches / duration))
+    print('MB / second:       {:.1f}'.format(archive_bytes / duration / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
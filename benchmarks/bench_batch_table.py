@@ -0,0 +1,94 @@
+"""
+Compares memory use and red to blue conversion time of the dict representation of batches with the columnar
+BatchTable representation.
+
+Usage: python -m benchmarks.bench_batch_table [NUMBER_OF_BATCHES]
+"""
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+from cc_core.commons.batch_table import BatchTable
+from cc_core.commons.red_to_blue import convert_red_to_blue
+
+CLI = {
+    'cwlVersion': 'v1.0',
+    'class': 'CommandLineTool',
+    'baseCommand': 'process.py',
+    'inputs': {
+        'a_file': {'type': 'File', 'inputBinding': {'position': 0}},
+        'threshold': {'type': 'float', 'inputBinding': {'prefix': '--threshold'}},
+        'mode': {'type': 'string', 'inputBinding': {'prefix': '--mode'}}
+    },
+    'outputs': {
+        'out_file': {'type': 'File', 'outputBinding': {'glob': 'out.txt'}}
+    }
+}
+
+
+def create_batch(index):
+    return {
+        'inputs': {
+            'a_file': {
+                'class': 'File',
+                'connector': {
+                    'command': 'red-connector-ssh',
+                    'access': {
+                        'host': 'storage.example.com',
+                        'auth': {'username': 'user', 'password': 'password'},
+                        'filePath': '/data/input_{}.csv'.format(index)
+                    }
+                }
+            },
+            'threshold': (index % 10) / 10,
+            'mode': 'fast'
+        },
+        'outputs': {
+            'out_file': {
+                'class': 'File',
+                'connector': {
+                    'command': 'red-connector-ssh',
+                    'access': {
+                        'host': 'storage.example.com',
+                        'auth': {'username': 'user', 'password': 'password'},
+                        'filePath': '/data/output_{}.txt'.format(index)
+                    }
+                }
+            }
+        }
+    }
+
+
+def measure_memory(create):
+    tracemalloc.start()
+    data = create()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, current
+
+
+def measure_conversion(batches):
+    red_data = {'redVersion': '8', 'cli': deepcopy(CLI), 'batches': batches}
+    start = time.perf_counter()
+    convert_red_to_blue(red_data)
+    return time.perf_counter() - start
+
+
+def main():
+    number_of_batches = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    batches, dict_memory = measure_memory(lambda: [create_batch(i) for i in range(number_of_batches)])
+    batch_table, table_memory = measure_memory(lambda: BatchTable.from_batches(batches))
+
+    dict_time = measure_conversion(batches)
+    del batches
+    table_time = measure_conversion(batch_table)
+
+    print('batches: {}'.format(number_of_batches))
+    print('dict representation:  {:8.1f} MiB  conversion {:6.2f} s'.format(dict_memory / 2 ** 20, dict_time))
+    print('BatchTable:           {:8.1f} MiB  conversion {:6.2f} s'.format(table_memory / 2 ** 20, table_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Measures load_and_read() of a json and a yaml red file without cache and with a cache hit. A cache hit should be
+cheaper than reading the file again for both formats.
+
+Usage: python -m benchmarks.bench_document_cache [NUMBER_OF_BATCHES]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from cc_core.commons.files import load_and_read, clear_document_cache, yaml
+
+
+def create_red_data(number_of_batches):
+    return {
+        'redVersion': '9',
+        'cli': {'inputs': {'a_file': {'type': 'File'}}, 'outputs': {}},
+        'batches': [{
+            'inputs': {
+                'a_file': {
+                    'class': 'File',
+                    'connector': {
+                        'command': 'red-connector-http',
+                        'access': {'url': 'https://example.com/{}.txt'.format(i), 'method': 'GET'}
+                    }
+                }
+            },
+            'outputs': {}
+        } for i in range(number_of_batches)],
+        'container': {'engine': 'docker', 'settings': {'image': {'url': 'example/image'}}}
+    }
+
+
+def measure(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    number_of_batches = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    red_data = create_red_data(number_of_batches)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'red.json')
+        with open(json_path, 'w') as f:
+            json.dump(red_data, f)
+        yaml_path = os.path.join(tmp_dir, 'red.yml')
+        with open(yaml_path, 'w') as f:
+            yaml.dump(red_data, f)
+
+        print('format  without cache  cache hit')
+        for name, path in [('json', json_path), ('yaml', yaml_path)]:
+            clear_document_cache()
+            uncached_time = measure(load_and_read, path, 'RED_FILE')
+            load_and_read(path, 'RED_FILE', use_cache=True)
+            hit_time = measure(load_and_read, path, 'RED_FILE', use_cache=True)
+            print('{:>6}  {:>11.4f} s  {:>7.4f} s'.format(name, uncached_time, hit_time))
+
+
+if __name__ == '__main__':
+    main()
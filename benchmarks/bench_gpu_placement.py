@@ -0,0 +1,79 @@
+"""
+Simulates the placement of synthetic batch queues on a cluster of gpu nodes and compares the placement strategies with
+a first-fit baseline, that takes the first node with sufficient devices.
+
+Usage: python -m benchmarks.bench_gpu_placement [NUMBER_OF_NODES] [NUMBER_OF_BATCHES]
+"""
+import random
+import sys
+import time
+
+from cc_core.commons.gpu_info import GPUDevice, NVIDIA_GPU_VENDOR, get_gpu_requirements
+from cc_core.commons.gpu_placement import place_batches, PLACEMENT_STRATEGIES
+
+NODE_TYPES = [
+    [8000] * 4,
+    [16000] * 4,
+    [32000] * 8,
+    [8000, 8000, 48000, 48000]
+]
+
+
+def create_nodes(rng, number_of_nodes):
+    return {
+        'node-{}'.format(i): [GPUDevice(j, vram, NVIDIA_GPU_VENDOR) for j, vram in enumerate(rng.choice(NODE_TYPES))]
+        for i in range(number_of_nodes)
+    }
+
+
+def create_batch_requirements(rng):
+    if rng.random() < 0.5:
+        gpus = {'vendor': NVIDIA_GPU_VENDOR, 'count': rng.randint(1, 4)}
+    else:
+        gpus = {
+            'vendor': NVIDIA_GPU_VENDOR,
+            'devices': [{'vramMin': rng.choice([2000, 6000, 12000, 24000, 40000])} for _ in range(rng.randint(1, 3))]
+        }
+    return get_gpu_requirements(gpus)
+
+
+def first_fit(candidates):
+    return candidates[0]
+
+
+def main():
+    number_of_nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    number_of_batches = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    rng = random.Random(0)
+    nodes = create_nodes(rng, number_of_nodes)
+    batches = [create_batch_requirements(rng) for _ in range(number_of_batches)]
+    total_devices = sum(len(devices) for devices in nodes.values())
+
+    print('nodes: {}  devices: {}  batches: {}'.format(number_of_nodes, total_devices, number_of_batches))
+    print('{:<30} {:>7} {:>13} {:>11} {:>10} {:>9}'.format(
+        'strategy', 'placed', 'used devices', 'used nodes', 'waste GB', 'time s'
+    ))
+
+    strategies = [('first-fit', first_fit)] + list(PLACEMENT_STRATEGIES.items())
+    for smallest_first in [False, True]:
+        for name, strategy in strategies:
+            start = time.perf_counter()
+            placements, _ = place_batches(nodes, batches, strategy=strategy, smallest_first=smallest_first)
+            duration = time.perf_counter() - start
+
+            used_devices = sum(len(p.devices) for p in placements)
+            used_nodes = len({p.node for p in placements})
+            waste = 0
+            for placement in placements:
+                requirements = batches[placement.batch_index]
+                waste += sum(d.vram - (r.min_vram or 0) for d, r in zip(placement.devices, requirements))
+
+            label = '{}{}'.format(name, ' (smallest first)' if smallest_first else '')
+            print('{:<30} {:>7} {:>13} {:>11} {:>10.0f} {:>9.3f}'.format(
+                label, len(placements), used_devices, used_nodes, waste / 1000, duration
+            ))
+
+
+if __name__ == '__main__':
+    main()
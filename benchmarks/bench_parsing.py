@@ -0,0 +1,39 @@
+"""
+Measures split_into_parts() and resolve_input_references() for strings with a growing number of input references. The
+runtime per reference should stay roughly constant, if parsing is linear in the length of the string.
+
+Usage: python -m benchmarks.bench_parsing [MAX_NUMBER_OF_REFERENCES]
+"""
+import sys
+import time
+
+from cc_core.commons.input_references import resolve_input_references
+from cc_core.commons.parsing import split_into_parts
+
+INPUTS = {'a_file': {'class': 'File', 'basename': 'a.txt', 'nameroot': 'a'}}
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    max_references = int(sys.argv[1]) if len(sys.argv) > 1 else 40000
+
+    number_of_references = 2500
+    print('references  split_into_parts  per reference  resolve_input_references  per reference')
+    while number_of_references <= max_references:
+        s = 'prefix-$(inputs.a_file.nameroot)-' * number_of_references
+        split_time = measure(split_into_parts, s, '$(', ')')
+        resolve_time = measure(resolve_input_references, s, INPUTS)
+        print('{:>10}  {:>14.4f} s  {:>10.2f} us  {:>22.4f} s  {:>10.2f} us'.format(
+            number_of_references, split_time, split_time / number_of_references * 1e6,
+            resolve_time, resolve_time / number_of_references * 1e6
+        ))
+        number_of_references *= 2
+
+
+if __name__ == '__main__':
+    main()
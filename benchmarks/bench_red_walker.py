@@ -0,0 +1,53 @@
+"""
+Compares the separate recursive traversals of a red document (check_keys_are_strings, get_secret_values,
+get_template_keys and normalize_keys) with the single traversal of walk_red_data().
+
+Usage: python -m benchmarks.bench_red_walker [NUMBER_OF_BATCHES]
+"""
+import sys
+import time
+from copy import deepcopy
+
+from cc_core.commons.red import check_keys_are_strings
+from cc_core.commons.templates import get_secret_values, get_template_keys, normalize_keys, walk_red_data
+
+from benchmarks.bench_batch_table import CLI, create_batch
+
+
+def separate_traversals(red_data):
+    check_keys_are_strings(red_data)
+    get_secret_values(red_data)
+    get_template_keys(red_data, set())
+    normalize_keys(red_data)
+
+
+def single_traversal(red_data):
+    walk = walk_red_data(red_data)
+    walk.check_template_keys()
+    walk.normalize_keys()
+
+
+def measure(function, red_data):
+    red_data = deepcopy(red_data)
+    start = time.perf_counter()
+    function(red_data)
+    return time.perf_counter() - start
+
+
+def main():
+    number_of_batches = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    batches = [create_batch(i) for i in range(number_of_batches)]
+    for batch in batches:
+        batch['inputs']['a_file']['connector']['access']['auth'] = {'username': '{{user}}', '_password': '{{pw}}'}
+    red_data = {'redVersion': '9', 'cli': CLI, 'batches': batches}
+
+    separate_time = measure(separate_traversals, red_data)
+    single_time = measure(single_traversal, red_data)
+
+    print('batches: {}'.format(number_of_batches))
+    print('separate traversals: {:.3f} s'.format(separate_time))
+    print('walk_red_data:       {:.3f} s'.format(single_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the per call cost of jsonschema.validate(), which checks the schema and builds a new validator on every call,
+with the cached jsonschema validators and the compiled validation functions of cc_core.commons.schema_map.
+
+Usage: python -m benchmarks.bench_schema_validation [NUMBER_OF_CALLS]
+"""
+import sys
+import time
+
+import jsonschema
+from jsonschema.exceptions import best_match
+
+from cc_core.commons import schema_map
+
+from benchmarks.bench_batch_table import CLI, create_batch
+
+RED_DATA = {
+    'redVersion': '9',
+    'cli': CLI,
+    'batches': [create_batch(i) for i in range(3)],
+    'container': {
+        'engine': 'docker',
+        'settings': {'image': {'url': 'example/image'}, 'ram': 1024}
+    }
+}
+
+
+def measure(validate, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        validate()
+    return (time.perf_counter() - start) / calls
+
+
+def cached_validate(instance, schema_name):
+    error = best_match(schema_map.get_validator(schema_name).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    settings = RED_DATA['container']['settings']
+    docker_schema = schema_map.schemas['red-engine-container-docker']
+
+    cases = [
+        ('red', lambda: jsonschema.validate(RED_DATA, schema_map.schemas['red']),
+         lambda: cached_validate(RED_DATA, 'red'),
+         lambda: schema_map.validate(RED_DATA, 'red')),
+        ('docker engine', lambda: jsonschema.validate(settings, docker_schema),
+         lambda: cached_validate(settings, 'red-engine-container-docker'),
+         lambda: schema_map.validate(settings, 'red-engine-container-docker'))
+    ]
+
+    print('calls: {}'.format(calls))
+    for name, uncached, cached, compiled in cases:
+        uncached_time = measure(uncached, calls)
+        cached_time = measure(cached, calls)
+        compiled_time = measure(compiled, calls)
+        print('{}: jsonschema.validate {:.1f} us, cached validator {:.1f} us, compiled {:.1f} us'.format(
+            name, uncached_time * 1e6, cached_time * 1e6, compiled_time * 1e6
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,3 @@
-import glob
-import hashlib
 import os
 import sys
 
@@ -8,15 +6,15 @@ import shutil
 import stat
 import subprocess
 import json
-import tempfile
-import urllib.request
 
 from argparse import ArgumentParser
 from traceback import format_exc
 from typing import List, Dict
-from urllib.error import URLError
 from urllib.parse import urlparse
 
+# rarely used modules (glob, hashlib, tempfile, urllib.request) are imported where they are needed, because importing
+# them takes a considerable part of the start up time of the agent
+
 DESCRIPTION = 'Run an experiment as described in a BLUEFILE.'
 JSON_INDENT = 2
 
@@ -50,19 +48,31 @@ def main():
     if _is_file_scheme_remote(scheme):
         _post_result(args.blue_file, result)
 
-    if result['state'] == 'succeeded':
+    if _is_successful(result):
         return 0
 
     return 1
 
 
+def _is_successful(result):
+    """
+    Returns whether the given result or all results in the given list of results succeeded.
+
+    :param result: A result dictionary or a list of result dictionaries
+    :return: True, if all executions succeeded, otherwise False
+    """
+    if isinstance(result, list):
+        return all(batch_result['state'] == 'succeeded' for batch_result in result)
+    return result['state'] == 'succeeded'
+
+
 class OutputMode(enum.Enum):
     Connectors = 0
     Directory = 1
 
 
-def run(args):
-    result = {
+def _create_result():
+    return {
         'command': None,
         'process': None,
         'debugInfo': None,
@@ -71,15 +81,87 @@ def run(args):
         'state': 'succeeded'
     }
 
-    connector_manager = ConnectorManager()
+
+def run(args):
+    """
+    Executes the blue batch given in the blue file. If the blue file contains a list of blue batches, these batches are
+    executed sequentially and a list of results is returned.
+
+    :param args: The parsed command line arguments
+    :return: A result dictionary or a list of result dictionaries, if the blue file contains a list of blue batches
+    """
+    if args.outputs:
+        output_mode = OutputMode.Connectors
+    else:
+        output_mode = OutputMode.Directory
+
     try:
-        blue_location = args.blue_file
-        if args.outputs:
-            output_mode = OutputMode.Connectors
-        else:
-            output_mode = OutputMode.Directory
+        blue_data = get_blue_data(args.blue_file)
+    except Exception as e:
+        print_exception(e)
+        result = _create_result()
+        result['debugInfo'] = exception_format()
+        result['state'] = 'failed'
+        return result
+
+    connector_cli_version_cache = {}
+
+    if isinstance(blue_data, list):
+        return run_blue_batches(blue_data, output_mode, connector_cli_version_cache)
+
+    return run_blue_batch(blue_data, output_mode, connector_cli_version_cache)
+
+
+def run_blue_batches(blue_batches, output_mode, connector_cli_version_cache):
+    """
+    Executes the given blue batches sequentially in this process.
+
+    Every batch is executed in its own working directory, which is a sub directory of the current working directory
+    named after the batch index. Received inputs of a batch are removed after its execution, so following batches can
+    reuse the same input paths.
+
+    :param blue_batches: The list of blue batches to execute
+    :param output_mode: The output mode for all executions
+    :param connector_cli_version_cache: Cache for connector cli versions, that is shared by all batches
+    :return: A list containing one result dictionary per blue batch
+    """
+    base_work_dir = os.getcwd()
+    results = []
+
+    for index, blue_batch in enumerate(blue_batches):
+        work_dir = os.path.join(base_work_dir, str(index))
+        try:
+            result = run_blue_batch(
+                blue_batch, output_mode, connector_cli_version_cache, work_dir=work_dir, remove_inputs=True
+            )
+        finally:
+            os.chdir(base_work_dir)
+        results.append(result)
+
+    return results
+
+
+def run_blue_batch(blue_data, output_mode, connector_cli_version_cache=None, work_dir=None, remove_inputs=False):
+    """
+    Executes a single blue batch.
+
+    :param blue_data: The blue batch to execute
+    :param output_mode: The output mode of this execution
+    :param connector_cli_version_cache: Cache for connector cli versions
+    :param work_dir: If given, this directory is created and used as working directory for the execution
+    :param remove_inputs: If True, received input files and directories are removed after execution
+    :return: A result dictionary
+    """
+    result = _create_result()
 
-        blue_data = get_blue_data(blue_location)
+    connector_manager = ConnectorManager(connector_cli_version_cache)
+    try:
+        if work_dir is not None:
+            ensure_directory(work_dir)
+            os.chdir(work_dir)
+
+        if not isinstance(blue_data, dict):
+            raise ExecutionError('Invalid BLUE file. A blue batch has to be a dictionary.')
 
         if output_mode == OutputMode.Connectors and 'outputs' not in blue_data:
             raise ExecutionError('--outputs/-o argument is set but no outputs section is defined in BLUE file.')
@@ -137,18 +219,41 @@ def run(args):
         result['debugInfo'] = exception_format()
         result['state'] = 'failed'
     finally:
-        # umount directories
-        umount_errors = connector_manager.umount_connectors()
-        errors_len = len(umount_errors)
-        umount_errors = [_format_exception(e) for e in umount_errors]
-        if errors_len == 1:
-            result['debugInfo'] += '\n{}'.format(umount_errors[0])
-        elif errors_len > 1:
-            result['debugInfo'] += '\n{}'.format('\n'.join(umount_errors))
+        cleanup_errors = _clean_up_batch(connector_manager, remove_inputs)
+        if cleanup_errors:
+            # debugInfo is None for successful batches
+            debug_info = result['debugInfo'] or []
+            for error in cleanup_errors:
+                debug_info.extend(l for l in _format_exception(error).split('\n') if l)
+            result['debugInfo'] = debug_info
 
     return result
 
 
+def _clean_up_batch(connector_manager, remove_inputs):
+    """
+    Umounts the input directories of a batch and removes its received inputs. Errors do not stop the cleanup, so the
+    following batches of a pack are still executed.
+
+    :param connector_manager: The ConnectorManager of the batch
+    :param remove_inputs: If True, received input files and directories are removed
+    :return: The errors that occurred during cleanup
+    """
+    errors = []
+    try:
+        errors.extend(connector_manager.umount_connectors())
+    except Exception as e:
+        errors.append(e)
+
+    if remove_inputs:
+        try:
+            errors.extend(connector_manager.remove_received_inputs())
+        except Exception as e:
+            errors.append(e)
+
+    return errors
+
+
 def get_blue_data(blue_location):
     """
     If blue_file is an URL fetches this URL and loads the json content, otherwise tries to load the file as local file.
@@ -172,6 +277,8 @@ def get_blue_data(blue_location):
             raise ExecutionError('Could not find blue file "{}" locally. Failed with the following message:\n{}'
                                  .format(blue_location, str(file_error)))
     elif _is_file_scheme_remote(scheme):
+        import urllib.request
+        from urllib.error import URLError
         try:
             with urllib.request.urlopen(blue_location) as blue_file:
                 blue_str = blue_file.read().decode('utf-8')
@@ -199,6 +306,8 @@ def _post_result(url, result):
     :param url: The url to post the result to
     :param result: The result to post
     """
+    import urllib.request
+
     bytes_data = bytes(json.dumps(result), encoding='utf-8')
 
     request = urllib.request.Request(url, data=bytes_data)
@@ -316,6 +425,8 @@ def execute_connector(connector_command, top_level_argument, access=None, path=N
     :param listing: An optional listing, that is given to the connector as temporary file
     :return: A dictionary with keys 'returnCode', 'stdOut', 'stdErr'
     """
+    import tempfile
+
     # create access file
     access_file = None
     if access is not None:
@@ -506,6 +617,8 @@ def calculate_file_checksum(path):
     :param path: The path to the file, whose checksum should be calculated.
     :return: The sha1 checksum of the given file as string
     """
+    import hashlib
+
     hasher = hashlib.sha1()
     with open(path, 'rb') as file:
         buf = file.read()
@@ -784,6 +897,21 @@ class InputConnectorRunner:
         if self._has_mounted:
             self.umount_dir()
 
+    def remove_received(self):
+        """
+        Removes the received file or directory from the local filesystem. Mounting runners are ignored.
+
+        :raise OSError: If the file or directory could not be removed
+        """
+        if self._mount:
+            return
+
+        if self._input_class.is_directory():
+            if os.path.isdir(self._path):
+                shutil.rmtree(self._path)
+        elif os.path.isfile(self._path):
+            os.remove(self._path)
+
     def format_input_key(self):
         return format_key_index(self._input_key, self._input_index)
 
@@ -818,6 +946,8 @@ def _resolve_glob_pattern(glob_pattern, connector_type=None):
     :return: the resolved glob_pattern as list of strings
     :rtype: List[str]
     """
+    import glob
+
     glob_result = glob.glob(os.path.abspath(glob_pattern))
     if connector_type == OutputConnectorType.File:
         glob_result = [f for f in glob_result if os.path.isfile(f)]
@@ -1459,11 +1589,18 @@ def format_key_index(input_key, input_index=None):
 
 
 class ConnectorManager:
-    def __init__(self):
+    def __init__(self, connector_cli_version_cache=None):
+        """
+        :param connector_cli_version_cache: An optional cache for connector cli versions, that can be shared between
+                                            multiple ConnectorManagers
+        """
+        if connector_cli_version_cache is None:
+            connector_cli_version_cache = {}
+
         self._input_runners = []  # type: List[InputConnectorRunner]
         self._output_runners = []  # type: List[OutputConnectorRunner]
         self._cli_output_runners = []  # type: List[CliOutputRunner]
-        self._connector_cli_version_cache = {}  # type: Dict[str, str]
+        self._connector_cli_version_cache = connector_cli_version_cache  # type: Dict[str, str]
 
     def import_input_connectors(self, inputs):
         """
@@ -1643,6 +1780,22 @@ class ConnectorManager:
 
         return errors
 
+    def remove_received_inputs(self):
+        """
+        Tries to remove all received input files and directories from the local filesystem.
+
+        :return: The errors that occurred during removal
+        """
+        errors = []
+        for runner in self._input_runners:
+            try:
+                runner.remove_received()
+            except OSError as e:
+                errors.append(ConnectorError('Could not remove input "{}". Failed with the following message:\n{}'
+                                             .format(runner.format_input_key(), str(e))))
+
+        return errors
+
 
 def exception_format():
     exc_text = format_exc()
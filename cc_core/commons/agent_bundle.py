@@ -0,0 +1,104 @@
+"""
+This module builds the blue agent as a single file python zip application with precompiled bytecode.
+
+The blue agent is executed as script in the container (python3 /cc/blue_agent.py ...). Python never caches the bytecode
+of scripts, so every container start compiles the whole agent again. The python interpreter runs zip files given as
+script like usual scripts, regardless of their file name. The bundle contains the agent as __main__.py and its bytecode
+as __main__.pyc, so it can be put into the container at the same path as the agent source and is started with the same
+command.
+
+The bytecode is compiled by the running interpreter as unchecked hash based pyc (see PEP 552), so it is used without
+comparing timestamps. If the python version of the container differs, the magic number of the pyc does not match and the
+interpreter compiles the contained source as before.
+
+Hash based pycs require python 3.7. On older interpreters the bundle only contains the source, which is compiled at
+every start like the plain agent script.
+"""
+import importlib.util
+import io
+import marshal
+import os
+import threading
+import zipfile
+
+from cc_core.commons.red_to_blue import CONTAINER_AGENT_PATH
+
+# flags of the pyc header for unchecked hash based pycs
+PYC_UNCHECKED_HASH_FLAGS = 0b01
+
+# fixed modification time of the zip entries, so bundles of the same agent are identical
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# tuple (cache key, bundle) of the last bundle built by get_agent_bundle()
+_agent_bundle = None
+_agent_bundle_lock = threading.Lock()
+
+
+def build_agent_bundle(agent_path, container_agent_path=CONTAINER_AGENT_PATH, optimize=0):
+    """
+    Builds a zip application containing the source and the bytecode of the given agent.
+
+    :param agent_path: The path of the agent source file on the host
+    :type agent_path: str
+    :param container_agent_path: The path of the bundle inside the container, which is used as file name in tracebacks
+    :type container_agent_path: str
+    :param optimize: The optimization level of the bytecode as for compile(). Optimization level 2 removes docstrings
+                     and assert statements.
+    :type optimize: int
+    :return: The zip application as bytes. If the running interpreter does not support hash based pycs (python < 3.7),
+             the zip application only contains the source.
+    :rtype: bytes
+    """
+    with open(agent_path, 'rb') as f:
+        source = f.read()
+
+    pyc = None
+    if supports_hash_based_pycs():
+        # zipimport loads __main__ from <bundle path>/__main__.py
+        code = compile(source, os.path.join(container_agent_path, '__main__.py'), 'exec', dont_inherit=True,
+                       optimize=optimize)
+
+        pyc = b''.join([
+            importlib.util.MAGIC_NUMBER,
+            PYC_UNCHECKED_HASH_FLAGS.to_bytes(4, 'little'),
+            importlib.util.source_hash(source),
+            marshal.dumps(code)
+        ])
+
+    data_file = io.BytesIO()
+    # entries are stored uncompressed, because decompression would cost start up time again
+    with zipfile.ZipFile(data_file, mode='w', compression=zipfile.ZIP_STORED) as zip_file:
+        zip_file.writestr(zipfile.ZipInfo('__main__.py', date_time=ZIP_DATE_TIME), source)
+        if pyc is not None:
+            zip_file.writestr(zipfile.ZipInfo('__main__.pyc', date_time=ZIP_DATE_TIME), pyc)
+
+    return data_file.getvalue()
+
+
+def supports_hash_based_pycs():
+    """
+    :return: Whether the running interpreter can build hash based pycs (see PEP 552), which requires python 3.7
+    :rtype: bool
+    """
+    return hasattr(importlib.util, 'source_hash')
+
+
+def get_agent_bundle(agent_path):
+    """
+    Returns the zip application of the given agent as built by build_agent_bundle(). The bundle is built once and
+    rebuilt only if the agent file changes.
+
+    :param agent_path: The path of the agent source file on the host
+    :type agent_path: str
+    :return: The zip application as bytes
+    :rtype: bytes
+    """
+    global _agent_bundle
+
+    agent_stat = os.stat(agent_path)
+    cache_key = (agent_path, agent_stat.st_mtime_ns, agent_stat.st_size)
+
+    with _agent_bundle_lock:
+        if _agent_bundle is None or _agent_bundle[0] != cache_key:
+            _agent_bundle = (cache_key, build_agent_bundle(agent_path))
+        return _agent_bundle[1]
@@ -0,0 +1,253 @@
+"""
+This module defines a columnar in-memory representation of the batches of a red file.
+
+Red files with many batches repeat the same input keys and mostly the same connector structures in every batch. A
+BatchTable stores one column per input/output key and value field instead. Every column is dictionary encoded: it
+holds a compact array of codes, one per batch, that point into a list of the distinct values of this column.
+"""
+import json
+import sys
+from array import array
+from collections import OrderedDict
+
+from cc_core.commons.fingerprint import has_only_string_keys
+from cc_core.commons.red import check_key_is_string, check_keys_are_strings
+
+BATCH_SECTIONS = ('inputs', 'outputs')
+FILE_DIRECTORY_CLASSES = {'File', 'Directory'}
+MISSING = -1
+
+
+class _JsonValue:
+    """
+    Holds a list or dictionary value of a column as json text. Every access creates a new copy of the value, so
+    altering a batch does not alter the table.
+    """
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def decode(self):
+        return json.loads(self.text)
+
+
+class BatchColumn:
+    """
+    A dictionary encoded column of a BatchTable.
+    """
+    __slots__ = ('codes', 'values', '_value_codes')
+
+    def __init__(self):
+        self.codes = array('i')
+        self.values = []
+        self._value_codes = {}
+
+    def set(self, row, value, path=None):
+        """
+        Sets the value of the given row. Rows have to be set in ascending order.
+
+        :param row: The index of the batch
+        :param value: The value to set
+        :param path: The path of keys as list of strings leading to value, which is used in error messages
+        :raise RedSpecificationError: If value contains a key, that is not of type string. Lists and dictionaries are
+                                      stored as json, which would convert these keys to strings.
+        """
+        if isinstance(value, (dict, list)):
+            if not has_only_string_keys(value):
+                check_keys_are_strings(value, path)
+            value_key = json.dumps(value, sort_keys=True, separators=(',', ':'))
+        else:
+            value_key = (type(value), value)
+
+        code = self._value_codes.get(value_key)
+        if code is None:
+            code = len(self.values)
+            self._value_codes[value_key] = code
+            if isinstance(value, (dict, list)):
+                self.values.append(_JsonValue(json.dumps(value, separators=(',', ':'))))
+            else:
+                self.values.append(value)
+
+        self.pad(row)
+        self.codes.append(code)
+
+    def pad(self, length):
+        """
+        Marks all rows up to the given length, that are not set yet, as missing.
+        """
+        missing_rows = length - len(self.codes)
+        if missing_rows > 0:
+            self.codes.extend(array('i', [MISSING]) * missing_rows)
+
+    def has_value(self, row):
+        return row < len(self.codes) and self.codes[row] != MISSING
+
+    def get(self, row):
+        """
+        Returns the value of the given row. Lists and dictionaries are returned as new copies.
+
+        :param row: The index of the batch
+        :return: The value of the given row
+        :raise KeyError: If the given row has no value in this column
+        """
+        if not self.has_value(row):
+            raise KeyError(row)
+
+        value = self.values[self.codes[row]]
+        if isinstance(value, _JsonValue):
+            return value.decode()
+        return value
+
+    def distinct_count(self):
+        return len(self.values)
+
+
+class BatchTable:
+    """
+    A columnar representation of a list of batches.
+
+    File and Directory values (dictionaries with a 'class' key) are split into one column per field, so that for
+    example a connector, that is shared by all batches, is stored only once. All other values, including lists, are
+    stored in one column per key.
+
+    A BatchTable can be used instead of the batches list in red data (red_data['batches'] = batch_table). Red to blue
+    conversion and red validation read the batches from the table one at a time. They do not read the columns directly,
+    but build a new batch dictionary for every row, so a BatchTable trades conversion time for memory: it uses about
+    half of the memory of a list of batch dictionaries, but conversion takes about 50% longer (see
+    benchmarks/bench_batch_table.py).
+    """
+    def __init__(self):
+        # maps (section, key, field) to BatchColumn. field is None for values, that are not split into fields
+        self._columns = OrderedDict()
+        self._length = 0
+
+    @staticmethod
+    def from_batches(batches):
+        """
+        Creates a new BatchTable from the given batches.
+
+        :param batches: An iterable of batch dictionaries with an inputs key and an optional outputs key
+        :return: A new BatchTable containing the given batches
+        :rtype: BatchTable
+        """
+        batch_table = BatchTable()
+        for batch in batches:
+            batch_table.append(batch)
+        return batch_table
+
+    @staticmethod
+    def from_red_data(red_data):
+        """
+        Creates a new BatchTable from the batches of the given red data. If the red data does not contain batches, the
+        resulting table contains the inputs and outputs of the red data as one batch.
+
+        :param red_data: The red data to read batches from
+        :return: A new BatchTable
+        :rtype: BatchTable
+        """
+        batches = red_data.get('batches')
+        if batches is None:
+            batches = [{'inputs': red_data['inputs'], 'outputs': red_data.get('outputs', {})}]
+        return BatchTable.from_batches(batches)
+
+    def append(self, batch):
+        """
+        Appends the given batch to this table.
+
+        :param batch: A batch dictionary with an inputs key and an optional outputs key
+        :raise RedSpecificationError: If the batch contains a key, that is not of type string
+        """
+        row = self._length
+        for section in BATCH_SECTIONS:
+            section_data = batch.get(section)
+            if section_data is None:
+                continue
+
+            # the section itself is present, even if it is empty
+            self._get_column(section, None, None).set(row, True)
+
+            section_path = ['batches', str(row), section]
+            for key, value in section_data.items():
+                check_key_is_string(key, section_path)
+                if isinstance(value, dict) and value.get('class') in FILE_DIRECTORY_CLASSES:
+                    for field, field_value in value.items():
+                        check_key_is_string(field, section_path + [key])
+                        self._get_column(section, key, field).set(row, field_value, section_path + [key, field])
+                else:
+                    self._get_column(section, key, None).set(row, value, section_path + [key])
+
+        self._length += 1
+
+    def _get_column(self, section, key, field):
+        column_key = (section, key, field)
+        column = self._columns.get(column_key)
+        if column is None:
+            column = BatchColumn()
+            column_key = (section, _intern(key), _intern(field))
+            self._columns[column_key] = column
+        return column
+
+    def column(self, section, key, field=None):
+        """
+        Returns the column for the given key and field.
+
+        :param section: Either 'inputs' or 'outputs'
+        :param key: The input or output key
+        :param field: The field of a File/Directory value or None for values, that are not split into fields
+        :return: The BatchColumn or None, if no batch contains this key and field
+        :rtype: BatchColumn
+        """
+        return self._columns.get((section, key, field))
+
+    def keys(self, section):
+        """
+        Returns the input or output keys used in any batch of this table.
+
+        :param section: Either 'inputs' or 'outputs'
+        :return: A list of keys in order of their first occurrence
+        """
+        keys = []
+        for column_section, key, _ in self._columns:
+            if column_section == section and key is not None and key not in keys:
+                keys.append(key)
+        return keys
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for row in range(self._length):
+            yield self[row]
+
+    def __getitem__(self, row):
+        """
+        Returns the batch with the given index as new dictionary.
+
+        :param row: The index of the batch
+        :return: A batch dictionary with an inputs key and an outputs key, if the original batch contained outputs
+        """
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError('batch index out of range')
+
+        batch = {}
+        for (section, key, field), column in self._columns.items():
+            if not column.has_value(row):
+                continue
+
+            if key is None:
+                batch[section] = {}
+            elif field is None:
+                batch[section][key] = column.get(row)
+            else:
+                batch[section].setdefault(key, {})[field] = column.get(row)
+
+        return batch
+
+
+def _intern(s):
+    if isinstance(s, str):
+        return sys.intern(s)
+    return s
@@ -1,23 +1,26 @@
 import io
 import json
+import os
 import tarfile
+import threading
+import time
+import weakref
+from collections import deque
 from typing import List
 
-import docker
 from cc_core.commons.gpu_info import GPUDevice, NVIDIA_GPU_VENDOR
-from docker.errors import DockerException
-from requests.exceptions import ConnectionError
-# noinspection PyProtectedMember
-from docker.models.containers import Container, _create_container_args
-from docker.models.images import Image
-
+from cc_core.commons.agent_bundle import get_agent_bundle
 from cc_core.commons.engines import NVIDIA_DOCKER_RUNTIME
 from cc_core.commons.files import create_directory_tarinfo
 from cc_core.commons.red_to_blue import CONTAINER_AGENT_PATH, CONTAINER_BLUE_FILE_PATH, CONTAINER_OUTPUT_DIR, \
     CONTAINER_INPUT_DIR
 
+# docker and requests are imported in the functions, that use them, because importing docker takes a considerable
+# amount of time, which is not needed for functions like create_batch_archive
+
 GPU_CAPABILITIES = [['gpu'], ['nvidia'], ['compute'], ['compat32'], ['graphics'], ['utility'], ['video'], ['display']]
 GPU_QUERY_IMAGE = 'nvidia/cuda:8.0-runtime'
+DEFAULT_GPU_INVENTORY_TTL = 600
 
 
 def create_container_with_gpus(client, image, command, available_runtimes, gpus=None, environment=None, **kwargs):
@@ -51,6 +54,9 @@ def create_container_with_gpus(client, image, command, available_runtimes, gpus=
 
     :raise DockerException: If the connection to the docker daemon is broken
     """
+    from docker.errors import DockerException
+    from requests.exceptions import ConnectionError
+
     try:
         if gpus:
             if environment is None:
@@ -92,11 +98,15 @@ def _create_with_nvidia_container_toolkit(client, image, command, gpus, kwargs):
     :type gpus: str or int or List[str or int]
     :param kwargs: The kwargs of the docker.DockerClient.containers.create() function
     """
+    # noinspection PyProtectedMember
+    from docker.models.containers import _create_container_args
+    from docker.models.images import Image
+
     # start addition
     device_request = _get_gpu_device_request(gpus)
     # end addition
 
-    if isinstance(image, docker.models.images.Image):
+    if isinstance(image, Image):
         image = image.id
     kwargs['image'] = image
     kwargs['command'] = command
@@ -169,16 +179,24 @@ def _get_nvidia_visible_devices_from_gpus(gpus):
     raise TypeError('gpus should be the string "all" an int or a list, but found "{}"'.format(gpus))
 
 
-def create_batch_archive(blue_data):
+def create_batch_archive(blue_data, agent_bundle=False):
     """
     Creates a tar archive that can be put into a cc_core container to execute the blue agent.
 
     This archive contains the blue agent, a blue file, the outputs-directory and the inputs-directory.
-    The blue file is filled with the given blue data.
+    The blue file is filled with the given blue data. If blue_data is a list of blue batches (see
+    cc_core.commons.red_to_blue.pack_blue_batches), the blue agent executes all of them sequentially in one container.
     The outputs-directory is an empty directory, with name 'outputs'
     The inputs-directory is an empty directory, with name 'inputs'
     The tar archive and the blue file are always in memory and never stored on the local filesystem.
 
+    Only the blue file differs between batches. The tar entries of the blue agent and the directories are built once
+    and the blue file entry is spliced in between (see _get_static_archive_segments), which creates the same bytes as
+    writing the whole archive with tarfile.
+
+    If agent_bundle is True, the blue agent is added as zip application with precompiled bytecode (see
+    cc_core.commons.agent_bundle), which starts faster and is executed with the same command as the agent source.
+
     The resulting archive is:
     /cc
     |--/blue_agent.py
@@ -187,22 +205,71 @@ def create_batch_archive(blue_data):
     |--/inputs/
 
     :param blue_data: The data to put into the blue file of the returned archive
-    :type blue_data: dict
+    :type blue_data: dict or list[dict]
+    :param agent_bundle: If True, the blue agent is added as precompiled zip application instead of source
+    :type agent_bundle: bool
     :return: A tar archive containing the blue agent, a blue file, and input/output directories
     :rtype: io.BytesIO or bytes
     """
-    data_file = io.BytesIO()
-    tar_file = tarfile.open(mode='w', fileobj=data_file)
-
-    # add blue agent
-    tar_file.add(get_blue_agent_host_path(), arcname=CONTAINER_AGENT_PATH, recursive=False)
+    agent_segment, directories_segment = _get_static_archive_segments(bool(agent_bundle))
 
     # add blue file
     blue_batch_content = json.dumps(blue_data).encode('utf-8')
     # see https://bugs.python.org/issue22208 for more information
     blue_batch_tarinfo = tarfile.TarInfo(CONTAINER_BLUE_FILE_PATH)
     blue_batch_tarinfo.size = len(blue_batch_content)
-    tar_file.addfile(blue_batch_tarinfo, io.BytesIO(blue_batch_content))
+
+    segments = [
+        agent_segment,
+        blue_batch_tarinfo.tobuf(tarfile.DEFAULT_FORMAT, tarfile.ENCODING, 'surrogateescape'),
+        blue_batch_content,
+        _padding(len(blue_batch_content), tarfile.BLOCKSIZE),
+        directories_segment,
+        tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+    ]
+
+    # like tarfile.TarFile.close(), fill up the last record
+    archive_size = sum(len(segment) for segment in segments)
+    segments.append(_padding(archive_size, tarfile.RECORDSIZE))
+
+    return io.BytesIO(b''.join(segments))
+
+
+# maps the agent_bundle argument of create_batch_archive to a tuple (cache key, agent segment, directories segment) of
+# the prebuilt tar entries
+_static_archive_segments = {}
+
+
+def _get_static_archive_segments(agent_bundle=False):
+    """
+    Returns the raw tar entries of the blue agent and of the outputs and inputs directories. The entries are built once
+    and rebuilt only if the blue agent file changes.
+
+    :param agent_bundle: If True, the agent entry contains the agent as precompiled zip application
+    :type agent_bundle: bool
+    :return: A tuple (agent_segment, directories_segment) of bytes
+    :rtype: tuple[bytes, bytes]
+    """
+    agent_path = get_blue_agent_host_path()
+    agent_stat = os.stat(agent_path)
+    cache_key = (agent_path, agent_stat.st_mtime_ns, agent_stat.st_size)
+
+    cached_segments = _static_archive_segments.get(agent_bundle)
+    if cached_segments is not None and cached_segments[0] == cache_key:
+        return cached_segments[1], cached_segments[2]
+
+    data_file = io.BytesIO()
+    tar_file = tarfile.open(mode='w', fileobj=data_file)
+
+    # add blue agent
+    if agent_bundle:
+        bundle = get_agent_bundle(agent_path)
+        agent_tarinfo = tar_file.gettarinfo(agent_path, arcname=CONTAINER_AGENT_PATH)
+        agent_tarinfo.size = len(bundle)
+        tar_file.addfile(agent_tarinfo, io.BytesIO(bundle))
+    else:
+        tar_file.add(agent_path, arcname=CONTAINER_AGENT_PATH, recursive=False)
+    agent_end = tar_file.offset
 
     # add outputs directory
     output_directory_tarinfo = create_directory_tarinfo(CONTAINER_OUTPUT_DIR, owner_name='cc')
@@ -211,12 +278,24 @@ def create_batch_archive(blue_data):
     # add inputs_directory
     input_directory_tarinfo = create_directory_tarinfo(CONTAINER_INPUT_DIR, owner_name='cc')
     tar_file.addfile(input_directory_tarinfo)
+    directories_end = tar_file.offset
 
-    # close file
     tar_file.close()
-    data_file.seek(0)
+    data = data_file.getvalue()
 
-    return data_file
+    cached_segments = (cache_key, data[:agent_end], data[agent_end:directories_end])
+    _static_archive_segments[agent_bundle] = cached_segments
+    return cached_segments[1], cached_segments[2]
+
+
+def _padding(size, block_size):
+    """
+    Returns the NUL bytes, that fill up the given size to a multiple of block_size.
+    """
+    remainder = size % block_size
+    if remainder:
+        return tarfile.NUL * (block_size - remainder)
+    return b''
 
 
 def get_blue_agent_host_path():
@@ -250,7 +329,8 @@ def detect_nvidia_docker_gpus(client, runtimes):
     Returns a list of GPUDevices, which are available for the given docker client.
 
     This function starts a nvidia docker container and executes nvidia-smi in order to retrieve information about
-    the gpus, that are available to the docker client.
+    the gpus, that are available to the docker client. The query image is only pulled, if it is not present. Use a
+    GPUInventoryCache to avoid repeated queries.
 
     :param client: The docker client to use for gpu detection
     :type client: docker.DockerClient
@@ -262,7 +342,12 @@ def detect_nvidia_docker_gpus(client, runtimes):
     :return: A list of GPUDevices
     :rtype: List[GPUDevice]
     """
-    client.images.pull(GPU_QUERY_IMAGE)
+    from docker.errors import DockerException, ImageNotFound
+
+    try:
+        client.images.get(GPU_QUERY_IMAGE)
+    except ImageNotFound:
+        client.images.pull(GPU_QUERY_IMAGE)
 
     # this creates an csv output that contains gpu indices and their total memory in mega bytes
     command = [
@@ -307,3 +392,386 @@ def detect_nvidia_docker_gpus(client, runtimes):
             )
 
     return gpus
+
+
+DEFAULT_CONTAINER_POOL_SIZE = 4
+DEFAULT_CONTAINER_IDLE_TTL = 300
+
+# paths, that a batch archive (see create_batch_archive) puts into a container. The archive of the next batch replaces
+# them, so a container, whose filesystem only differs from its image in these paths, holds no data of earlier batches.
+BATCH_ARCHIVE_PATHS = {
+    os.path.dirname(CONTAINER_AGENT_PATH), CONTAINER_AGENT_PATH, CONTAINER_BLUE_FILE_PATH, CONTAINER_OUTPUT_DIR,
+    CONTAINER_INPUT_DIR
+}
+
+
+class ContainerPool:
+    """
+    A pool of created, but not yet started docker containers.
+
+    Creating a container often takes longer than executing a short batch. The pool keeps idle containers per
+    configuration (image, command, gpus, environment and further create arguments like runtime or mem_limit), so a
+    batch can take a prepared container, put its archive into it and start it. After use a container is destroyed or,
+    if the caller declares it as reusable, returned to the pool. Idle containers are destroyed after idle_ttl seconds.
+
+    A reusable container is only returned to the pool, if its filesystem does not contain data of the batch, that used
+    it: docker may only report changes of the paths in BATCH_ARCHIVE_PATHS, which the archive of the next batch
+    replaces. Containers with any other change, like files in the inputs or outputs directory or in the working
+    directory, are destroyed.
+
+    The command is part of the configuration, because docker can not change the command of a created container. Batch
+    specific arguments are given in the blue file of the batch archive, so all batches of an experiment share the same
+    command.
+
+    The pool is thread safe. Docker is only called outside of the internal lock.
+    """
+    def __init__(self, client, available_runtimes, max_idle=DEFAULT_CONTAINER_POOL_SIZE,
+                 idle_ttl=DEFAULT_CONTAINER_IDLE_TTL, clock=time.monotonic):
+        """
+        :param client: The docker client to create containers with
+        :type client: docker.DockerClient
+        :param available_runtimes: A list of available docker runtimes configured inside the given client
+        :type available_runtimes: list[str]
+        :param max_idle: The maximal number of idle containers kept per configuration
+        :type max_idle: int
+        :param idle_ttl: The number of seconds an idle container is kept, before it is destroyed
+        :type idle_ttl: float
+        :param clock: A function returning the current time in seconds
+        """
+        self._client = client
+        self._available_runtimes = available_runtimes
+        self._max_idle = max_idle
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        # maps pool keys to deques of tuples (idle since, container), the most recently released container is last
+        self._idle = {}
+        # maps ids of handed out containers to their pool key
+        self._in_use = {}
+
+    def acquire(self, image, command, gpus=None, environment=None, **kwargs):
+        """
+        Returns an idle container with the given configuration or creates a new one.
+
+        :param image: The image for the docker container
+        :type image: str
+        :param command: The command to execute inside this container
+        :type command: str or list[str]
+        :param gpus: The gpus to use as for create_container_with_gpus()
+        :param environment: The environment of this docker container
+        :type environment: dict
+        :param kwargs: The same arguments as in docker.DockerClient.containers.create(kwargs)
+        :return: A created, but not started docker container
+        :rtype: Container
+        :raise DockerException: If the connection to the docker daemon is broken
+        """
+        key = _container_pool_key(image, command, gpus, environment, kwargs)
+
+        container = None
+        with self._lock:
+            expired = self._pop_expired_locked()
+            idle_containers = self._idle.get(key)
+            if idle_containers:
+                idle_since, container = idle_containers.pop()
+
+        try:
+            self._remove_containers(expired)
+        except Exception:
+            # the idle container is not handed out, so it is given back to the pool
+            if container is not None:
+                with self._lock:
+                    self._idle.setdefault(key, deque()).append((idle_since, container))
+            raise
+
+        if container is None:
+            container = self._create(image, command, gpus, environment, kwargs)
+
+        with self._lock:
+            self._in_use[container.id] = key
+        return container
+
+    def release(self, container, reusable=False):
+        """
+        Gives back a container, that was acquired from this pool.
+
+        :param container: The container to give back
+        :type container: Container
+        :param reusable: If True, the container is kept as idle container, if there is space in the pool and its
+                         filesystem contains no data of the previous batch (see has_clean_filesystem). Only
+                         containers, that can be started again for another batch, should be declared as reusable.
+        :type reusable: bool
+        :raise ValueError: If the container was not acquired from this pool
+        """
+        with self._lock:
+            key = self._in_use.pop(container.id, None)
+            if key is None:
+                raise ValueError('container "{}" was not acquired from this pool'.format(container.id))
+
+        if reusable:
+            reusable = has_clean_filesystem(container)
+
+        with self._lock:
+            to_remove = self._pop_expired_locked()
+            idle_containers = self._idle.setdefault(key, deque())
+            if reusable and len(idle_containers) < self._max_idle:
+                idle_containers.append((self._clock(), container))
+            else:
+                to_remove.append(container)
+
+        self._remove_containers(to_remove)
+
+    def prefill(self, count, image, command, gpus=None, environment=None, **kwargs):
+        """
+        Creates idle containers for the given configuration, until count containers (at most max_idle) are idle.
+
+        :param count: The number of idle containers to provide
+        :type count: int
+        :param image: The image for the docker container
+        :param command: The command to execute inside this container
+        :param gpus: The gpus to use as for create_container_with_gpus()
+        :param environment: The environment of this docker container
+        :param kwargs: The same arguments as in docker.DockerClient.containers.create(kwargs)
+        :return: The number of created containers
+        :rtype: int
+        :raise DockerException: If the connection to the docker daemon is broken
+        """
+        key = _container_pool_key(image, command, gpus, environment, kwargs)
+        count = min(count, self._max_idle)
+
+        with self._lock:
+            missing = count - len(self._idle.get(key, ()))
+
+        created = []
+        for _ in range(missing):
+            created.append(self._create(image, command, gpus, environment, kwargs))
+
+        to_remove = []
+        with self._lock:
+            idle_containers = self._idle.setdefault(key, deque())
+            for container in created:
+                if len(idle_containers) < self._max_idle:
+                    idle_containers.append((self._clock(), container))
+                else:
+                    to_remove.append(container)
+
+        self._remove_containers(to_remove)
+        return len(created) - len(to_remove)
+
+    def evict_expired(self):
+        """
+        Destroys all containers, that are idle for longer than idle_ttl.
+
+        :return: The number of destroyed containers
+        :rtype: int
+        """
+        expired = self._pop_expired()
+        self._remove_containers(expired)
+        return len(expired)
+
+    def close(self):
+        """
+        Destroys all idle containers. Containers, that are in use, are destroyed, when they are released.
+        """
+        with self._lock:
+            to_remove = [container for idle_containers in self._idle.values() for _, container in idle_containers]
+            self._idle.clear()
+            self._max_idle = 0
+
+        self._remove_containers(to_remove)
+
+    def idle_count(self):
+        """
+        :return: The number of idle containers in this pool
+        :rtype: int
+        """
+        with self._lock:
+            return sum(len(idle_containers) for idle_containers in self._idle.values())
+
+    def _create(self, image, command, gpus, environment, kwargs):
+        # create_container_with_gpus modifies the given environment and kwargs
+        environment = dict(environment) if environment is not None else None
+        return create_container_with_gpus(
+            self._client, image, command, self._available_runtimes, gpus=gpus, environment=environment, **kwargs
+        )
+
+    def _pop_expired(self):
+        """
+        Removes expired containers from the idle containers.
+
+        :return: A list of expired containers
+        """
+        with self._lock:
+            return self._pop_expired_locked()
+
+    def _pop_expired_locked(self):
+        """
+        Same as _pop_expired(), but expects the caller to hold the lock.
+        """
+        expired = []
+        expiration_time = self._clock() - self._idle_ttl
+        for key, idle_containers in list(self._idle.items()):
+            # the oldest idle containers are first
+            while idle_containers and idle_containers[0][0] <= expiration_time:
+                expired.append(idle_containers.popleft()[1])
+            if not idle_containers:
+                del self._idle[key]
+        return expired
+
+    @staticmethod
+    def _remove_containers(containers):
+        """
+        Removes all given containers, even if removing one of them fails.
+
+        :raise DockerException: The first exception raised while removing the containers
+        """
+        first_exception = None
+        for container in containers:
+            try:
+                container.remove(force=True)
+            except Exception as e:
+                if first_exception is None:
+                    first_exception = e
+        if first_exception is not None:
+            raise first_exception
+
+
+def has_clean_filesystem(container):
+    """
+    Returns whether the filesystem of the given container differs from its image only in BATCH_ARCHIVE_PATHS, so it
+    does not contain inputs, outputs or other files of a batch, that was executed in it.
+
+    :param container: The container to check
+    :type container: Container
+    :return: True, if the container can be used for another batch without exposing data of earlier batches. False, if
+             the filesystem contains other changes or could not be inspected.
+    :rtype: bool
+    """
+    try:
+        changes = container.diff()
+    except Exception:
+        return False
+    return all(change['Path'] in BATCH_ARCHIVE_PATHS for change in changes or [])
+
+
+def _container_pool_key(image, command, gpus, environment, kwargs):
+    from docker.models.images import Image
+
+    if isinstance(image, Image):
+        image = image.id
+    return _freeze(image), _freeze(command), _freeze(gpus), _freeze(environment), _freeze(kwargs)
+
+
+def _freeze(value):
+    """
+    Converts the given value into a hashable value. Dictionaries are converted to sorted tuples of items and lists to
+    tuples.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class GPUInventoryCache:
+    """
+    Caches the gpus detected by detect_nvidia_docker_gpus() per docker client.
+
+    Querying the gpus starts a container, which takes seconds, while the gpus of a docker host rarely change. Cached
+    inventories are queried again after ttl seconds or after invalidate(). Concurrent callers for the same client wait for
+    the query, that is already running, instead of starting their own query. Failed queries are not cached.
+    """
+    def __init__(self, ttl=DEFAULT_GPU_INVENTORY_TTL, clock=time.monotonic, query=None):
+        """
+        :param ttl: The number of seconds a detected gpu inventory is valid
+        :type ttl: float
+        :param clock: A function returning the current time in seconds
+        :param query: A function (client, runtimes) returning a list of GPUDevices. Defaults to
+                      detect_nvidia_docker_gpus().
+        """
+        self._ttl = ttl
+        self._clock = clock
+        self._query = query if query is not None else detect_nvidia_docker_gpus
+        self._lock = threading.Lock()
+
+        # maps docker clients to tuples (detection time, gpus). Clients are referenced weakly, so the cache does not
+        # keep clients alive.
+        self._inventories = weakref.WeakKeyDictionary()
+        # maps docker clients to the _GPUInventoryQuery, that is currently running
+        self._queries = weakref.WeakKeyDictionary()
+
+    def get_gpus(self, client, runtimes):
+        """
+        Returns the gpus available for the given docker client.
+
+        :param client: The docker client to use for gpu detection
+        :type client: docker.DockerClient
+        :param runtimes: The available runtimes for this docker client
+        :type runtimes: List[str]
+        :return: A list of GPUDevices
+        :rtype: List[GPUDevice]
+        :raise DockerException: If the gpu query failed
+        """
+        with self._lock:
+            inventory = self._inventories.get(client)
+            if inventory is not None and self._clock() - inventory[0] < self._ttl:
+                return list(inventory[1])
+
+            query = self._queries.get(client)
+            is_owner = query is None
+            if is_owner:
+                query = _GPUInventoryQuery()
+                self._queries[client] = query
+
+        if not is_owner:
+            query.done.wait()
+            if query.error is not None:
+                raise query.error
+            return list(query.gpus)
+
+        try:
+            gpus = self._query(client, runtimes)
+        except Exception as e:
+            query.error = e
+            raise
+        else:
+            query.gpus = gpus
+            return list(gpus)
+        finally:
+            with self._lock:
+                # the query is not cached, if the client was invalidated in the meantime
+                if self._queries.get(client) is query:
+                    del self._queries[client]
+                    if query.error is None:
+                        self._inventories[client] = (self._clock(), query.gpus)
+            query.done.set()
+
+    def invalidate(self, client=None):
+        """
+        Removes the cached gpu inventory of the given client or of all clients.
+
+        :param client: The docker client, whose inventory should be removed. If None, all inventories are removed.
+        :type client: docker.DockerClient
+        """
+        with self._lock:
+            if client is None:
+                self._inventories.clear()
+                self._queries.clear()
+            else:
+                self._inventories.pop(client, None)
+                self._queries.pop(client, None)
+
+
+class _GPUInventoryQuery:
+    """
+    A running gpu query, whose result is shared with all callers waiting for it.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.gpus = None
+        self.error = None
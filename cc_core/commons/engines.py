@@ -1,6 +1,5 @@
-import jsonschema
-from jsonschema.exceptions import ValidationError
-
+from cc_core.commons import schema_map
+from cc_core.commons.schema_map import jsonschema_validation_error
 from cc_core.commons.exceptions import EngineError
 from cc_core.commons.schemas.engines.container import container_engines
 from cc_core.commons.schemas.engines.execution import execution_engines
@@ -38,10 +37,9 @@ def engine_validation(red_data, engine_type, supported, optional=False):
     if engine not in ENGINES[engine_type]:
         raise EngineError('no schema available for {}-engine "{}" in cc_core'.format(engine_type, engine))
 
-    schema = ENGINES[engine_type][engine]
     try:
-        jsonschema.validate(settings, schema)
-    except ValidationError as e:
+        schema_map.validate(settings, 'red-engine-{}-{}'.format(engine_type, engine))
+    except jsonschema_validation_error() as e:
         where = '/'.join([str(s) for s in e.absolute_path]) if e.absolute_path else '/'
         raise EngineError(
             '{}-engine "{}" specification in REDFILE does not comply with jsonschema:\n'
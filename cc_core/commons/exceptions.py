@@ -1,12 +1,153 @@
 import sys
 
 import re
+from functools import lru_cache
 from traceback import format_exc
 
+SECRET_MASK = '********'
+
+# number of compiled secret maskers kept in memory
+SECRET_MASKER_CACHE_SIZE = 32
+
+
+class SecretMasker:
+    """
+    Replaces secret values in texts with SECRET_MASK.
+
+    All secret values are compiled once into a single regex, that matches the escaped values as literal strings. The
+    alternatives are ordered longest first, so a secret containing another secret is masked completely.
+    """
+    def __init__(self, secret_values, mask=SECRET_MASK):
+        """
+        :param secret_values: The values to hide. Values are converted to strings, empty values and None are ignored.
+        :param mask: The string that replaces every occurrence of a secret value
+        """
+        secrets = {str(value) for value in secret_values if value is not None}
+        secrets.discard('')
+        secrets = sorted(secrets, key=lambda value: (-len(value), value))
+
+        self.mask = mask
+        self.max_length = len(secrets[0]) if secrets else 0
+        self._pattern = re.compile('|'.join(re.escape(value) for value in secrets)) if secrets else None
+
+    def mask_text(self, text):
+        """
+        Returns the given text with all secret values replaced.
+
+        :param text: The text to mask
+        :return: The masked text
+        """
+        if self._pattern is None:
+            return text
+        return self._pattern.sub(self.mask, text)
+
+    def stream(self):
+        """
+        Returns a SecretMaskingStream, that masks a text given in chunks.
+
+        :rtype: SecretMaskingStream
+        """
+        return SecretMaskingStream(self)
+
+    def mask_chunks(self, chunks):
+        """
+        Masks the given chunks of a text and yields the masked text in chunks. A secret value split across chunks is
+        masked as well, while at most max_length - 1 characters are held back at once.
+
+        :param chunks: An iterable of strings, e.g. lines of a log or blocks read from a file
+        :return: A generator of masked strings, which joined together equal mask_text() of the joined chunks
+        """
+        stream = self.stream()
+        for chunk in chunks:
+            masked = stream.feed(chunk)
+            if masked:
+                yield masked
+        rest = stream.flush()
+        if rest:
+            yield rest
+
+
+class SecretMaskingStream:
+    """
+    Masks secret values in a text, that is given chunk by chunk (e.g. output of a running command).
+
+    Only the tail of the text, that could still be the beginning of a secret value, is held back until the next chunk
+    arrives. The concatenated output is the same as SecretMasker.mask_text() of the concatenated input.
+    """
+    def __init__(self, masker):
+        """
+        :param masker: The masker with the secret values to hide
+        :type masker: SecretMasker
+        """
+        self._masker = masker
+        self._pending = ''
+
+    def feed(self, chunk):
+        """
+        Adds the given chunk to the stream.
+
+        :param chunk: The next part of the text
+        :return: The masked text, that can be emitted safely. This can be empty, if the text is held back.
+        """
+        pattern = self._masker._pattern
+        if pattern is None:
+            return chunk
+
+        text = self._pending + chunk
+        # a match starting before this position is complete, because no secret value is longer than max_length
+        safe_end = len(text) - self._masker.max_length + 1
+
+        result = []
+        position = 0
+        for match in pattern.finditer(text):
+            if match.start() >= safe_end:
+                break
+            result.append(text[position:match.start()])
+            result.append(self._masker.mask)
+            position = match.end()
+
+        if position < safe_end:
+            result.append(text[position:safe_end])
+            position = safe_end
+
+        self._pending = text[position:]
+        return ''.join(result)
+
+    def flush(self):
+        """
+        Ends the stream.
+
+        :return: The masked rest of the text, that was held back
+        """
+        pending = self._pending
+        self._pending = ''
+        return self._masker.mask_text(pending)
+
+
+@lru_cache(maxsize=SECRET_MASKER_CACHE_SIZE)
+def _cached_secret_masker(secret_values):
+    return SecretMasker(secret_values)
+
+
+def get_secret_masker(secret_values):
+    """
+    Returns a SecretMasker for the given secret values. Maskers are cached, so the regex of a set of secret values is
+    only compiled once.
+
+    :param secret_values: The values to hide
+    :rtype: SecretMasker
+    """
+    secret_values = tuple(secret_values)
+    try:
+        return _cached_secret_masker(secret_values)
+    except TypeError:
+        # unhashable values can not be cached
+        return SecretMasker(secret_values)
+
 
 def _hide_secret_values(text, secret_values):
     if secret_values:
-        return re.sub('|'.join(secret_values), '********', text)
+        return get_secret_masker(secret_values).mask_text(text)
     return text
 
 
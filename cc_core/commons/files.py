@@ -4,33 +4,329 @@ import sys
 import json
 import tarfile
 import textwrap
-
-from ruamel.yaml import YAML, YAMLError
+import threading
+from collections import OrderedDict
+from copy import deepcopy
 
 from cc_core.commons.exceptions import AgentError
 
 JSON_INDENT = 4
+STREAM_CHUNK_SIZE = 1024 * 1024
+JSON_WHITESPACE = ' \t\n\r'
+# json values, that are cut off at the end of the buffer, fail within this many characters before the end (e.g. an
+# incomplete literal like "fals", a number like "1e-" or an escape sequence like "\u00e")
+JSON_MAX_INCOMPLETE_TOKEN_LENGTH = 16
+DOCUMENT_CACHE_SIZE = 32
+
+
+class _LazyYAML:
+    """
+    Creates the ruamel YAML object on first use and forwards all attribute accesses to it. Importing ruamel.yaml takes
+    a considerable amount of time, which is not needed for json files.
+    """
+    def __init__(self):
+        self._yaml = None
+        self._lock = threading.Lock()
+
+    def _get_yaml(self):
+        if self._yaml is None:
+            with self._lock:
+                if self._yaml is None:
+                    from ruamel.yaml import YAML
+                    yaml_instance = YAML(typ='safe')
+                    yaml_instance.default_flow_style = False
+                    self._yaml = yaml_instance
+        return self._yaml
+
+    def __getattr__(self, name):
+        return getattr(self._get_yaml(), name)
 
-yaml = YAML(typ='safe')
-yaml.default_flow_style = False
+
+yaml = _LazyYAML()
 
 
 WRITE_PERMISSIONS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
 
+# documents of load_and_read(use_cache=True) by (path, mtime, size). Entries are tuples (is_json, document), where
+# document is the raw text of json documents and the parsed data of yaml documents.
+_document_cache = OrderedDict()
+_document_cache_lock = threading.Lock()
+
 
-def load_and_read(location, var_name):
+def load_and_read(location, var_name, use_cache=False):
     """
     Reads a path or URL and parses this file as yaml/json.
     :param location: The location as local path or URL
     :param var_name:
+    :param use_cache: If True, the document is cached by path, modification time and size of the file, so repeated
+                      loads of an unchanged file do not read the file again. Json documents are cached as text and
+                      parsed again, which is faster than copying the parsed data. Yaml documents are cached parsed and
+                      a copy is returned.
     :return:
     """
     if not location:
         return None
+    if use_cache:
+        return _load_and_read_cached(location, var_name)
     raw_data = load(location, var_name)
     return read(raw_data, var_name)
 
 
+def _load_and_read_cached(location, var_name):
+    path = os.path.abspath(os.path.expanduser(location))
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        raise AgentError('File "{}" for argument "{}" could not be loaded from file system'.format(location, var_name))
+
+    cache_key = (path, file_stat.st_mtime_ns, file_stat.st_size)
+    with _document_cache_lock:
+        entry = _document_cache.get(cache_key)
+        if entry is not None:
+            _document_cache.move_to_end(cache_key)
+
+    if entry is not None:
+        is_json, document = entry
+        if is_json:
+            return _read_json(document)
+        return deepcopy(document)
+
+    raw_data = load(location, var_name)
+    data = _read_json(raw_data)
+    if data is not None:
+        entry = (True, raw_data)
+    else:
+        entry = (False, _read_yaml(raw_data, var_name))
+        data = deepcopy(entry[1])
+
+    with _document_cache_lock:
+        _document_cache[cache_key] = entry
+        while len(_document_cache) > DOCUMENT_CACHE_SIZE:
+            _document_cache.popitem(last=False)
+
+    return data
+
+
+def clear_document_cache():
+    """
+    Removes all documents cached by load_and_read(use_cache=True).
+    """
+    with _document_cache_lock:
+        _document_cache.clear()
+
+
+def load_and_read_streaming(location, var_name, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Reads a local red file like load_and_read(), but does not load the batches of json files into memory.
+
+    If the file contains a json object with a batches key, the returned dictionary contains all top level keys of the
+    file, but red_data['batches'] is a StreamedBatches object, that parses the batches one at a time from the file,
+    whenever it is iterated. Json is parsed with the same restrictions as in read() (no duplicated keys and no NaN or
+    Infinity constants). Yaml files and files, that can not be parsed by these rules, are read completely as in
+    load_and_read().
+
+    :param location: The location as local path
+    :param var_name: The name of the argument for error messages
+    :param chunk_size: The number of characters read from the file at once
+    :return: The red data with streamed batches or None, if location is empty
+    """
+    if not location:
+        return None
+
+    path = os.path.expanduser(location)
+    try:
+        with open(path) as f:
+            reader = _JsonStreamReader(f, chunk_size)
+            is_json = reader.peek() == '{'
+            if is_json:
+                data, has_batches = _read_json_object_without_batches(reader)
+    except ValueError:
+        # the file might still be yaml in flow style, which is parsed by load_and_read() like in read()
+        is_json = False
+    except Exception:
+        raise AgentError('File "{}" for argument "{}" could not be loaded from file system'.format(location, var_name))
+
+    if not is_json:
+        return load_and_read(location, var_name)
+
+    if has_batches:
+        data['batches'] = StreamedBatches(path, var_name, chunk_size)
+
+    return data
+
+
+class StreamedBatches:
+    """
+    An iterable over the batches of a json red file. Every iteration reads the file again and parses the batches one
+    at a time, so only one batch is held in memory.
+    """
+    def __init__(self, path, var_name, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        :param path: The path of the json red file
+        :param var_name: The name of the argument for error messages
+        :param chunk_size: The number of characters read from the file at once
+        """
+        self.path = path
+        self.var_name = var_name
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        try:
+            with open(self.path) as f:
+                reader = _JsonStreamReader(f, self.chunk_size)
+                reader.expect('{')
+                if reader.peek() == '}':
+                    return
+
+                while True:
+                    key = reader.decode_value()
+                    reader.expect(':')
+                    if key == 'batches':
+                        yield from reader.iter_array()
+                        return
+                    reader.decode_value()
+                    if reader.peek() == '}':
+                        return
+                    reader.expect(',')
+        except ValueError as e:
+            raise AgentError('batches of argument "{}" could not be parsed. Failed with the following message:\n{}'
+                             .format(self.var_name, str(e)))
+
+
+def _read_json_object_without_batches(reader):
+    """
+    Parses the top level json object of the given reader. The entries of a batches array are parsed one at a time and
+    discarded.
+
+    :param reader: The reader, that is positioned at the start of the json object
+    :type reader: _JsonStreamReader
+    :return: A tuple (data, has_batches), where data is the parsed dictionary without batches and has_batches
+             indicates whether a batches array was found
+    :raise ValueError: If the object is not valid json, contains duplicated keys or batches are not given as array
+    """
+    data = {}
+    has_batches = False
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.expect('}')
+        return data, has_batches
+
+    while True:
+        key = reader.decode_value()
+        if not isinstance(key, str):
+            raise ValueError('Expected a string as key, but found "{}"'.format(key))
+        if key in data or (key == 'batches' and has_batches):
+            raise ValueError('duplicated key "{}"'.format(key))
+        reader.expect(':')
+        if key == 'batches':
+            if reader.peek() != '[':
+                raise ValueError('batches are not given as array')
+            for _ in reader.iter_array():
+                pass
+            has_batches = True
+        else:
+            data[key] = reader.decode_value()
+
+        if reader.peek() == '}':
+            reader.expect('}')
+            return data, has_batches
+        reader.expect(',')
+
+
+class _JsonStreamReader:
+    """
+    Reads json values from a text file in chunks using json.JSONDecoder.raw_decode(). Values are decoded with the same
+    restrictions as in _read_json().
+    """
+    def __init__(self, f, chunk_size):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder(object_pairs_hook=_unique_keys_dict, parse_constant=_reject_json_constant)
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """
+        Reads the next chunk from the file. Already consumed characters are removed from the buffer.
+
+        :return: False if the end of the file is reached, otherwise True
+        """
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character or None, if the end of the file is reached.
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in JSON_WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError('Expected "{}" but found "{}"'.format(char, found))
+        self._pos += 1
+
+    def decode_value(self):
+        """
+        Parses the next json value.
+
+        :return: The parsed value
+        :raise ValueError: If the next value is not valid json
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # only errors caused by the end of the buffer can be resolved by reading more data
+                if not self._is_incomplete(e) or self._eof or not self._fill():
+                    raise
+                continue
+
+            # a value ending at the end of the buffer might be continued in the next chunk (e.g. numbers)
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _is_incomplete(self, error):
+        """
+        Returns whether the given decode error might be caused by a json value, that is cut off at the end of the buffer.
+        """
+        if error.msg.startswith('Unterminated string'):
+            return True
+        return len(self._buffer) - error.pos <= JSON_MAX_INCOMPLETE_TOKEN_LENGTH
+
+    def iter_array(self):
+        """
+        Yields the values of the next json array one at a time.
+        """
+        self.expect('[')
+        if self.peek() == ']':
+            self.expect(']')
+            return
+
+        while True:
+            yield self.decode_value()
+            if self.peek() == ']':
+                self.expect(']')
+                return
+            self.expect(',')
+
+
 def load(location, var_name):
     try:
         with open(os.path.expanduser(location)) as f:
@@ -40,11 +336,38 @@ def load(location, var_name):
 
 
 def read(raw_data, var_name):
+    """
+    Parses the given raw data as json or yaml. If the raw data looks like json, it is parsed with the json parser of
+    the standard library, which is a lot faster than the yaml parser. If this fails, the yaml parser is used.
+
+    :param raw_data: The string to parse
+    :param var_name: The name of the argument for error messages
+    :return: The parsed dictionary
+    :raise AgentError: If raw_data could not be parsed or does not contain a dictionary
+    """
+    data = _read_json(raw_data)
+    if data is not None:
+        return data
+
+    return _read_yaml(raw_data, var_name)
+
+
+def _read_yaml(raw_data, var_name):
+    """
+    Parses the given raw data with the yaml parser.
+
+    :param raw_data: The string to parse
+    :param var_name: The name of the argument for error messages
+    :return: The parsed dictionary
+    :raise AgentError: If raw_data could not be parsed or does not contain a dictionary
+    """
+    from ruamel.yaml import YAMLError
+
     try:
         data = yaml.load(raw_data)
     except YAMLError as e:
-        raise AgentError('data for argument "{}" is neither json nor yaml formatted. Failed with the following message:'
-                         '\n{}'.format(var_name, str(e)))
+        raise AgentError('data for argument "{}" is neither json nor yaml formatted. Failed with the following '
+                         'message:\n{}'.format(var_name, str(e)))
 
     if not isinstance(data, dict):
         raise AgentError('data for argument "{}" does not contain a dictionary.\ndata: "{}"'.format(var_name, data))
@@ -52,6 +375,41 @@ def read(raw_data, var_name):
     return data
 
 
+def _read_json(raw_data):
+    """
+    Tries to parse the given raw data as json object.
+
+    :param raw_data: The string to parse
+    :return: The parsed dictionary or None, if raw_data is not a json object or contains duplicated keys
+    """
+    if raw_data.lstrip(JSON_WHITESPACE)[:1] != '{':
+        return None
+
+    try:
+        return json.loads(raw_data, object_pairs_hook=_unique_keys_dict, parse_constant=_reject_json_constant)
+    except ValueError:
+        return None
+
+
+def _reject_json_constant(constant):
+    """
+    Raises a ValueError for the constants NaN, Infinity and -Infinity, which are accepted by the json module, but are
+    not valid json. The yaml parser is used for these documents, which reads them as strings.
+    """
+    raise ValueError('invalid json constant "{}"'.format(constant))
+
+
+def _unique_keys_dict(pairs):
+    """
+    Creates a dictionary from the given key value pairs. Duplicated keys raise a ValueError, so that the yaml parser,
+    which rejects duplicated keys, is used for these documents.
+    """
+    data = dict(pairs)
+    if len(data) != len(pairs):
+        raise ValueError('duplicated key')
+    return data
+
+
 def file_extension(dump_format):
     if dump_format == 'json':
         return dump_format
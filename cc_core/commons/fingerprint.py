@@ -0,0 +1,50 @@
+"""
+This module computes canonical fingerprints of json data, which identify data independently of the order of dictionary
+keys. They are used to find identical batches and to cache validation results.
+"""
+import hashlib
+import json
+
+
+def has_only_string_keys(data):
+    """
+    Returns whether all dictionaries inside the given data only contain keys of type string.
+
+    :param data: The json data to check
+    :return: True, if no dictionary in data contains a key, that is not a string, otherwise False
+    :rtype: bool
+    """
+    stack = [data]
+    while stack:
+        data = stack.pop()
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if not isinstance(key, str):
+                    return False
+                stack.append(value)
+        elif isinstance(data, list):
+            stack.extend(data)
+    return True
+
+
+def canonical_fingerprint(data):
+    """
+    Returns a canonical fingerprint of the given json data. The order of dictionary keys does not influence the
+    fingerprint.
+
+    :param data: The json data to create a fingerprint for
+    :return: A sha256 hex digest of the canonical json representation of data
+    :rtype: str
+    :raise ValueError: If data can not be represented canonically, because it contains keys, that are not strings, or
+                       values, that are not json serializable
+    """
+    # json.dumps converts integer keys to strings, which would give {1: 'a'} and {'1': 'a'} the same fingerprint
+    if not has_only_string_keys(data):
+        raise ValueError('data contains keys, that are not strings')
+
+    try:
+        canonical_data = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    except TypeError as e:
+        raise ValueError(str(e))
+
+    return hashlib.sha256(canonical_data.encode('utf-8')).hexdigest()
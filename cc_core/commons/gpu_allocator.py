@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+
+from cc_core.commons.gpu_info import InsufficientGPUError, match_gpus
+
+
+class GPUAllocation:
+    """
+    The devices held by one batch. Can be used as context manager, which releases the devices on exit.
+    """
+    def __init__(self, allocator, devices):
+        """
+        :param allocator: The allocator, that allocated the devices
+        :type allocator: GPUAllocator
+        :param devices: The allocated devices. The i-th device is used for the i-th requirement.
+        :type devices: list[GPUDevice]
+        """
+        self._allocator = allocator
+        self.devices = devices
+
+    def device_ids(self):
+        """
+        Returns the ids of the allocated devices, as used by the gpus argument of
+        cc_core.commons.docker_utils.create_container_with_gpus().
+
+        :return: A list of device ids
+        :rtype: list
+        """
+        return [device.device_id for device in self.devices]
+
+    def release(self):
+        """
+        Gives the devices back to the allocator.
+        """
+        self._allocator.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def __repr__(self):
+        return 'GPUAllocation(devices={})'.format(self.devices)
+
+
+class GPUAllocator:
+    """
+    Keeps track of the devices of a gpu inventory, that are held by running batches.
+
+    acquire() atomically assigns free devices to all requirements of a batch (using match_gpus) or waits until they are
+    released. Waiting batches are served in the order of their acquire() calls, so batches with many or large
+    requirements are not starved by smaller batches. The allocator records the busy time of every device.
+    """
+    def __init__(self, devices, clock=time.monotonic):
+        """
+        :param devices: The gpu inventory
+        :type devices: list[GPUDevice]
+        :param clock: A function returning the current time in seconds, that is used for usage metrics
+        """
+        self._devices = list(devices)
+        self._clock = clock
+        self._condition = threading.Condition()
+
+        # indices of devices, that are not allocated
+        self._free = set(range(len(self._devices)))
+        # maps active allocations to the indices of their devices
+        self._allocations = {}
+        # tickets of waiting acquire() calls in order of arrival
+        self._queue = deque()
+
+        self._busy_since = {}
+        self._busy_time = [0.0] * len(self._devices)
+        self._allocation_counts = [0] * len(self._devices)
+
+    def acquire(self, requirements, timeout=None):
+        """
+        Allocates devices for the given requirements. Blocks until sufficient devices are free and all earlier acquire()
+        calls are served.
+
+        :param requirements: The gpu requirements of a batch
+        :type requirements: list[GPURequirement]
+        :param timeout: The maximal number of seconds to wait. If None, waits until the devices are available. If 0, does
+                        not wait.
+        :type timeout: float
+        :return: The allocation holding the devices
+        :rtype: GPUAllocation
+        :raise InsufficientGPUError: If the requirements can not be fulfilled by the inventory at all or if the devices
+                                     could not be acquired within timeout seconds
+        """
+        # raises an InsufficientGPUError, if the requirements could never be fulfilled
+        match_gpus(self._devices, requirements)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        ticket = object()
+
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] is ticket:
+                        devices = self._match_free_devices(requirements)
+                        if devices is not None:
+                            return self._allocate(devices)
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise InsufficientGPUError(
+                            'Could not acquire gpus for {} within {} seconds.'.format(requirements, timeout)
+                        )
+                    self._condition.wait(remaining)
+            finally:
+                self._queue.remove(ticket)
+                # the next waiting call might be served now
+                self._condition.notify_all()
+
+    def release(self, allocation):
+        """
+        Gives the devices of the given allocation back.
+
+        :param allocation: An allocation returned by acquire()
+        :type allocation: GPUAllocation
+        :raise ValueError: If the allocation is not active
+        """
+        with self._condition:
+            indices = self._allocations.pop(allocation, None)
+            if indices is None:
+                raise ValueError('{} is not an active allocation of this allocator'.format(allocation))
+
+            now = self._clock()
+            for index in indices:
+                self._busy_time[index] += now - self._busy_since.pop(index)
+                self._free.add(index)
+
+            self._condition.notify_all()
+
+    def usage(self):
+        """
+        Returns usage metrics of all devices.
+
+        :return: A list containing a dictionary for every device of the inventory with the keys 'device' (the
+                 GPUDevice), 'busy' (whether the device is currently allocated), 'busyTime' (the number of seconds the
+                 device was allocated, including the current allocation) and 'allocations' (the number of allocations)
+        :rtype: list[dict]
+        """
+        with self._condition:
+            now = self._clock()
+            usage = []
+            for index, device in enumerate(self._devices):
+                busy_since = self._busy_since.get(index)
+                busy_time = self._busy_time[index]
+                if busy_since is not None:
+                    busy_time += now - busy_since
+                usage.append({
+                    'device': device,
+                    'busy': busy_since is not None,
+                    'busyTime': busy_time,
+                    'allocations': self._allocation_counts[index]
+                })
+            return usage
+
+    def free_devices(self):
+        """
+        :return: The devices, that are currently not allocated, in the order of the inventory
+        :rtype: list[GPUDevice]
+        """
+        with self._condition:
+            return [self._devices[index] for index in sorted(self._free)]
+
+    def waiting(self):
+        """
+        :return: The number of acquire() calls, that are waiting for devices
+        :rtype: int
+        """
+        with self._condition:
+            return len(self._queue)
+
+    def _match_free_devices(self, requirements):
+        free_indices = sorted(self._free)
+        try:
+            devices = match_gpus([self._devices[index] for index in free_indices], requirements)
+        except InsufficientGPUError:
+            return None
+        return devices
+
+    def _allocate(self, devices):
+        indices = [self._index_of(device) for device in devices]
+        allocation = GPUAllocation(self, devices)
+
+        now = self._clock()
+        for index in indices:
+            self._free.remove(index)
+            self._busy_since[index] = now
+            self._allocation_counts[index] += 1
+
+        self._allocations[allocation] = indices
+        return allocation
+
+    def _index_of(self, device):
+        for index, inventory_device in enumerate(self._devices):
+            if inventory_device is device:
+                return index
+        raise ValueError('{} is not part of the inventory'.format(device))
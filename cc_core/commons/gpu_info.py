@@ -144,12 +144,16 @@ def match_gpus(available_devices, requirements):
     Determines sufficient GPUs for the given requirements and returns a list of GPUDevices.
     If there aren't sufficient GPUs a InsufficientGPUError is thrown.
 
+    Devices are assigned, so that all requirements are fulfilled, whenever such an assignment exists, and the sum of
+    vram of the used devices is minimal. This way small requirements do not take large devices, that are needed by other
+    requirements or later batches.
+
     :param available_devices: A list of GPUDevices
     :type available_devices: List[GPUDevice]
     :param requirements: A list of GPURequirements
     :type requirements: List[GPURequirement]
 
-    :return: A list of sufficient devices
+    :return: A list of sufficient devices. The i-th device is used for the i-th requirement.
     :rtype: list[GPUDevice]
 
     :raise InsufficientGPUError: If no devices could be found or insufficient GPUs were found
@@ -161,19 +165,116 @@ def match_gpus(available_devices, requirements):
     if not available_devices:
         raise InsufficientGPUError("No GPU devices available, but {} devices required.".format(len(requirements)))
 
-    available_devices = available_devices.copy()
+    assignment = None
+    if len(requirements) <= len(available_devices):
+        if len({req.vendor for req in requirements}) == 1:
+            assignment = _best_fit_assignment(available_devices, requirements)
+        else:
+            assignment = _min_vram_assignment(available_devices, requirements)
+
+    if assignment is None:
+        raise InsufficientGPUError("Not all GPU requirements could be fulfilled.")
+
+    return [available_devices[device_index] for device_index in assignment]
+
+
+def _best_fit_assignment(devices, requirements):
+    """
+    Assigns the smallest sufficient device to every requirement, starting with the requirement with the largest vram.
 
-    used_devices = []
+    If all requirements have the same vendor, the sets of sufficient devices of the requirements are nested, so this
+    assignment is found, whenever an assignment exists, and its sum of vram is minimal.
 
-    for req in requirements:
-        dev = search_device(req, available_devices)
-        if dev:
-            used_devices.append(dev)
-            available_devices.remove(dev)
+    :return: A list containing the index of the assigned device for every requirement or None, if no assignment exists
+    """
+    requirement_order = sorted(range(len(requirements)), key=lambda i: requirements[i].min_vram or 0, reverse=True)
+    device_order = sorted(range(len(devices)), key=lambda j: (devices[j].vram, j))
+
+    assignment = [None] * len(requirements)
+    used = [False] * len(devices)
+    for i in requirement_order:
+        for j in device_order:
+            if not used[j] and requirements[i].is_sufficient(devices[j]):
+                assignment[i] = j
+                used[j] = True
+                break
         else:
-            raise InsufficientGPUError("Not all GPU requirements could be fulfilled.")
+            return None
+
+    return assignment
+
 
-    return used_devices
+def _min_vram_assignment(devices, requirements):
+    """
+    Finds an assignment of devices to requirements with minimal sum of vram using the hungarian algorithm. Insufficient
+    devices get a cost, that is higher than the sum of vram of all devices, so they are only used, if no assignment
+    with sufficient devices exists.
+
+    :return: A list containing the index of the assigned device for every requirement or None, if no assignment exists
+    """
+    n = len(requirements)
+    m = len(devices)
+    insufficient_cost = sum(device.vram for device in devices) + 1
+    costs = [
+        [device.vram if requirement.is_sufficient(device) else insufficient_cost for device in devices]
+        for requirement in requirements
+    ]
+
+    # potentials of rows (requirements) and columns (devices) and the row assigned to each column. Index 0 is a virtual
+    # column, rows and columns are indexed starting with 1.
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    assigned_row = [0] * (m + 1)
+    way = [0] * (m + 1)
+
+    for row in range(1, n + 1):
+        assigned_row[0] = row
+        column = 0
+        min_values = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+
+        while True:
+            used[column] = True
+            current_row = assigned_row[column]
+            delta = float('inf')
+            next_column = None
+            for j in range(1, m + 1):
+                if not used[j]:
+                    reduced_cost = costs[current_row - 1][j - 1] - u[current_row] - v[j]
+                    if reduced_cost < min_values[j]:
+                        min_values[j] = reduced_cost
+                        way[j] = column
+                    if min_values[j] < delta:
+                        delta = min_values[j]
+                        next_column = j
+
+            for j in range(m + 1):
+                if used[j]:
+                    u[assigned_row[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_values[j] -= delta
+
+            column = next_column
+            if assigned_row[column] == 0:
+                break
+
+        # flip the augmenting path
+        while column != 0:
+            previous_column = way[column]
+            assigned_row[column] = assigned_row[previous_column]
+            column = previous_column
+
+    assignment = [None] * n
+    for j in range(1, m + 1):
+        if assigned_row[j]:
+            assignment[assigned_row[j] - 1] = j - 1
+
+    for i, j in enumerate(assignment):
+        if costs[i][j] == insufficient_cost:
+            return None
+
+    return assignment
 
 
 def get_gpu_requirements(gpus_reqs):
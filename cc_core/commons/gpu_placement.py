@@ -0,0 +1,192 @@
+"""
+This module places batches with gpu requirements on the gpus of several docker hosts (nodes).
+
+Every batch is placed on a single node, whose free devices fulfil all of its requirements (see
+cc_core.commons.gpu_info.match_gpus). If several nodes can take a batch, a placement strategy chooses one of them:
+
+- best-fit: the node with the least free vram left after the placement, so large free devices stay available for
+  large batches
+- spread: the node with the most free vram left after the placement, which distributes the load over all nodes
+- consolidate: a node, that is already in use, so unused nodes stay empty
+
+A strategy can also be any function, that takes a list of PlacementCandidates and returns one of them.
+
+The placement is a greedy heuristic: every batch is placed once and placements are never revised. It does not guarantee
+the maximal number of placed batches. For example, spreading a single-gpu batch onto the only node with two free
+devices leaves no node for a following two-gpu batch. Placing small batches first (smallest_first) and the best-fit
+strategy usually place more batches.
+"""
+from cc_core.commons.gpu_info import InsufficientGPUError, match_gpus
+
+
+class Placement:
+    """
+    The node and the devices a batch is placed on.
+    """
+    def __init__(self, batch_index, node, devices):
+        """
+        :param batch_index: The index of the batch in the batch queue
+        :type batch_index: int
+        :param node: The node the batch is placed on
+        :param devices: The devices of the node used by the batch. The i-th device is used for the i-th requirement.
+        :type devices: list[GPUDevice]
+        """
+        self.batch_index = batch_index
+        self.node = node
+        self.devices = devices
+
+    def device_ids(self):
+        """
+        :return: The ids of the devices as used by create_container_with_gpus()
+        """
+        return [device.device_id for device in self.devices]
+
+    def __repr__(self):
+        return 'Placement(batch_index={} node="{}" devices={})'.format(self.batch_index, self.node, self.devices)
+
+
+class PlacementCandidate:
+    """
+    A node, that can take a batch, with the devices the batch would use.
+    """
+    def __init__(self, node, devices, free_devices, allocated_count):
+        """
+        :param node: The node
+        :param devices: The devices the batch would use, as returned by match_gpus
+        :type devices: list[GPUDevice]
+        :param free_devices: The free devices of the node before the placement
+        :type free_devices: list[GPUDevice]
+        :param allocated_count: The number of devices of the node, that are used by already placed batches, including
+                                allocations made before place_batches() was called
+        :type allocated_count: int
+        """
+        self.node = node
+        self.devices = devices
+        self.free_devices = free_devices
+        self.allocated_count = allocated_count
+
+    def used_vram(self):
+        return sum(device.vram for device in self.devices)
+
+    def remaining_vram(self):
+        """
+        :return: The free vram of the node after the placement
+        """
+        return sum(device.vram for device in self.free_devices) - self.used_vram()
+
+
+def best_fit(candidates):
+    """
+    Chooses the candidate using the least vram, preferring nodes with less free vram left.
+    """
+    return min(candidates, key=lambda c: (c.used_vram(), c.remaining_vram()))
+
+
+def spread(candidates):
+    """
+    Chooses the candidate with the most free vram left after the placement.
+    """
+    return max(candidates, key=lambda c: (c.remaining_vram(), -c.used_vram()))
+
+
+def consolidate(candidates):
+    """
+    Chooses the node with allocated devices and the least free vram left after the placement. Only if the batch fits on
+    no node in use, the empty node with the most free vram is chosen, so it can take many of the following batches.
+    """
+    return max(candidates, key=_consolidate_key)
+
+
+def _consolidate_key(candidate):
+    if candidate.allocated_count:
+        return 1, -candidate.remaining_vram()
+    return 0, candidate.remaining_vram()
+
+
+PLACEMENT_STRATEGIES = {
+    'best-fit': best_fit,
+    'spread': spread,
+    'consolidate': consolidate
+}
+
+
+def place_batches(node_devices, batch_requirements, strategy='best-fit', smallest_first=False,
+                  allocated_counts=None):
+    """
+    Places the given batches on the devices of the given nodes.
+
+    Batches are placed greedily in the order of the queue. A batch, that does not fit on any node, is skipped and the
+    following batches are still placed, so no free devices are wasted because of a single large batch. As placements
+    are never revised, the number of placed batches is not guaranteed to be maximal (see the module docstring).
+
+    :param node_devices: Maps nodes (e.g. host names) to the list of their free GPUDevices
+    :type node_devices: dict
+    :param allocated_counts: Maps nodes to the number of their devices, that are already in use by earlier placements
+                             and are not contained in node_devices. Strategies like consolidate use these counts to
+                             prefer busy nodes. Missing nodes are treated as unused.
+    :type allocated_counts: dict
+    :param batch_requirements: The batch queue as list containing the GPURequirements of every batch (see
+                               cc_core.commons.gpu_info.get_gpu_requirements)
+    :type batch_requirements: list[list[GPURequirement]]
+    :param strategy: The name of a strategy in PLACEMENT_STRATEGIES or a function, that takes a list of
+                     PlacementCandidates and returns the chosen candidate
+    :param smallest_first: If True, batches with fewer and smaller requirements are placed first, which maximizes the
+                           number of placed batches, but does not keep the order of the queue
+    :type smallest_first: bool
+    :return: A tuple (placements, unplaced), where placements is a list of Placements in the order they were made and
+             unplaced is the list of indices of batches, that could not be placed
+    :rtype: tuple[list[Placement], list[int]]
+    :raise ValueError: If the given strategy is unknown
+    """
+    if not callable(strategy):
+        try:
+            strategy = PLACEMENT_STRATEGIES[strategy]
+        except KeyError:
+            raise ValueError('unknown placement strategy "{}". Use one of {}'
+                             .format(strategy, list(PLACEMENT_STRATEGIES)))
+
+    free_devices = {node: list(devices) for node, devices in node_devices.items()}
+    if allocated_counts is None:
+        allocated_counts = {}
+    allocated_counts = {node: allocated_counts.get(node, 0) for node in node_devices}
+
+    batch_order = list(range(len(batch_requirements)))
+    if smallest_first:
+        batch_order.sort(key=lambda i: _batch_size(batch_requirements[i]))
+
+    placements = []
+    unplaced = []
+    for batch_index in batch_order:
+        requirements = batch_requirements[batch_index]
+
+        candidates = []
+        for node, devices in free_devices.items():
+            try:
+                matched_devices = match_gpus(devices, requirements)
+            except InsufficientGPUError:
+                continue
+            candidates.append(PlacementCandidate(node, matched_devices, devices, allocated_counts[node]))
+
+        if not candidates:
+            unplaced.append(batch_index)
+            continue
+
+        chosen = strategy(candidates)
+        node_free_devices = free_devices[chosen.node]
+        for device in chosen.devices:
+            _remove_device(node_free_devices, device)
+        allocated_counts[chosen.node] += len(chosen.devices)
+        placements.append(Placement(batch_index, chosen.node, chosen.devices))
+
+    return placements, sorted(unplaced)
+
+
+def _batch_size(requirements):
+    return len(requirements), sum(requirement.min_vram or 0 for requirement in requirements)
+
+
+def _remove_device(devices, device):
+    for index, free_device in enumerate(devices):
+        if free_device is device:
+            del devices[index]
+            return
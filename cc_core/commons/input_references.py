@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from cc_core.commons.exceptions import InvalidInputReference, ParsingError
 from cc_core.commons.parsing import split_into_parts, split_into_parts_with_separators
 
@@ -7,6 +9,9 @@ INDEX_SEPARATOR_SYMBOLS = ['[', ']']
 INPUT_REFERENCE_START = '$('
 INPUT_REFERENCE_END = ')'
 
+# number of compiled input references and compiled strings with input references kept in memory
+INPUT_REFERENCE_CACHE_SIZE = 1024
+
 
 def _resolve_keys_from_parts(inputs_to_reference, key_list):
     """
@@ -165,39 +170,124 @@ def _build_reference_parts(reference):
     return parts
 
 
-def resolve_input_reference(reference, inputs_to_reference):
+@lru_cache(maxsize=INPUT_REFERENCE_CACHE_SIZE)
+def compile_input_reference(reference):
     """
-    Replaces a given input_reference by a string extracted from inputs_to_reference.
+    Parses the given input reference into the keys, that are used to look up its value in the inputs. The result is
+    cached, so every input reference is only parsed once.
 
-    :param reference: The input reference to resolve.
-    :param inputs_to_reference: A dictionary containing information about the given inputs.
-
-    :raise InvalidInputReference: If the given input reference could not be resolved.
+    Example:
+    compile_input_reference('$(inputs.a_file["basename"])') == ('a_file', 'basename')
+    compile_input_reference('$(inputs.a_file[0].basename)') == ('a_file', 0, 'basename')
 
-    :return: A string which is the resolved input reference.
+    :param reference: The input reference to compile
+    :raise InvalidInputReference: If the given input reference is malformed
+    :return: A tuple of dictionary keys (str) and list indices (int)
     """
-    original_reference = reference
-
     parts = _build_reference_parts(reference)
 
     if len(parts) < 2:
         raise InvalidInputReference('InputReference should at least contain "$(inputs.<identifier>)". The following '
-                                    'input reference does not comply with it:\n{}'.format(original_reference))
+                                    'input reference does not comply with it:\n{}'.format(reference))
     elif parts[0] != "inputs":
         raise InvalidInputReference('InputReference should begin with "inputs". The following input reference does not '
-                                    'comply with it:\n{}'.format(original_reference))
+                                    'comply with it:\n{}'.format(reference))
 
     # remove 'inputs'
     parts = parts[1:]
 
-    parts = _create_array_indices(parts)
+    return tuple(_create_array_indices(parts))
 
+
+def _resolve_compiled_input_reference(reference, keys, inputs_to_reference):
     try:
-        resolved = _resolve_keys_from_parts(inputs_to_reference, parts)
+        return _resolve_keys_from_parts(inputs_to_reference, keys)
     except InvalidInputReference as e:
-        raise InvalidInputReference('Could not resolve input reference "{}".\n{}'.format(original_reference, str(e)))
+        raise InvalidInputReference('Could not resolve input reference "{}".\n{}'.format(reference, str(e)))
+
+
+def resolve_input_reference(reference, inputs_to_reference):
+    """
+    Replaces a given input_reference by a string extracted from inputs_to_reference.
+
+    :param reference: The input reference to resolve.
+    :param inputs_to_reference: A dictionary containing information about the given inputs.
+
+    :raise InvalidInputReference: If the given input reference could not be resolved.
+
+    :return: A string which is the resolved input reference.
+    """
+    keys = compile_input_reference(reference)
+    return _resolve_compiled_input_reference(reference, keys, inputs_to_reference)
+
+
+class CompiledInputReferences:
+    """
+    A string with input references, that is split and parsed once and can be resolved against many inputs.
+    """
+    def __init__(self, to_resolve):
+        """
+        :param to_resolve: The string containing input references
+        :raise InvalidInputReference: If the string could not be split into normal strings and input references
+        """
+        self.to_resolve = to_resolve
+
+        # list of tuples (text, reference, keys, error). For normal strings reference is None. If an input reference is
+        # malformed, the error type and message are kept and the error is raised, when the reference is resolved. This
+        # way errors are raised in the same order as by resolving each reference directly.
+        self._parts = []
+        for part in split_input_references(to_resolve):
+            if is_input_reference(part):
+                try:
+                    self._parts.append((None, part, compile_input_reference(part), None))
+                except (InvalidInputReference, ParsingError) as e:
+                    self._parts.append((None, part, None, (type(e), str(e))))
+            else:
+                self._parts.append((part, None, None, None))
+
+    def resolve(self, inputs_to_reference):
+        """
+        Resolves the input references of this string by using the given inputs_to_reference.
+
+        :param inputs_to_reference: Inputs which are used to resolve input references
+        :raise InvalidInputReference: If an input reference could not be resolved
+        :return: A string in which the input references are replaced with actual values
+        """
+        result = []
+
+        for text, reference, keys, error in self._parts:
+            if reference is None:
+                result.append(text)
+            elif error is not None:
+                error_type, message = error
+                raise error_type(message)
+            else:
+                result.append(str(_resolve_compiled_input_reference(reference, keys, inputs_to_reference)))
+
+        return ''.join(result)
 
-    return resolved
+    def resolve_many(self, inputs_list):
+        """
+        Resolves the input references of this string for every given inputs dictionary.
+
+        :param inputs_list: An iterable of inputs dictionaries
+        :raise InvalidInputReference: If an input reference could not be resolved for one of the inputs
+        :return: A list of resolved strings in the order of inputs_list
+        """
+        return [self.resolve(inputs_to_reference) for inputs_to_reference in inputs_list]
+
+
+@lru_cache(maxsize=INPUT_REFERENCE_CACHE_SIZE)
+def compile_input_references(to_resolve):
+    """
+    Returns a CompiledInputReferences object for the given string. The result is cached, so the same string is split
+    and parsed only once.
+
+    :param to_resolve: The string containing input references
+    :raise InvalidInputReference: If the string could not be split into normal strings and input references
+    :rtype: CompiledInputReferences
+    """
+    return CompiledInputReferences(to_resolve)
 
 
 def resolve_input_references(to_resolve, inputs_to_reference):
@@ -214,15 +304,4 @@ def resolve_input_references(to_resolve, inputs_to_reference):
 
     :return: A string in which the input references are replaced with actual values.
     """
-    split_references = split_input_references(to_resolve)
-
-    result = []
-
-    for part in split_references:
-        if is_input_reference(part):
-            resolved = resolve_input_reference(part, inputs_to_reference)
-            result.append(str(resolved))
-        else:
-            result.append(part)
-
-    return ''.join(result)
+    return compile_input_references(to_resolve).resolve(inputs_to_reference)
@@ -3,25 +3,27 @@ from cc_core.commons.exceptions import ParsingError
 
 def _partition_all_internal(s, sep):
     """
-    Uses str.partition() to split every occurrence of sep in s. The returned list does not contain empty strings.
+    Splits s at every occurrence of sep like repeated calls of str.partition() would do. The separators are kept as
+    parts of their own. The returned list does not contain empty strings.
+
+    The string is split in one pass by str.split(), so the runtime is linear in the length of s.
 
     :param s: The string to split.
     :param sep: A separator string.
+    :raise ValueError: If sep is empty
     :return: A list of parts split by sep
     """
-    parts = list(s.partition(sep))
-
-    # if sep found
-    if parts[1] == sep:
-        new_parts = partition_all(parts[2], sep)
-        parts.pop()
-        parts.extend(new_parts)
-        return [p for p in parts if p]
-    else:
-        if parts[0]:
-            return [parts[0]]
-        else:
-            return []
+    split_parts = s.split(sep)
+
+    parts = []
+    if split_parts[0]:
+        parts.append(split_parts[0])
+    for split_part in split_parts[1:]:
+        parts.append(sep)
+        if split_part:
+            parts.append(split_part)
+
+    return parts
 
 
 def partition_all(s, sep):
@@ -35,12 +37,11 @@ def partition_all(s, sep):
     """
     if isinstance(sep, list):
         parts = _partition_all_internal(s, sep[0])
-        sep = sep[1:]
 
-        for s in sep:
+        for single_sep in sep[1:]:
             tmp = []
             for p in parts:
-                tmp.extend(_partition_all_internal(p, s))
+                tmp.extend(_partition_all_internal(p, single_sep))
             parts = tmp
 
         return parts
@@ -1,12 +1,13 @@
 import itertools
 import os
+import re
 
-import jsonschema
-from jsonschema.exceptions import ValidationError
-
+from cc_core.commons import schema_map
+from cc_core.commons.schema_map import jsonschema_validation_error
+from cc_core.commons.fingerprint import has_only_string_keys
 from cc_core.commons.red_to_blue import InputType, OutputType
+from cc_core.commons.schemas import PATTERN_KEY
 from cc_core.version import RED_VERSION
-from cc_core.commons.schemas.red import red_schema
 from cc_core.commons.exceptions import ArgumentError, RedValidationError, CWLSpecificationError
 from cc_core.commons.exceptions import RedSpecificationError
 
@@ -20,6 +21,9 @@ SEND_RECEIVE_DIRECTORY_SPEC_KWARGS = []
 SEND_RECEIVE_DIRECTORY_VALIDATE_SPEC_ARGS = ['access']
 SEND_RECEIVE_DIRECTORY_VALIDATE_SPEC_KWARGS = []
 
+# number of batches per shard for parallel validation, if the number of batches is unknown
+VALIDATION_SHARD_SIZE = 1000
+
 
 # def _red_listing_validation(listing):
 #     """
@@ -134,17 +138,18 @@ class CliJobPair:
         #             )
 
 
-def _create_cli_job_pairs(red_data, ignore_outputs):
+def _iter_cli_job_pairs(red_data, ignore_outputs):
     """
-    Creates one list for all input cli_job pairs and one for all output cli_job pairs given in red data and returns them
-    as tuple. If ignore_outputs is True, the output cli_job pair list is empty.
+    Yields the CliJobPairs given in red data one at a time. For every batch the input cli job pairs are yielded first,
+    followed by the output cli job pairs. If ignore_outputs is True, no output cli job pairs are yielded.
+
+    Because the pairs are created lazily, a caller, that checks every pair as it is produced, stops at the first invalid
+    batch without creating the pairs of the following batches.
 
     :param red_data: The red data to get cli job pairs from
     :param ignore_outputs: Whether to ignore outputs or not
-    :return: A tuple(input_cli_job_pairs, output_cli_job_pairs) with:
-    input_cli_job_pairs: A list of all CliJobPairs given in the input section of red_data
-    output_cli_job_pairs: A list of all CliJobPairs given in the output section of red_data
-    :rtype: Tuple[List[CliJobPair], List[CliJobPair]]
+    :return: A generator of CliJobPairs
+    :rtype: Iterator[CliJobPair]
     :raise RedSpecificationError: If there is a job value, but no corresponding cli description
     """
     batches = red_data.get('batches')
@@ -154,13 +159,12 @@ def _create_cli_job_pairs(red_data, ignore_outputs):
             'outputs': red_data.get('outputs')
         }]
 
-    input_cli_job_pairs = []
-
-    # input cli job pairs
     cli_inputs = red_data['cli']['inputs']
+    cli_outputs = None if ignore_outputs else red_data['cli']['outputs']
+
     for batch in batches:
         job_inputs = batch['inputs']
-        input_keys = set.union(set(batch['inputs'].keys()), set(cli_inputs.keys()))
+        input_keys = set.union(set(job_inputs.keys()), set(cli_inputs.keys()))
 
         for input_key in input_keys:
             if input_key not in cli_inputs:
@@ -168,35 +172,40 @@ def _create_cli_job_pairs(red_data, ignore_outputs):
                     'Input key "{}" is used in job description, but is not given in cli description'.format(input_key)
                 )
 
-            input_cli_job_pair = CliJobPair(input_key, True, cli_inputs[input_key], job_inputs.get(input_key))
-            input_cli_job_pairs.append(input_cli_job_pair)
+            yield CliJobPair(input_key, True, cli_inputs[input_key], job_inputs.get(input_key))
 
-    output_cli_job_pairs = []
+        if ignore_outputs:
+            continue
 
-    # output cli job pairs
-    if not ignore_outputs:
-        cli_outputs = red_data['cli']['outputs']
+        job_outputs = batch.get('outputs')
+        if job_outputs is None:
+            continue
+        output_keys = set.union(set(job_outputs.keys()), set(cli_outputs.keys()))
 
-        for batch in batches:
-            job_outputs = batch.get('outputs')
-            if job_outputs is None:
-                continue
-            output_keys = set.union(set(batch['outputs'].keys()), set(cli_outputs.keys()))
+        for output_key in output_keys:
+            if output_key not in cli_outputs:
+                raise RedSpecificationError(
+                    'Output key "{}" is used in job description, but is not given in cli description'
+                    .format(output_key)
+                )
 
-            for output_key in output_keys:
-                if output_key not in cli_outputs:
-                    raise RedSpecificationError(
-                        'Output key "{}" is used in job description, but is not given in cli description'
-                        .format(output_key)
-                    )
+            yield CliJobPair(output_key, False, cli_outputs[output_key], job_outputs.get(output_key))
 
-                output_cli_job_pair = CliJobPair(output_key, False, cli_outputs[output_key], job_outputs.get(output_key))
-                output_cli_job_pairs.append(output_cli_job_pair)
 
-    return input_cli_job_pairs, output_cli_job_pairs
+def _check_cli_job_pairs(red_data, ignore_outputs):
+    """
+    Checks whether the types of the job values in red data fit to the cli description. Stops at the first error.
+
+    :param red_data: The red data to check
+    :param ignore_outputs: Whether to ignore outputs or not
+    :raise RedSpecificationError: If a job value does not fit to the cli description
+    """
+    for cli_job_pair in _iter_cli_job_pairs(red_data, ignore_outputs):
+        cli_job_pair.check_type()
+        cli_job_pair.check_directory_listing()
 
 
-def red_validation(red_data, ignore_outputs, container_requirement=False):
+def red_validation(red_data, ignore_outputs, container_requirement=False, processes=None, chunk_size=None):
     """
     Checks the given red data. The process implements the following steps:
 
@@ -212,26 +221,22 @@ def red_validation(red_data, ignore_outputs, container_requirement=False):
     :param red_data: The red data to check
     :param ignore_outputs: Whether the outputs section should be ignored
     :param container_requirement: If True, this function checks, if there is a container section in the red file
+    :param processes: If greater than 1, the batches are validated in shards by a pool of worker processes. The error
+                      of the first invalid batch is raised.
+    :param chunk_size: The number of batches per shard, if processes is greater than 1
     :raise RedValidationError, RedSpecificationError, CWLSpecificationError: If the red data is not valid
     """
-    check_keys_are_strings(red_data)
+    if processes is not None and processes > 1 and red_data.get('batches') is not None:
+        _parallel_batch_validation(red_data, ignore_outputs, processes, chunk_size)
+    elif not _batch_shape_validation(red_data, ignore_outputs):
+        check_keys_are_strings(red_data)
 
-    try:
-        jsonschema.validate(red_data, red_schema)
-    except ValidationError as e:
-        where = '/'.join([str(s) for s in e.absolute_path]) if e.absolute_path else '/'
-        raise RedValidationError(
-            'REDFILE does not comply with jsonschema:\n\tkey in red file: {}\n\treason: {}'.format(where, e.message)
-        )
-
-    _check_red_version(red_data['redVersion'])
+        _red_schema_validation(red_data)
 
-    input_cli_job_pairs, output_cli_job_pairs = _create_cli_job_pairs(red_data, ignore_outputs)
+        _check_red_version(red_data['redVersion'])
 
-    # check whether types of job data do fit to cli description
-    for cli_job_pair in itertools.chain(input_cli_job_pairs, output_cli_job_pairs):
-        cli_job_pair.check_type()
-        cli_job_pair.check_directory_listing()
+        # check whether types of job data do fit to cli description
+        _check_cli_job_pairs(red_data, ignore_outputs)
 
     if container_requirement:
         if not red_data.get('container'):
@@ -240,6 +245,200 @@ def red_validation(red_data, ignore_outputs, container_requirement=False):
     _check_output_glob(red_data)
 
 
+def _batch_shape_validation(red_data, ignore_outputs):
+    """
+    Tries to accept the batches of the given red data without validating every batch against the red schema.
+
+    The red data without batches is validated as usual. Every batch is compared to a BatchShape derived from the cli
+    description. Only batches, that do not match this shape, are validated with the red batch schema and the type
+    checks of CliJobPair.
+
+    This function never raises an error for invalid red data. If it returns False, the red data has to be validated by
+    the usual steps, which report the same errors as before.
+
+    :param red_data: The red data to validate
+    :param ignore_outputs: Whether the outputs section should be ignored
+    :return: True, if the red data is known to pass all checks up to the type checks, otherwise False
+    """
+    batches = red_data.get('batches')
+    if batches is None:
+        return False
+
+    red_data_without_batches = dict(red_data)
+    red_data_without_batches['batches'] = []
+
+    try:
+        check_keys_are_strings(red_data_without_batches)
+    except RedSpecificationError:
+        return False
+
+    if not schema_map.is_valid(red_data_without_batches, 'red'):
+        return False
+
+    if red_data['redVersion'] != RED_VERSION:
+        return False
+
+    cli_description = red_data['cli']
+    batch_shape = BatchShape(cli_description)
+
+    for batch in batches:
+        if batch_shape.matches(batch):
+            continue
+
+        try:
+            check_keys_are_strings(batch)
+            if not schema_map.is_valid(batch, 'red-batch'):
+                return False
+
+            _check_cli_job_pairs({'cli': cli_description, 'batches': [batch]}, ignore_outputs)
+        except (RedSpecificationError, RedValidationError):
+            return False
+
+    return True
+
+
+class _BatchValidator:
+    """
+    Validates single batches of a red file, whose red data without batches is already validated.
+    """
+    def __init__(self, cli_description, ignore_outputs):
+        self._cli_description = cli_description
+        self._ignore_outputs = ignore_outputs
+        self._batch_shape = BatchShape(cli_description)
+
+    def validate(self, batch, batch_index):
+        """
+        :param batch: The batch to validate
+        :param batch_index: The index of the batch in the red file
+        :raise RedValidationError, RedSpecificationError: If the batch is not valid
+        """
+        if self._batch_shape.matches(batch):
+            return
+
+        batch_path = ['batches', str(batch_index)]
+        check_keys_are_strings(batch, batch_path)
+        _schema_validation(batch, 'red-batch', batch_path)
+        _check_cli_job_pairs({'cli': self._cli_description, 'batches': [batch]}, self._ignore_outputs)
+
+
+_worker_batch_validator = None
+
+
+def _init_validation_worker(cli_description, ignore_outputs):
+    """
+    Initializes a worker process for parallel validation. This way the cli description is transferred to every worker
+    only once instead of once per shard.
+    """
+    global _worker_batch_validator
+    _worker_batch_validator = _BatchValidator(cli_description, ignore_outputs)
+
+
+def _validate_shard(shard):
+    """
+    Validates a shard of batches inside a worker process.
+
+    :param shard: A tuple (start_index, batches), where start_index is the index of the first batch of the shard
+    :return: None, if all batches are valid, otherwise the exception of the first invalid batch
+    """
+    start_index, batches = shard
+    for offset, batch in enumerate(batches):
+        try:
+            _worker_batch_validator.validate(batch, start_index + offset)
+        except (RedValidationError, RedSpecificationError) as e:
+            return e
+    return None
+
+
+def _iter_shards(batches, chunk_size):
+    iterator = iter(batches)
+    start_index = 0
+    while True:
+        shard = list(itertools.islice(iterator, chunk_size))
+        if not shard:
+            return
+        yield start_index, shard
+        start_index += len(shard)
+
+
+def _parallel_batch_validation(red_data, ignore_outputs, processes, chunk_size=None):
+    """
+    Validates the red data without batches and afterwards the batches in a pool of worker processes. The batches are
+    split into contiguous shards. As soon as a shard contains an invalid batch and all previous shards are valid, the
+    error of this batch is raised and the remaining shards are not validated.
+
+    :param red_data: The red data to validate
+    :param ignore_outputs: Whether the outputs section should be ignored
+    :param processes: The number of worker processes
+    :param chunk_size: The number of batches per shard. Defaults to four shards per process.
+    :raise RedValidationError, RedSpecificationError: If the red data is not valid
+    """
+    red_data_without_batches = dict(red_data)
+    red_data_without_batches['batches'] = []
+    check_keys_are_strings(red_data_without_batches)
+    _schema_validation(red_data_without_batches, 'red')
+    _check_red_version(red_data['redVersion'])
+
+    batches = red_data['batches']
+    if chunk_size is None:
+        try:
+            chunk_size = max(1, -(-len(batches) // (processes * 4)))
+        except TypeError:
+            chunk_size = VALIDATION_SHARD_SIZE
+
+    import multiprocessing
+
+    with multiprocessing.Pool(
+            processes, initializer=_init_validation_worker, initargs=(red_data['cli'], ignore_outputs)
+    ) as pool:
+        for error in pool.imap(_validate_shard, _iter_shards(batches, chunk_size)):
+            if error is not None:
+                raise error
+
+
+def _red_schema_validation(red_data):
+    """
+    Validates the given red data against the red schema.
+
+    If the batches of the red data are not given as list (but for example as BatchTable or StreamedBatches), the red
+    data without batches and every batch are validated separately, so that only one batch is held in memory at a time.
+
+    :param red_data: The red data to validate
+    :raise RedValidationError: If the red data does not comply with the red schema
+    """
+    batches = red_data.get('batches')
+    if batches is None or isinstance(batches, list):
+        _schema_validation(red_data, 'red')
+        return
+
+    red_data_without_batches = dict(red_data)
+    red_data_without_batches['batches'] = []
+    _schema_validation(red_data_without_batches, 'red')
+
+    for index, batch in enumerate(batches):
+        batch_path = ['batches', str(index)]
+        check_keys_are_strings(batch, batch_path)
+        _schema_validation(batch, 'red-batch', batch_path)
+
+
+def _schema_validation(data, schema_name, path=None):
+    """
+    Validates the given data against the given schema.
+
+    :param data: The data to validate
+    :param schema_name: The name of the jsonschema in schema_map to validate against
+    :param path: The path of keys as list of strings leading to data inside the red file
+    :raise RedValidationError: If the data does not comply with the schema
+    """
+    try:
+        schema_map.validate(data, schema_name)
+    except jsonschema_validation_error() as e:
+        keys = (path or []) + [str(s) for s in e.absolute_path]
+        where = '/'.join(keys) if keys else '/'
+        raise RedValidationError(
+            'REDFILE does not comply with jsonschema:\n\tkey in red file: {}\n\treason: {}'.format(where, e.message)
+        )
+
+
 def _check_output_glob(red_data):
     """
     Raises an CwlSpecificationError, if a glob is given as absolute path.
@@ -361,7 +560,150 @@ def _check_output_type(output_value, cli_description_type):
         ))
 
 
-def _check_key_is_string(key, path):
+BATCH_KEYS = frozenset(['inputs', 'outputs', 'doc'])
+CONNECTOR_KEYS = frozenset(['command', 'access', 'mount', 'doc'])
+INPUT_FILE_KEYS = frozenset(['class', 'connector', 'basename', 'dirname', 'checksum', 'size', 'doc'])
+INPUT_DIRECTORY_KEYS = frozenset(['class', 'connector', 'basename', 'doc'])
+OUTPUT_FILE_KEYS = frozenset(['class', 'connector', 'checksum', 'size', 'doc'])
+OUTPUT_DIRECTORY_KEYS = frozenset(['class', 'connector', 'doc'])
+
+# the types of optional keys of file and directory values
+FILE_DIRECTORY_FIELD_TYPES = {
+    'basename': str,
+    'dirname': str,
+    'checksum': str,
+    'size': int,
+    'doc': str
+}
+
+
+class BatchShape:
+    """
+    The shape of a batch, that is derived from a cli description. A batch matches this shape, if it contains a value of
+    the declared type for every input and output key and uses only the most common keys for files, directories and
+    connectors.
+
+    A batch, that matches the shape, complies with the red batch schema and passes the type checks of CliJobPair.
+    Batches, that do not match the shape (for example because of listings), may still be valid and have to be validated
+    as usual.
+    """
+    def __init__(self, cli_description):
+        """
+        :param cli_description: The cli description of a red file, that already complies with the red schema
+        """
+        self._input_shapes = []
+        for key, input_description in cli_description['inputs'].items():
+            input_type = InputType.from_string(input_description['type'])
+            self._input_shapes.append((key, input_type.is_optional(), self._create_input_matcher(input_type)))
+        # keys, that do not match PATTERN_KEY, are allowed in the cli description, but not in batches
+        self._input_keys = _pattern_keys(cli_description['inputs'])
+
+        self._output_shapes = []
+        for key, output_description in cli_description['outputs'].items():
+            output_type = OutputType.from_string(output_description['type'])
+            self._output_shapes.append((key, output_type.is_optional(), self._create_output_matcher(output_type)))
+        self._output_keys = _pattern_keys(cli_description['outputs'])
+
+    @staticmethod
+    def _create_input_matcher(input_type):
+        if input_type.is_primitive():
+            python_types = CWL_INPUT_TYPE_TO_PYTHON_TYPE[input_type.input_category]
+
+            def match_value(value):
+                return type(value) in python_types
+        elif input_type.is_file():
+            def match_value(value):
+                return _matches_file_directory(value, 'File', INPUT_FILE_KEYS)
+        else:
+            def match_value(value):
+                return _matches_file_directory(value, 'Directory', INPUT_DIRECTORY_KEYS)
+
+        if not input_type.is_array():
+            return match_value
+
+        def match_array(value):
+            return type(value) is list and all(match_value(v) for v in value)
+
+        return match_array
+
+    @staticmethod
+    def _create_output_matcher(output_type):
+        class_name = output_type.output_category.name
+        keys = OUTPUT_DIRECTORY_KEYS if output_type.is_directory() else OUTPUT_FILE_KEYS
+
+        def match_value(value):
+            return _matches_file_directory(value, class_name, keys)
+
+        return match_value
+
+    def matches(self, batch):
+        """
+        Returns whether the given batch matches this shape.
+
+        :param batch: The batch to check
+        :return: True, if the given batch matches this shape, otherwise False
+        """
+        if type(batch) is not dict or not BATCH_KEYS.issuperset(batch):
+            return False
+        if 'doc' in batch and type(batch['doc']) is not str:
+            return False
+
+        job_inputs = batch.get('inputs')
+        if not _matches_section(job_inputs, self._input_keys, self._input_shapes):
+            return False
+
+        if 'outputs' in batch:
+            return _matches_section(batch['outputs'], self._output_keys, self._output_shapes)
+
+        return True
+
+
+def _pattern_keys(keys):
+    return frozenset(key for key in keys if re.search(PATTERN_KEY, key))
+
+
+def _matches_section(section, keys, shapes):
+    if type(section) is not dict or not keys.issuperset(section):
+        return False
+
+    for key, is_optional, match_value in shapes:
+        value = section.get(key)
+        if value is None:
+            if key in section or not is_optional:
+                return False
+        elif not match_value(value):
+            return False
+
+    return True
+
+
+def _matches_file_directory(value, class_name, keys):
+    if type(value) is not dict or value.get('class') != class_name or not keys.issuperset(value):
+        return False
+
+    for key, field_value in value.items():
+        if key == 'connector':
+            if not _matches_connector(field_value):
+                return False
+        elif key != 'class' and type(field_value) is not FILE_DIRECTORY_FIELD_TYPES[key]:
+            return False
+
+    return 'connector' in value
+
+
+def _matches_connector(connector):
+    if type(connector) is not dict or not CONNECTOR_KEYS.issuperset(connector):
+        return False
+    if type(connector.get('command')) is not str or type(connector.get('access')) is not dict:
+        return False
+    if 'mount' in connector and type(connector['mount']) is not bool:
+        return False
+    if 'doc' in connector and type(connector['doc']) is not str:
+        return False
+    return has_only_string_keys(connector['access'])
+
+
+def check_key_is_string(key, path):
     """
     Raises an RedSpecificationError, if the given key is not of type string.
     :param key: The key to check the type
@@ -390,7 +732,7 @@ def check_keys_are_strings(data, path=None):
 
     if isinstance(data, dict):
         for key, value in data.items():
-            _check_key_is_string(key, path)
+            check_key_is_string(key, path)
             check_keys_are_strings(value, path + [key])
     elif isinstance(data, list):
         for index, value in enumerate(data):
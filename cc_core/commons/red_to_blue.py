@@ -11,11 +11,13 @@ from copy import deepcopy
 from enum import Enum
 from functools import total_ordering
 
+import json
 import os.path
 
 import uuid
 
 from cc_core.commons.exceptions import JobSpecificationError, InvalidInputReference, RedSpecificationError
+from cc_core.commons.fingerprint import canonical_fingerprint
 from cc_core.commons.input_references import resolve_input_references
 
 CONTAINER_OUTPUT_DIR = '/cc/outputs'
@@ -24,39 +26,241 @@ CONTAINER_AGENT_PATH = '/cc/blue_agent.py'
 CONTAINER_BLUE_FILE_PATH = '/cc/blue_file.json'
 BLUE_INPUT_CLASSES = {'File', 'Directory'}
 
+# exceptions caused by invalid batches. Only these exceptions are raised with the index of the failing batch, all other
+# exceptions are raised unchanged.
+CONVERSION_EXCEPTIONS = (JobSpecificationError, InvalidInputReference, RedSpecificationError)
 
-def convert_red_to_blue(red_data):
+# namespace for deterministic, content derived uuids (see default_inputs_dirname)
+DETERMINISTIC_DIRNAME_NAMESPACE = uuid.UUID('2f4c5a0e-5f0b-4b8e-9d6e-3c1a0b7e8d21')
+
+
+def convert_red_to_blue(red_data, deterministic_dirnames=False, collapse_duplicates=False, processes=None,
+                        chunk_size=None):
     """
     Converts the given red data into a list of blue data dictionary. The blue data is always given as list and each list
     entry represents one batch in the red data.
 
     :param red_data: The red data to convert
-    :return: A list of blue data dictionaries
+    :param deterministic_dirnames: If set to True, the input dirnames and stdout/stderr file names are derived from the
+                                   batch content instead of random uuids. Identical batches then produce identical
+                                   blue data.
+    :type deterministic_dirnames: bool
+    :param collapse_duplicates: If set to True, batches with identical inputs and outputs are converted only once. In
+                                this case a tuple (blue_batches, batch_indices) is returned, where batch_indices[i] is
+                                the index of the blue batch, that belongs to the i-th batch of the red data.
+    :type collapse_duplicates: bool
+    :param processes: If set to a number greater than 1, the batches are converted in a pool of this many processes.
+                      The order of the returned blue batches is the same as in serial conversion. In contrast to
+                      serial conversion the batches of the given red data are not altered.
+    :type processes: int
+    :param chunk_size: The number of batches sent to a worker process at once. Only used if processes is given.
+    :type chunk_size: int
+    :return: A list of blue data dictionaries or a tuple (blue_batches, batch_indices), if collapse_duplicates is set
+    :raise JobSpecificationError, InvalidInputReference, RedSpecificationError: If a batch could not be converted. The
+                                                                                message contains the index of the
+                                                                                batch in the red data.
     """
-    blue_batches = []
+    batches = iter_batches(red_data)
+
+    batch_indices = None
+    original_indices = None
+    if collapse_duplicates:
+        batches, batch_indices = collapse_duplicate_batches(batches)
+        original_indices = _first_occurrences(batch_indices)
+
+    if processes is not None and processes > 1:
+        if not isinstance(batches, list):
+            batches = list(batches)
+        blue_batches = _convert_batches_parallel(
+            red_data['cli'], batches, deterministic_dirnames, processes, chunk_size, original_indices
+        )
+    else:
+        converter = BlueBatchConverter(red_data['cli'], deterministic_dirnames)
+        blue_batches = []
+        for index, batch in enumerate(batches):
+            try:
+                blue_batches.append(converter.convert(batch))
+            except CONVERSION_EXCEPTIONS as e:
+                raise _add_batch_index(e, index if original_indices is None else original_indices[index]) from e
 
-    batches = extract_batches(red_data)
+    if collapse_duplicates:
+        return blue_batches, batch_indices
 
-    cli_description = red_data['cli']
-    cli_inputs = cli_description['inputs']
-    cli_outputs = cli_description.get('outputs')
-    cli_stdout = cli_description.get('stdout')
-    cli_stderr = cli_description.get('stderr')
+    return blue_batches
 
-    cli_arguments = get_cli_arguments(cli_inputs)
-    base_command = produce_base_command(cli_description.get('baseCommand'))
 
-    for batch in batches:
+class BlueBatchConverter:
+    """
+    A BlueBatchConverter holds everything of a cli description, that is shared by all batches of a red file, and
+    converts single batches into blue batches.
+    """
+    def __init__(self, cli_description, deterministic_dirnames=False):
+        """
+        :param cli_description: The cli section of the red data
+        :param deterministic_dirnames: Whether dirnames and file names should be derived from the batch content
+        """
+        self.cli_inputs = cli_description['inputs']
+        self.cli_outputs = cli_description.get('outputs')
+        self.cli_stdout = cli_description.get('stdout')
+        self.cli_stderr = cli_description.get('stderr')
+        self.deterministic_dirnames = deterministic_dirnames
+
+        self.cli_arguments = get_cli_arguments(self.cli_inputs)
+        self.base_command = produce_base_command(cli_description.get('baseCommand'))
+
+    def convert(self, batch):
+        """
+        Converts the given batch into blue data. Will alter the inputs of the given batch.
+
+        :param batch: A batch as returned by extract_batches()
+        :return: A dictionary containing the blue data
+        """
         batch_inputs = batch['inputs']
-        complete_batch_inputs(batch_inputs, cli_inputs)
-        resolved_cli_outputs = complete_input_references_in_outputs(cli_outputs, batch_inputs)
-        command = generate_command(base_command, cli_arguments, batch)
-        blue_batch = create_blue_batch(command, batch, resolved_cli_outputs, cli_stdout, cli_stderr)
-        blue_batches.append(blue_batch)
+        complete_batch_inputs(batch_inputs, self.cli_inputs, self.deterministic_dirnames)
+        resolved_cli_outputs = complete_input_references_in_outputs(self.cli_outputs, batch_inputs)
+        command = generate_command(self.base_command, self.cli_arguments, batch)
+        return create_blue_batch(
+            command, batch, resolved_cli_outputs, self.cli_stdout, self.cli_stderr, self.deterministic_dirnames
+        )
+
+
+# the converter of a worker process in parallel conversion, see _init_conversion_worker()
+_worker_converter = None
+
+
+def _init_conversion_worker(cli_description, deterministic_dirnames):
+    """
+    Initializes a worker process for parallel conversion. This way the cli description is transferred to every worker
+    only once instead of once per batch.
+    """
+    global _worker_converter
+    _worker_converter = BlueBatchConverter(cli_description, deterministic_dirnames)
+
 
+def _convert_shard(shard):
+    """
+    Converts a shard of batches inside a worker process.
+
+    :param shard: A tuple (batch_indices, batches), where batch_indices contains the index of every batch of the shard
+                  in the red data
+    :return: The list of converted blue batches
+    :raise Exception: The exception of the first failing batch. CONVERSION_EXCEPTIONS contain the batch index in their
+                      message.
+    """
+    batch_indices, batches = shard
+    blue_batches = []
+    for batch_index, batch in zip(batch_indices, batches):
+        try:
+            blue_batches.append(_worker_converter.convert(batch))
+        except CONVERSION_EXCEPTIONS as e:
+            raise _add_batch_index(e, batch_index) from e
     return blue_batches
 
 
+def _add_batch_index(exception, batch_index):
+    """
+    Returns a new exception of the same type as the given exception, whose message names the failing batch.
+
+    :param exception: One of the CONVERSION_EXCEPTIONS, which only take a message as argument
+    :param batch_index: The index of the failing batch in the red data
+    """
+    return type(exception)('Could not convert batch {}:\n{}'.format(batch_index, str(exception)))
+
+
+def _convert_batches_parallel(cli_description, batches, deterministic_dirnames, processes, chunk_size=None,
+                              batch_indices=None):
+    """
+    Converts the given batches in a pool of worker processes. The batches are split into contiguous shards, which are
+    converted by the workers. The order of the returned blue batches matches the order of the given batches.
+
+    :param cli_description: The cli section of the red data
+    :param batches: The batches to convert
+    :param deterministic_dirnames: Whether dirnames and file names should be derived from the batch content
+    :param processes: The number of worker processes
+    :param chunk_size: The number of batches per shard. Defaults to four shards per process.
+    :param batch_indices: The indices of the given batches in the red data, which are used in error messages. Defaults
+                          to the positions of the batches.
+    :return: A list of blue data dictionaries
+    """
+    if not batches:
+        return []
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(batches) // (processes * 4)))
+
+    if batch_indices is None:
+        batch_indices = list(range(len(batches)))
+
+    shards = [
+        (batch_indices[start:start + chunk_size], batches[start:start + chunk_size])
+        for start in range(0, len(batches), chunk_size)
+    ]
+
+    import multiprocessing
+
+    with multiprocessing.Pool(
+            processes, initializer=_init_conversion_worker, initargs=(cli_description, deterministic_dirnames)
+    ) as pool:
+        converted_shards = pool.map(_convert_shard, shards, chunksize=1)
+
+    return [blue_batch for converted_shard in converted_shards for blue_batch in converted_shard]
+
+
+def pack_blue_batches(blue_batches, max_batches=None, max_size=None, max_runtime=None, estimate_runtime=None):
+    """
+    Groups the given blue batches into packs, that can be executed by one blue agent in one container. The order of
+    the blue batches is preserved, so concatenating all packs results in the given list of blue batches.
+
+    A new pack is started, if adding the next blue batch to the current pack would exceed one of the given limits. A
+    blue batch, that exceeds a limit on its own, is put into a pack of its own.
+
+    :param blue_batches: The blue batches to pack
+    :type blue_batches: list[dict]
+    :param max_batches: The maximal number of blue batches in one pack or None
+    :type max_batches: int
+    :param max_size: The maximal size of the json serialized pack in bytes or None
+    :type max_size: int
+    :param max_runtime: The maximal estimated runtime of one pack or None. If given, estimate_runtime is required.
+    :type max_runtime: float
+    :param estimate_runtime: A function, that receives a blue batch and returns its estimated runtime
+    :type estimate_runtime: Callable[[dict], float]
+    :return: A list of packs, each given as list of blue batches
+    :rtype: list[list[dict]]
+    """
+    if max_runtime is not None and estimate_runtime is None:
+        raise ValueError('max_runtime is given, but estimate_runtime is missing')
+
+    packs = []
+    pack = []
+    pack_size = 0
+    pack_runtime = 0
+
+    for blue_batch in blue_batches:
+        # one additional byte for the separating comma
+        batch_size = len(json.dumps(blue_batch).encode('utf-8')) + 1 if max_size is not None else 0
+        batch_runtime = estimate_runtime(blue_batch) if max_runtime is not None else 0
+
+        if pack:
+            exceeds_batches = max_batches is not None and len(pack) + 1 > max_batches
+            exceeds_size = max_size is not None and pack_size + batch_size > max_size
+            exceeds_runtime = max_runtime is not None and pack_runtime + batch_runtime > max_runtime
+
+            if exceeds_batches or exceeds_size or exceeds_runtime:
+                packs.append(pack)
+                pack = []
+                pack_size = 0
+                pack_runtime = 0
+
+        pack.append(blue_batch)
+        pack_size += batch_size
+        pack_runtime += batch_runtime
+
+    if pack:
+        packs.append(pack)
+
+    return packs
+
+
 def _is_blue_input_value(input_value):
     """
     Returns whether the given input value defines a connector.
@@ -92,7 +296,7 @@ def _create_blue_batch_inputs(batch_inputs):
     return blue_batch_inputs
 
 
-def create_blue_batch(command, batch, cli_outputs, cli_stdout=None, cli_stderr=None):
+def create_blue_batch(command, batch, cli_outputs, cli_stdout=None, cli_stderr=None, deterministic_filenames=False):
     """
     Defines a dictionary containing a blue batch
 
@@ -103,6 +307,7 @@ def create_blue_batch(command, batch, cli_outputs, cli_stdout=None, cli_stderr=N
                        batch
     :param cli_stderr: The path where the stderr file should be created. If None cli.stderr it is not added to the blue
                        batch
+    :param deterministic_filenames: If set to True, generated stdout/stderr file names do not depend on random uuids
     :return: A dictionary containing the blue data
     """
     blue_batch_inputs = _create_blue_batch_inputs(batch['inputs'])
@@ -117,10 +322,10 @@ def create_blue_batch(command, batch, cli_outputs, cli_stdout=None, cli_stderr=N
     }
 
     if _outputs_contain_output_type(blue_batch_outputs, 'stdout') and cli_stdout is None:
-        cli_stdout = str(uuid.uuid4())
+        cli_stdout = _generate_filename('stdout', deterministic_filenames)
 
     if _outputs_contain_output_type(blue_batch_outputs, 'stderr') and cli_stderr is None:
-        cli_stderr = str(uuid.uuid4())
+        cli_stderr = _generate_filename('stderr', deterministic_filenames)
 
     # add stdout/stderr file specification
     if cli_stdout is not None:
@@ -132,6 +337,20 @@ def create_blue_batch(command, batch, cli_outputs, cli_stdout=None, cli_stderr=N
     return blue_data
 
 
+def _generate_filename(name, deterministic):
+    """
+    Returns a file name for a generated file like the stdout or stderr file.
+
+    :param name: A name, that identifies the generated file inside a blue batch
+    :param deterministic: If True, the returned file name only depends on name, otherwise a random uuid is returned
+    :return: A uuid string
+    :rtype: str
+    """
+    if deterministic:
+        return str(uuid.uuid5(DETERMINISTIC_DIRNAME_NAMESPACE, name))
+    return str(uuid.uuid4())
+
+
 def _outputs_contain_output_type(blue_batch_outputs, output_type):
     """
     Returns whether the given blue batch outputs contain an output with the given output type.
@@ -644,13 +863,15 @@ def complete_input_references_in_outputs(cli_outputs, inputs_to_reference):
     return resolved_outputs
 
 
-def complete_batch_inputs(batch_inputs, cli_inputs):
+def complete_batch_inputs(batch_inputs, cli_inputs, deterministic_dirnames=False):
     """
     Completes the input attributes of the input files/directories, by adding the attributes:
     path, basename, dirname, nameroot, nameext
 
     :param batch_inputs: a dictionary containing job input information
     :param cli_inputs: a dictionary that contains the cli description
+    :param deterministic_dirnames: If set to True, default dirnames are derived from the input key, the input index and
+                                   the connector access of the input value instead of random uuids
     """
     for input_key, batch_value in batch_inputs.items():
         cli_input = cli_inputs[input_key]
@@ -660,36 +881,52 @@ def complete_batch_inputs(batch_inputs, cli_inputs):
         # complete files
         if input_type.is_file():
             if input_type.is_array():
-                for file_element in batch_value:
-                    complete_file_input_values(input_key, file_element)
+                for index, file_element in enumerate(batch_value):
+                    complete_file_input_values(input_key, file_element, index, deterministic_dirnames)
             else:
-                complete_file_input_values(input_key, batch_value)
+                complete_file_input_values(input_key, batch_value, None, deterministic_dirnames)
 
         # complete directories
         elif input_type.is_directory():
             if input_type.is_array():
-                for directory_element in batch_value:
-                    complete_directory_input_values(input_key, directory_element)
+                for index, directory_element in enumerate(batch_value):
+                    complete_directory_input_values(input_key, directory_element, index, deterministic_dirnames)
             else:
-                complete_directory_input_values(input_key, batch_value)
+                complete_directory_input_values(input_key, batch_value, None, deterministic_dirnames)
 
 
-def default_inputs_dirname():
+def default_inputs_dirname(input_key=None, input_index=None, input_value=None, deterministic=False):
     """
     Returns the default dirname for an input file.
 
+    If deterministic is set, the dirname is derived from a stable hash of input key, input index and the connector
+    access of the given input value, so that identical inputs always get the same dirname. Otherwise a random uuid is
+    used.
+
+    :param input_key: The input key of the input file/directory
+    :param input_index: The index of the input file/directory in case of File/Directory lists, otherwise None
+    :param input_value: The input value with class 'File' or 'Directory'
+    :param deterministic: Whether the dirname should be derived from the given input
     :return: The default dirname for an input file.
     """
-    return os.path.join(CONTAINER_INPUT_DIR, str(uuid.uuid4()))
+    if deterministic:
+        access = input_value.get('connector', {}).get('access') if input_value else None
+        name = json.dumps([input_key, input_index, access], sort_keys=True, separators=(',', ':'))
+        dirname = uuid.uuid5(DETERMINISTIC_DIRNAME_NAMESPACE, name)
+    else:
+        dirname = uuid.uuid4()
+    return os.path.join(CONTAINER_INPUT_DIR, str(dirname))
 
 
-def complete_file_input_values(input_key, input_value):
+def complete_file_input_values(input_key, input_value, input_index=None, deterministic_dirname=False):
     """
     Completes the information inside a given file input value. Will alter the given input_value.
     Creates the following keys (if not already present): path, basename, dirname, nameroot, nameext
 
     :param input_key: An input key as string
     :param input_value: An input value with class 'File'
+    :param input_index: The index of the input value in case of File lists
+    :param deterministic_dirname: Whether the default dirname should be derived from the input value
     """
     # define basename
     if 'basename' in input_value:
@@ -702,7 +939,7 @@ def complete_file_input_values(input_key, input_value):
     if 'dirname' in input_value:
         dirname = input_value['dirname']
     else:
-        dirname = default_inputs_dirname()
+        dirname = default_inputs_dirname(input_key, input_index, input_value, deterministic_dirname)
         input_value['dirname'] = dirname
 
     # define nameroot, nameext
@@ -714,13 +951,15 @@ def complete_file_input_values(input_key, input_value):
     input_value['path'] = os.path.join(dirname, basename)
 
 
-def complete_directory_input_values(input_key, input_value):
+def complete_directory_input_values(input_key, input_value, input_index=None, deterministic_dirname=False):
     """
     Completes the information inside a given directory input value. Will alter the given input_value.
     Creates the following keys (if not already present): path, basename
 
     :param input_key: An input key as string
     :param input_value: An input value with class 'Directory'
+    :param input_index: The index of the input value in case of Directory lists
+    :param deterministic_dirname: Whether the default dirname should be derived from the input value
     """
     # define basename
     if 'basename' in input_value:
@@ -730,7 +969,7 @@ def complete_directory_input_values(input_key, input_value):
         input_value['basename'] = basename
 
     # define path
-    dirname = default_inputs_dirname()
+    dirname = default_inputs_dirname(input_key, input_index, input_value, deterministic_dirname)
     input_value['path'] = os.path.join(dirname, basename)
 
 
@@ -742,24 +981,88 @@ def extract_batches(red_data):
     :param red_data: The red data to extract batches from
     :return: A list of Batches
     """
+    return list(iter_batches(red_data))
+
+
+def iter_batches(red_data):
+    """
+    Yields the batches of the given red data one at a time.
+    The resulting batches always contain an inputs and an outputs key.
+
+    The batches of the red data can be given as list or as any other iterable of batches, like a
+    cc_core.commons.batch_table.BatchTable. In this case only one batch is held in memory at a time.
+
+    :param red_data: The red data to extract batches from
+    :return: An iterator over batches
+    """
     # in case of batches given
     red_batches = red_data.get('batches')
-    if red_batches:
-        batches = []
+    if red_batches is not None:
         for batch in red_batches:
             new_batch = {'inputs': batch['inputs'],
                          'outputs': batch.get('outputs', {})}
-            batches.append(new_batch)
+            remove_null_values(new_batch['inputs'])
+            remove_null_values(new_batch['outputs'])
+            yield new_batch
     else:
         batch = {'inputs': red_data['inputs'],
                  'outputs': red_data.get('outputs', {})}
-        batches = [batch]
-
-    for batch in batches:
         remove_null_values(batch['inputs'])
         remove_null_values(batch['outputs'])
+        yield batch
+
+
+def batch_fingerprint(batch):
+    """
+    Returns a canonical fingerprint of the given batch. Two batches have the same fingerprint, if their inputs and
+    outputs are equal. The order of dictionary keys does not influence the fingerprint.
+
+    :param batch: A batch as returned by extract_batches()
+    :type batch: dict
+    :return: The canonical fingerprint of the batch inputs and outputs as returned by canonical_fingerprint()
+    :rtype: str
+    :raise ValueError: If the batch contains keys, that are not strings, or values, that are not json serializable
+    """
+    return canonical_fingerprint({'inputs': batch['inputs'], 'outputs': batch.get('outputs', {})})
 
-    return batches
+
+def collapse_duplicate_batches(batches):
+    """
+    Removes duplicated batches from the given list of batches. The first occurrence of every batch is kept.
+
+    :param batches: An iterable of batches as returned by iter_batches()
+    :type batches: Iterable[dict]
+    :return: A tuple (unique_batches, batch_indices). unique_batches is the list of unique batches in order of their
+             first occurrence. batch_indices is a list with the same length as batches, where batch_indices[i] is the
+             index of batches[i] inside unique_batches.
+    :rtype: tuple[list[dict], list[int]]
+    """
+    unique_batches = []
+    batch_indices = []
+    fingerprint_indices = {}
+
+    for batch in batches:
+        fingerprint = batch_fingerprint(batch)
+        unique_index = fingerprint_indices.get(fingerprint)
+        if unique_index is None:
+            unique_index = len(unique_batches)
+            fingerprint_indices[fingerprint] = unique_index
+            unique_batches.append(batch)
+        batch_indices.append(unique_index)
+
+    return unique_batches, batch_indices
+
+
+def _first_occurrences(batch_indices):
+    """
+    Returns the index of the first occurrence of every unique batch, given the batch_indices returned by
+    collapse_duplicate_batches().
+    """
+    first_occurrences = []
+    for index, unique_index in enumerate(batch_indices):
+        if unique_index == len(first_occurrences):
+            first_occurrences.append(index)
+    return first_occurrences
 
 
 def remove_null_values(dictionary):
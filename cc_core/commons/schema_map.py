@@ -1,6 +1,8 @@
+import threading
 from collections import OrderedDict
 
-from cc_core.commons.schemas.red import red_schema
+from cc_core.commons.schemas.compiler import compile_schema, SchemaCompilationError
+from cc_core.commons.schemas.red import red_schema, red_batch_schema
 from cc_core.commons.schemas.engines.container import container_engines
 from cc_core.commons.schemas.engines.execution import execution_engines
 
@@ -14,3 +16,140 @@ for e, s in container_engines.items():
 
 for e, s in execution_engines.items():
     schemas['red-engine-execution-{}'.format(e)] = s
+
+# schemas used for validation, that are not listed as red schemas
+_internal_schemas = {
+    'red-batch': red_batch_schema
+}
+
+# names of schemas, that passed check_schema()
+_checked_schemas = set()
+
+# maps schema names to compiled validation functions or None, if the schema could not be compiled
+_compiled_validators = {}
+
+# jsonschema is imported on first use, because it takes a considerable amount of time to import it. Valid instances are
+# mostly accepted by the compiled validation functions, which do not need jsonschema. The compiled schemas are bundled
+# with cc_core and are checked by the tests, so they are not checked with jsonschema at runtime before compilation.
+
+# validators are not thread safe, because the ref resolver keeps a stack of resolution scopes. Every thread gets its
+# own validator instances.
+_thread_validators = threading.local()
+
+
+def get_validator(schema_name):
+    """
+    Returns a jsonschema validator for the schema with the given name. The schema is checked and the validator is built
+    only once per thread and reused for all following calls.
+
+    :param schema_name: The name of the schema as used in schemas (e.g. 'red' or 'red-engine-container-docker')
+    :return: A jsonschema validator instance
+    :raise KeyError: If no schema with the given name exists
+    """
+    validators = getattr(_thread_validators, 'validators', None)
+    if validators is None:
+        validators = {}
+        _thread_validators.validators = validators
+
+    validator = validators.get(schema_name)
+    if validator is None:
+        from jsonschema.validators import validator_for
+
+        schema = _get_schema(schema_name)
+        cls = validator_for(schema)
+        if schema_name not in _checked_schemas:
+            cls.check_schema(schema)
+            _checked_schemas.add(schema_name)
+        validator = cls(schema)
+        validators[schema_name] = validator
+
+    return validator
+
+
+def _get_schema(schema_name):
+    if schema_name in schemas:
+        return schemas[schema_name]
+    return _internal_schemas[schema_name]
+
+
+def get_compiled_validator(schema_name):
+    """
+    Returns a function generated by cc_core.commons.schemas.compiler for the schema with the given name. The schema is
+    compiled once on first use. In contrast to get_validator() the schema is not checked with jsonschema, so jsonschema
+    is not imported.
+
+    :param schema_name: The name of the schema as used in schemas
+    :return: A function, that returns True for valid instances, or None, if the schema could not be compiled
+    :raise KeyError: If no schema with the given name exists
+    """
+    try:
+        return _compiled_validators[schema_name]
+    except KeyError:
+        pass
+
+    schema = _get_schema(schema_name)
+    try:
+        compiled_validator = compile_schema(schema)
+    except SchemaCompilationError:
+        compiled_validator = None
+
+    _compiled_validators[schema_name] = compiled_validator
+    return compiled_validator
+
+
+def _is_valid_compiled(instance, schema_name):
+    compiled_validator = get_compiled_validator(schema_name)
+    if compiled_validator is None:
+        return False
+    try:
+        return compiled_validator(instance)
+    except Exception:
+        # let the jsonschema validator decide, how to handle unexpected instances
+        return False
+
+
+def validate(instance, schema_name):
+    """
+    Validates the given instance like jsonschema.validate(), but uses a cached validator for the schema with the given
+    name.
+
+    Valid instances are accepted by a compiled validation function. Only if this function rejects the instance, the
+    jsonschema validator is used to create the error, so errors are the same as reported by jsonschema.validate().
+
+    :param instance: The instance to validate
+    :param schema_name: The name of the schema as used in schemas
+    :raise jsonschema.exceptions.ValidationError: If the instance is invalid. The error is selected with best_match, as
+                                                  done by jsonschema.validate()
+    """
+    if _is_valid_compiled(instance, schema_name):
+        return
+
+    from jsonschema.exceptions import best_match
+
+    error = best_match(get_validator(schema_name).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def is_valid(instance, schema_name):
+    """
+    Returns whether the given instance is valid against the schema with the given name, without creating an error.
+
+    :param instance: The instance to validate
+    :param schema_name: The name of the schema as used in schemas
+    :return: True, if the instance is valid, otherwise False
+    """
+    if _is_valid_compiled(instance, schema_name):
+        return True
+    return get_validator(schema_name).is_valid(instance)
+
+
+def jsonschema_validation_error():
+    """
+    Returns the exception class raised by validate() for invalid instances. Importing this class imports jsonschema, so
+    it is only imported, when it is needed in an except clause.
+
+    :return: The class jsonschema.exceptions.ValidationError
+    """
+    from jsonschema.exceptions import ValidationError
+    return ValidationError
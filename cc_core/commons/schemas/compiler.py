@@ -0,0 +1,279 @@
+"""
+This module compiles jsonschemas into specialized python functions.
+
+The generic jsonschema validator interprets a schema for every instance: it looks up validator functions for every
+keyword, resolves every $ref and collects error objects for every failing oneOf/anyOf branch. The compiler walks a
+schema once and generates python source code, that checks exactly the keywords used in this schema. The resulting
+function only answers whether an instance is valid. If it is not, the reported error has to be created by the jsonschema
+validator (see cc_core.commons.schema_map.validate), so error messages and paths stay the same.
+
+The generated checks follow the semantics of the Draft7Validator of jsonschema 3.2 without format checker.
+"""
+import numbers
+import re
+from urllib.parse import unquote
+
+DRAFT7_KEYWORDS = {
+    '$ref', 'additionalItems', 'additionalProperties', 'allOf', 'anyOf', 'const', 'contains', 'dependencies', 'enum',
+    'exclusiveMaximum', 'exclusiveMinimum', 'format', 'if', 'items', 'maxItems', 'maxLength', 'maxProperties',
+    'maximum', 'minItems', 'minLength', 'minProperties', 'minimum', 'multipleOf', 'not', 'oneOf', 'pattern',
+    'patternProperties', 'properties', 'propertyNames', 'required', 'type', 'uniqueItems'
+}
+
+# format is only checked by jsonschema, if a format checker is given
+IGNORED_KEYWORDS = {'format'}
+
+TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool) or isinstance({0}, float) and {0}.is_integer())',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, _Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, str)'
+}
+
+
+class SchemaCompilationError(Exception):
+    """
+    Raised if a schema uses keywords or references, that are not supported by the compiler.
+    """
+    pass
+
+
+def compile_schema(schema):
+    """
+    Compiles the given jsonschema into a python function.
+
+    :param schema: The jsonschema to compile
+    :return: A function, that takes an instance and returns True, if the instance is valid against the given schema
+    :raise SchemaCompilationError: If the schema contains keywords or references, that are not supported
+    """
+    compiler = _SchemaCompiler(schema)
+    entry_name = compiler.function_for(schema)
+    namespace = dict(compiler.constants)
+    namespace['_Number'] = numbers.Number
+    namespace['_in_enum'] = _in_enum
+    exec(compile(compiler.source(), '<compiled jsonschema>', 'exec'), namespace)
+    return namespace[entry_name]
+
+
+def generate_source(schema):
+    """
+    Returns the python source code generated for the given jsonschema. The entry point is the function _v0.
+
+    :param schema: The jsonschema to compile
+    :return: The python source code as string
+    :raise SchemaCompilationError: If the schema contains keywords or references, that are not supported
+    """
+    compiler = _SchemaCompiler(schema)
+    compiler.function_for(schema)
+    return compiler.source()
+
+
+def _unbool(element, true=object(), false=object()):
+    if element is True:
+        return true
+    elif element is False:
+        return false
+    return element
+
+
+def _in_enum(instance, enums):
+    """
+    Checks enum membership like jsonschema, which distinguishes True from 1 and False from 0.
+    """
+    if instance == 0 or instance == 1:
+        unbooled = _unbool(instance)
+        return any(unbooled == _unbool(each) for each in enums)
+    return instance in enums
+
+
+class _SchemaCompiler:
+    def __init__(self, root_schema):
+        self._root_schema = root_schema
+        # maps id of a subschema to the name of its function
+        self._function_names = {}
+        # keeps compiled subschemas alive, so their ids are not reused
+        self._compiled_schemas = []
+        self._functions = []
+        self.constants = {}
+
+    def source(self):
+        return '\n\n'.join(self._functions) + '\n'
+
+    def _constant(self, value):
+        name = '_c{}'.format(len(self.constants))
+        self.constants[name] = value
+        return name
+
+    def function_for(self, schema):
+        """
+        Returns the name of the function validating the given subschema. Every subschema is compiled only once, so
+        recursive references end in a call of the same function.
+        """
+        while isinstance(schema, dict) and '$ref' in schema:
+            # jsonschema ignores all other keywords next to $ref
+            schema = self._resolve(schema['$ref'])
+
+        name = self._function_names.get(id(schema))
+        if name is not None:
+            return name
+
+        name = '_v{}'.format(len(self._function_names))
+        self._function_names[id(schema)] = name
+        self._compiled_schemas.append(schema)
+
+        body = self._compile_body(schema)
+        lines = ['def {}(x):'.format(name)] + _indent(body + ['return True'], 1)
+        self._functions.append('\n'.join(lines))
+        return name
+
+    def _resolve(self, ref):
+        if not ref.startswith('#'):
+            raise SchemaCompilationError('only local references are supported, got "{}"'.format(ref))
+
+        resolved = self._root_schema
+        pointer = unquote(ref[1:])
+        parts = pointer.split('/')[1:] if pointer else []
+        for part in parts:
+            part = part.replace('~1', '/').replace('~0', '~')
+            if isinstance(resolved, list):
+                part = int(part)
+            try:
+                resolved = resolved[part]
+            except (KeyError, IndexError, TypeError):
+                raise SchemaCompilationError('could not resolve reference "{}"'.format(ref))
+        return resolved
+
+    def _compile_body(self, schema):
+        if schema is True:
+            return []
+        if schema is False:
+            return ['return False']
+        if not isinstance(schema, dict):
+            raise SchemaCompilationError('schema must be a dictionary or boolean, got "{}"'.format(schema))
+        if '$id' in schema:
+            raise SchemaCompilationError('schemas with $id are not supported')
+
+        unsupported = set(schema).intersection(DRAFT7_KEYWORDS) - IGNORED_KEYWORDS - {
+            'type', 'enum', 'minimum', 'required', 'properties', 'patternProperties', 'additionalProperties', 'items',
+            'oneOf', 'anyOf'
+        }
+        if unsupported:
+            raise SchemaCompilationError('keywords {} are not supported'.format(', '.join(sorted(unsupported))))
+
+        lines = []
+
+        if 'type' in schema:
+            lines.append('if not ({}):'.format(self._type_check(schema['type'])))
+            lines.append('    return False')
+
+        if 'enum' in schema:
+            enums = schema['enum']
+            if enums and all(isinstance(e, str) for e in enums):
+                lines.append('if not (isinstance(x, str) and x in {}):'.format(self._constant(frozenset(enums))))
+            else:
+                lines.append('if not _in_enum(x, {}):'.format(self._constant(list(enums))))
+            lines.append('    return False')
+
+        if 'minimum' in schema:
+            lines.append('if {} and x < {!r}:'.format(TYPE_CHECKS['number'].format('x'), schema['minimum']))
+            lines.append('    return False')
+
+        object_lines = self._object_checks(schema)
+        if object_lines:
+            lines.append('if isinstance(x, dict):')
+            lines += _indent(object_lines, 1)
+
+        if 'items' in schema:
+            lines += self._items_checks(schema['items'])
+
+        if 'anyOf' in schema:
+            calls = ['{}(x)'.format(self.function_for(s)) for s in schema['anyOf']]
+            lines.append('if not ({}):'.format(' or '.join(calls)))
+            lines.append('    return False')
+
+        if 'oneOf' in schema:
+            calls = ['{}(x)'.format(self.function_for(s)) for s in schema['oneOf']]
+            lines.append('if ({}) != 1:'.format(' + '.join(calls)))
+            lines.append('    return False')
+
+        return lines
+
+    def _type_check(self, types):
+        if isinstance(types, str):
+            types = [types]
+
+        checks = []
+        for t in types:
+            check = TYPE_CHECKS.get(t)
+            if check is None:
+                raise SchemaCompilationError('unknown type "{}"'.format(t))
+            checks.append(check.format('x'))
+
+        if not checks:
+            return 'False'
+        return ' or '.join(checks)
+
+    def _object_checks(self, schema):
+        lines = []
+
+        for key in schema.get('required', []):
+            lines.append('if {!r} not in x:'.format(key))
+            lines.append('    return False')
+
+        properties = schema.get('properties', {})
+        for key, subschema in properties.items():
+            function_name = self.function_for(subschema)
+            lines.append('if {0!r} in x and not {1}(x[{0!r}]):'.format(key, function_name))
+            lines.append('    return False')
+
+        pattern_properties = schema.get('patternProperties', {})
+        for pattern, subschema in pattern_properties.items():
+            search = self._constant(re.compile(pattern).search)
+            function_name = self.function_for(subschema)
+            lines.append('for k, v in x.items():')
+            lines.append('    if {}(k) and not {}(v):'.format(search, function_name))
+            lines.append('        return False')
+
+        additional_properties = schema.get('additionalProperties', True)
+        if additional_properties is True:
+            return lines
+
+        # additional properties are determined like jsonschema does, with all patterns joined to one regex
+        known_keys = self._constant(frozenset(properties))
+        patterns = '|'.join(pattern_properties)
+        if patterns:
+            is_extra = 'k not in {} and not {}(k)'.format(known_keys, self._constant(re.compile(patterns).search))
+        else:
+            is_extra = 'k not in {}'.format(known_keys)
+
+        if additional_properties is False:
+            lines.append('for k in x:')
+            lines.append('    if {}:'.format(is_extra))
+            lines.append('        return False')
+        elif isinstance(additional_properties, dict):
+            function_name = self.function_for(additional_properties)
+            lines.append('for k, v in x.items():')
+            lines.append('    if {} and not {}(v):'.format(is_extra, function_name))
+            lines.append('        return False')
+
+        return lines
+
+    def _items_checks(self, items):
+        lines = ['if isinstance(x, list):']
+        if isinstance(items, list):
+            for index, subschema in enumerate(items):
+                lines.append('    if len(x) > {0} and not {1}(x[{0}]):'.format(index, self.function_for(subschema)))
+                lines.append('        return False')
+        else:
+            lines.append('    for item in x:')
+            lines.append('        if not {}(item):'.format(self.function_for(items)))
+            lines.append('            return False')
+        return lines
+
+
+def _indent(lines, level):
+    prefix = '    ' * level
+    return [prefix + line for line in lines]
@@ -163,3 +163,10 @@ red_schema = {
         'required': ['redVersion', 'cli', 'batches', 'container']
     }]
 }
+
+
+# schema of a single entry of the batches list, used to validate batches one at a time
+red_batch_schema = {
+    'definitions': red_schema['definitions']
+}
+red_batch_schema.update(red_schema['oneOf'][1]['properties']['batches']['items'])
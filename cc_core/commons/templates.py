@@ -1,6 +1,6 @@
 from cc_core.commons.parsing import split_into_parts
 from cc_core.commons.exceptions import TemplateError, ParsingError
-from cc_core.commons.red import check_keys_are_strings
+from cc_core.commons.red import check_key_is_string
 
 TEMPLATE_SEPARATOR_START = '{{'
 TEMPLATE_SEPARATOR_END = '}}'
@@ -21,6 +21,17 @@ class TemplateKey:
     def __str__(self):
         return self.key
 
+    def __repr__(self):
+        return 'TemplateKey({!r}, {!r})'.format(self.key, self.protected)
+
+    def __eq__(self, other):
+        if not isinstance(other, TemplateKey):
+            return NotImplemented
+        return self.key == other.key and self.protected == other.protected
+
+    def __hash__(self):
+        return hash((self.key, self.protected))
+
 
 def get_dict_sub_key_string(key, key_string):
     if key_string is None:
@@ -45,29 +56,7 @@ def get_secret_values(red_data):
     :param red_data: A dictionary containing the red data
     :return: A list of secret values found in the given red data
     """
-    check_keys_are_strings(red_data)
-    secret_values = []
-    _append_secret_values(red_data, secret_values)
-    return secret_values
-
-
-def _append_secret_values(data, secret_values, protected=False):
-    """
-    Appends secret values found in data to secret_values
-    :param data: The data to search in for secret values
-    :param secret_values: The list of secret values
-    :param protected: Indicates if the given value is protected or not
-    """
-    if isinstance(data, dict):
-        for key, value in data.items():
-            sub_protected = protected or is_protected_key(key)
-            _append_secret_values(value, secret_values, sub_protected)
-    elif isinstance(data, list):
-        for value in data:
-            _append_secret_values(value, secret_values, protected)
-    else:
-        if protected:
-            secret_values.append(data)
+    return walk_red_data(red_data).secret_values
 
 
 def get_template_keys(data, template_keys, key_string=None, template_keys_allowed=False, protected=False):
@@ -150,6 +139,20 @@ def _extract_template_keys(template_string, key_string, protected):
     :return: A set of template keys found inside template_string
     :raise Parsing: If the template_string is malformed
     """
+    parts = _extract_template_parts(template_string, key_string, protected)
+    return {part for part in parts if isinstance(part, TemplateKey)}
+
+
+def _extract_template_parts(template_string, key_string, protected):
+    """
+    Splits template_string into normal strings and template keys.
+    :param template_string: The string to analyse
+    :type template_string: str
+    :param key_string: The keys of the given template_string
+    :param protected: Indicates whether the extracted keys are protected
+    :return: A list of strings and TemplateKeys in the order of their occurrence in template_string
+    :raise TemplateError: If the template_string is malformed
+    """
     try:
         parts = split_into_parts(template_string, TEMPLATE_SEPARATOR_START, TEMPLATE_SEPARATOR_END)
     except ParsingError as e:
@@ -157,7 +160,7 @@ def _extract_template_keys(template_string, key_string, protected):
                             'for template values. Failed with the following message:\n{}'
                             .format(template_string, key_string, str(e)))
 
-    template_keys = set()
+    template_parts = []
 
     for part in parts:
         if is_template_key(part):
@@ -168,12 +171,14 @@ def _extract_template_keys(template_string, key_string, protected):
             if template_key_string == '':
                 raise TemplateError('Could not parse template string "{}" in "{}". Template keys should not be empty.'
                                     .format(template_string, key_string))
-            template_keys.add(TemplateKey(template_key_string, protected))
+            template_parts.append(TemplateKey(template_key_string, protected))
         elif (TEMPLATE_SEPARATOR_START in part) or (TEMPLATE_SEPARATOR_END in part):
             raise TemplateError('Could not parse template string "{}" in "{}". Too many brackets.'
                                 .format(template_string, key_string))
+        else:
+            template_parts.append(part)
 
-    return template_keys
+    return template_parts
 
 
 def normalize_keys(data):
@@ -193,3 +198,332 @@ def normalize_keys(data):
     elif isinstance(data, list):
         for value in data:
             normalize_keys(value)
+
+
+class RedDataWalk:
+    """
+    The result of walk_red_data().
+    """
+    def __init__(self):
+        # secret values in the same order as returned by get_secret_values()
+        self.secret_values = []
+        # template keys as collected by get_template_keys()
+        self.template_keys = set()
+        # the first TemplateError, that get_template_keys() would raise, or None
+        self.template_error = None
+        # dictionaries containing keys with leading underscore, in the order normalize_keys() visits them
+        self.normalize_targets = []
+
+    def check_template_keys(self):
+        """
+        :raise TemplateError: If get_template_keys() would raise a TemplateError for the walked data
+        """
+        if self.template_error is not None:
+            raise self.template_error
+
+    def normalize_keys(self):
+        """
+        Removes starting underscores from the keys of the walked data like normalize_keys() does. In contrast to
+        normalize_keys(), every dictionary is normalized only once, even if a key with underscore replaces an existing
+        key of the same dictionary.
+        """
+        for data in self.normalize_targets:
+            for key in list(data.keys()):
+                if key.startswith('_'):
+                    data[key[1:]] = data[key]
+                    del data[key]
+
+
+class _WalkNode:
+    """
+    A node of a linked list of keys, that leads to a value inside the walked data. Paths are only built from these nodes
+    if they are needed for error messages or template keys.
+    """
+    __slots__ = ('parent', 'key', 'is_index')
+
+    def __init__(self, parent, key, is_index):
+        self.parent = parent
+        self.key = key
+        self.is_index = is_index
+
+    def _nodes(self):
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(node)
+            node = node.parent
+        nodes.reverse()
+        return nodes
+
+    def path(self):
+        """
+        :return: The path as list of strings as used by check_keys_are_strings()
+        """
+        return [str(node.key) for node in self._nodes()]
+
+    def key_string(self):
+        """
+        :return: The key string as used by get_template_keys()
+        """
+        key_string = None
+        for node in self._nodes():
+            if node.is_index:
+                key_string = get_list_sub_key_string(node.key, key_string)
+            else:
+                key_string = get_dict_sub_key_string(node.key, key_string)
+        return key_string
+
+
+# kinds of entries of the walk_red_data() stack
+_VISIT = 'visit'
+_PROTECTED_KEY = 'protected key'
+_NON_STRING_KEY = 'non string key'
+
+
+class _LazyKeyString:
+    """
+    Formats as the key string of the given node. The key string is only built, if it is used in an error message.
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def __str__(self):
+        return str(_key_string(self.node))
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+
+def _key_string(node):
+    if node is None:
+        return None
+    return node.key_string()
+
+
+def walk_red_data(data):
+    """
+    Traverses the given red data once and gathers everything, that is otherwise collected by separate recursive
+    traversals of check_keys_are_strings(), get_secret_values(), get_template_keys() and normalize_keys().
+
+    The traversal is iterative, so deeply nested data does not hit the recursion limit, and paths are only built for
+    error messages.
+
+    :param data: The red data to walk
+    :return: A RedDataWalk containing secret values, template keys, the first template error and the dictionaries,
+             whose keys have to be normalized
+    :rtype: RedDataWalk
+    :raise RedSpecificationError: If a key is found, that is not of type string. The error is the same as raised by
+                                  check_keys_are_strings()
+    """
+    walk = RedDataWalk()
+
+    # every stack entry is (kind, value, node, protected, template_keys_allowed). Entries are popped in the same order
+    # as the recursive functions visit the values, so errors are reported in the same order.
+    stack = [(_VISIT, data, None, False, False)]
+    while stack:
+        kind, value, node, protected, template_keys_allowed = stack.pop()
+
+        if kind is _NON_STRING_KEY:
+            parent = node.parent
+            check_key_is_string(node.key, parent.path() if parent is not None else [])
+
+        if kind is _PROTECTED_KEY and walk.template_error is None:
+            walk.template_error = TemplateError(
+                'Found protected key "{}", but protected keys are only allowed under one of {}'
+                .format(node.key_string(), str(PRIVATE_KEYS))
+            )
+
+        if isinstance(value, dict):
+            has_underscore_key = False
+            entries = []
+            for key, sub_value in value.items():
+                sub_node = _WalkNode(node, key, False)
+                if not isinstance(key, str):
+                    entries.append((_NON_STRING_KEY, None, sub_node, False, False))
+                    break
+
+                if key.startswith('_'):
+                    has_underscore_key = True
+                sub_protected = protected or is_protected_key(key)
+                sub_template_keys_allowed = template_keys_allowed or (key in PRIVATE_KEYS)
+                sub_kind = _PROTECTED_KEY if sub_protected and not sub_template_keys_allowed else _VISIT
+                entries.append((sub_kind, sub_value, sub_node, sub_protected, sub_template_keys_allowed))
+
+            if has_underscore_key:
+                walk.normalize_targets.append(value)
+            entries.reverse()
+            stack.extend(entries)
+
+        elif isinstance(value, list):
+            entries = [
+                (_VISIT, sub_value, _WalkNode(node, index, True), protected, template_keys_allowed)
+                for index, sub_value in enumerate(value)
+            ]
+            entries.reverse()
+            stack.extend(entries)
+
+        else:
+            if protected:
+                walk.secret_values.append(value)
+
+            if isinstance(value, str) and walk.template_error is None:
+                _walk_template_string(walk, value, node, protected, template_keys_allowed)
+
+    return walk
+
+
+def _walk_template_string(walk, value, node, protected, template_keys_allowed):
+    try:
+        if template_keys_allowed:
+            walk.template_keys.update(_extract_template_keys(value, _LazyKeyString(node), protected))
+        elif (TEMPLATE_SEPARATOR_START in value) or (TEMPLATE_SEPARATOR_END in value):
+            raise TemplateError('Found invalid bracket in "{}" under "{}" in red data. Template keys are only '
+                                'allowed as sub element of an auth or access key.'.format(value, _key_string(node)))
+    except TemplateError as e:
+        walk.template_error = e
+
+
+# kinds of nodes of a CompiledTemplate
+_STATIC = 'static'
+_DICT = 'dict'
+_LIST = 'list'
+_TEMPLATE_STRING = 'template string'
+
+
+class CompiledTemplate:
+    """
+    A red data template, whose template keys are indexed once and can be filled with values many times.
+
+    Every string under an auth or access key, that contains template keys, is stored as list of normal strings and
+    template keys. Filling the template creates a new copy of the data, in which every template key is replaced by its
+    value. If a string consists of a single template key, the string is replaced by the value itself, so that for
+    example numbers keep their type.
+    """
+    def __init__(self, data):
+        """
+        :param data: The red data containing template keys
+        :raise RedSpecificationError: If a key is found, that is not of type string
+        :raise TemplateError: If get_template_keys() would raise a TemplateError for the given data
+        """
+        walk = walk_red_data(data)
+        walk.check_template_keys()
+
+        self.template_keys = walk.template_keys
+        self._root = _compile_template_node(data, None, False, False)
+
+    def fill(self, values):
+        """
+        Returns a copy of the template data, in which all template keys are replaced by the given values.
+
+        :param values: A dictionary mapping template key strings to values
+        :return: The filled red data
+        :raise TemplateError: If a value for a template key is missing
+        """
+        return _fill_template_node(self._root, values)
+
+    def fill_many(self, values_list):
+        """
+        Fills this template once for every given values dictionary.
+
+        :param values_list: An iterable of dictionaries mapping template key strings to values
+        :return: A list of filled red data in the order of values_list
+        :raise TemplateError: If a value for a template key is missing
+        """
+        return [self.fill(values) for values in values_list]
+
+
+def compile_template(data):
+    """
+    Indexes all template keys in the given red data.
+
+    :param data: The red data containing template keys
+    :return: A CompiledTemplate, that can be filled with values
+    :rtype: CompiledTemplate
+    :raise TemplateError: If the given data contains invalid template keys
+    """
+    return CompiledTemplate(data)
+
+
+def _compile_template_node(data, key_string, template_keys_allowed, protected):
+    """
+    Returns a tuple (kind, content) describing how to fill the given data. Subtrees without template keys are static
+    and are only copied when filled.
+    """
+    if isinstance(data, dict):
+        items = []
+        is_static = True
+        for key, value in data.items():
+            sub_node = _compile_template_node(
+                value,
+                get_dict_sub_key_string(key, key_string),
+                template_keys_allowed or (key in PRIVATE_KEYS),
+                protected or is_protected_key(key)
+            )
+            is_static = is_static and sub_node[0] is _STATIC
+            items.append((key, sub_node))
+        if is_static:
+            return _STATIC, data
+        return _DICT, items
+
+    if isinstance(data, list):
+        items = []
+        is_static = True
+        for index, value in enumerate(data):
+            sub_node = _compile_template_node(
+                value, get_list_sub_key_string(index, key_string), template_keys_allowed, protected
+            )
+            is_static = is_static and sub_node[0] is _STATIC
+            items.append(sub_node)
+        if is_static:
+            return _STATIC, data
+        return _LIST, items
+
+    if isinstance(data, str) and template_keys_allowed:
+        parts = _extract_template_parts(data, key_string, protected)
+        if any(isinstance(part, TemplateKey) for part in parts):
+            return _TEMPLATE_STRING, (data, parts)
+
+    return _STATIC, data
+
+
+def _copy_static(data):
+    if isinstance(data, dict):
+        return {key: _copy_static(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_copy_static(value) for value in data]
+    return data
+
+
+def _template_value(template_key, template_string, values):
+    try:
+        return values[template_key.key]
+    except KeyError:
+        raise TemplateError('Could not fill template key "{}" in template string "{}", because no value is given.'
+                            .format(template_key.key, template_string))
+
+
+def _fill_template_node(node, values):
+    kind, content = node
+
+    if kind is _STATIC:
+        return _copy_static(content)
+
+    if kind is _DICT:
+        return {key: _fill_template_node(sub_node, values) for key, sub_node in content}
+
+    if kind is _LIST:
+        return [_fill_template_node(sub_node, values) for sub_node in content]
+
+    template_string, parts = content
+    if len(parts) == 1:
+        return _template_value(parts[0], template_string, values)
+
+    filled_parts = []
+    for part in parts:
+        if isinstance(part, TemplateKey):
+            filled_parts.append(str(_template_value(part, template_string, values)))
+        else:
+            filled_parts.append(part)
+    return ''.join(filled_parts)
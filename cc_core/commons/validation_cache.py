@@ -0,0 +1,137 @@
+"""
+This module provides a cache for the results of red_validation() and engine_validation().
+
+Front ends often validate identical red documents again, for example on retries or resubmissions. A ValidationCache
+remembers the outcome of a validation by a canonical fingerprint of the validated data, so repeated validations only
+cost the computation of this fingerprint.
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+from cc_core.commons.engines import engine_validation
+from cc_core.commons.exceptions import RedValidationError, RedSpecificationError, CWLSpecificationError, EngineError
+from cc_core.commons.fingerprint import canonical_fingerprint
+from cc_core.commons.red import red_validation
+from cc_core.version import VERSION
+
+DEFAULT_VALIDATION_CACHE_SIZE = 1024
+
+# only validation errors are cached, all other exceptions are raised without caching the result
+CACHED_EXCEPTIONS = (RedValidationError, RedSpecificationError, CWLSpecificationError, EngineError)
+
+_MISSING = object()
+
+
+def validation_fingerprint(data):
+    """
+    Returns a canonical fingerprint of the given json data. The order of dictionary keys does not influence the
+    fingerprint.
+
+    :param data: The data to create a fingerprint for
+    :return: The fingerprint of data as returned by canonical_fingerprint() or None, if data can not be represented
+             canonically (for example, because it contains keys, that are not strings)
+    :rtype: str
+    """
+    try:
+        return canonical_fingerprint(data)
+    except ValueError:
+        return None
+
+
+class ValidationCache:
+    """
+    A thread safe cache for the results of red_validation() and engine_validation() with least recently used eviction.
+
+    The cache key contains the cc_core version, the validation arguments and the fingerprint of the validated data. If a
+    validation failed, the validation error is cached and a copy of it is raised for following validations of the same
+    data.
+    """
+    def __init__(self, max_size=DEFAULT_VALIDATION_CACHE_SIZE):
+        """
+        :param max_size: The maximal number of cached validation results
+        """
+        self._max_size = max_size
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def red_validation(self, red_data, ignore_outputs, container_requirement=False, **kwargs):
+        """
+        Validates the given red data like cc_core.commons.red.red_validation(), but reuses cached results.
+
+        :param red_data: The red data to check
+        :param ignore_outputs: Whether the outputs section should be ignored
+        :param container_requirement: If True, this function checks, if there is a container section in the red file
+        :param kwargs: Further arguments for red_validation(), that do not influence the result (e.g. processes)
+        :raise RedValidationError, RedSpecificationError, CWLSpecificationError: If the red data is not valid
+        """
+        fingerprint = validation_fingerprint(red_data)
+        if fingerprint is None:
+            red_validation(red_data, ignore_outputs, container_requirement, **kwargs)
+            return
+
+        key = ('red', VERSION, bool(ignore_outputs), bool(container_requirement), fingerprint)
+        self._validate(key, red_validation, red_data, ignore_outputs, container_requirement, **kwargs)
+
+    def engine_validation(self, red_data, engine_type, supported, optional=False):
+        """
+        Validates the given engine section of red data like cc_core.commons.engines.engine_validation(), but reuses
+        cached results. Only the engine section of the given engine type is part of the cache key.
+
+        :param red_data: The red data to check
+        :param engine_type: Either 'container' or 'execution'
+        :param supported: The supported engines
+        :param optional: Whether the engine section is optional
+        :raise EngineError: If the engine section is not valid
+        """
+        engine_data = red_data.get(engine_type, _MISSING) if isinstance(red_data, dict) else _MISSING
+        fingerprint = None if engine_data is _MISSING else validation_fingerprint(engine_data)
+        if fingerprint is None and engine_data is not _MISSING:
+            engine_validation(red_data, engine_type, supported, optional)
+            return
+
+        key = ('engine', VERSION, engine_type, frozenset(supported), bool(optional), fingerprint)
+        self._validate(key, engine_validation, red_data, engine_type, supported, optional)
+
+    def _validate(self, key, validation, *args, **kwargs):
+        with self._lock:
+            found = key in self._results
+            if found:
+                error = self._results[key]
+                self._results.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if found:
+            if error is not None:
+                raise copy.copy(error)
+            return
+
+        try:
+            validation(*args, **kwargs)
+        except CACHED_EXCEPTIONS as e:
+            # the copy does not keep the traceback and its frames alive
+            self._store(key, copy.copy(e))
+            raise
+
+        self._store(key, None)
+
+    def _store(self, key, error):
+        with self._lock:
+            self._results[key] = error
+            self._results.move_to_end(key)
+            while len(self._results) > self._max_size:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all cached validation results.
+        """
+        with self._lock:
+            self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
@@ -0,0 +1,52 @@
+import os
+
+from cc_core.agent.blue.__main__ import run_blue_batches, OutputMode, ConnectorManager, ConnectorError
+
+BLUE_BATCH = {
+    'command': ['touch', 'out.txt'],
+    'cli': {
+        'outputs': {
+            'out_file': {
+                'type': 'File',
+                'outputBinding': {'glob': 'out.txt'}
+            }
+        }
+    },
+    'inputs': {},
+    'outputs': {}
+}
+
+
+def test_run_blue_batches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    failing_batch = dict(BLUE_BATCH, command=['false'])
+
+    results = run_blue_batches([BLUE_BATCH, failing_batch, BLUE_BATCH], OutputMode.Directory, {})
+
+    assert [result['state'] for result in results] == ['succeeded', 'failed', 'succeeded']
+    assert os.getcwd() == str(tmp_path)
+
+    # every batch runs in its own working directory, so outputs do not collide
+    assert results[0]['outputs']['out_file']['path'] == str(tmp_path / '0' / 'out.txt')
+    assert results[2]['outputs']['out_file']['path'] == str(tmp_path / '2' / 'out.txt')
+
+
+def test_cleanup_errors_do_not_stop_batches(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def umount_connectors(self):
+        raise RuntimeError('umount failed')
+
+    def remove_received_inputs(self):
+        return [ConnectorError('removal failed')]
+
+    monkeypatch.setattr(ConnectorManager, 'umount_connectors', umount_connectors)
+    monkeypatch.setattr(ConnectorManager, 'remove_received_inputs', remove_received_inputs)
+    failing_batch = dict(BLUE_BATCH, command=['false'])
+
+    results = run_blue_batches([BLUE_BATCH, failing_batch], OutputMode.Directory, {})
+
+    assert [result['state'] for result in results] == ['succeeded', 'failed']
+    for result in results:
+        assert 'umount failed' in result['debugInfo']
+        assert 'removal failed' in result['debugInfo']
@@ -0,0 +1,127 @@
+"""
+Test data and helpers, that are shared by several test modules.
+"""
+
+RED_DATA = {
+    'redVersion': '8',
+    'cli': {
+        'cwlVersion': 'v1.0',
+        'class': 'CommandLineTool',
+        'baseCommand': 'process.py',
+        'inputs': {
+            'a_file': {
+                'type': 'File',
+                'inputBinding': {'position': 0}
+            },
+            'some_dirs': {
+                'type': 'Directory[]',
+                'inputBinding': {'prefix': '--dirs'}
+            },
+            'count': {
+                'type': 'int?',
+                'inputBinding': {'prefix': '--count'}
+            }
+        },
+        'outputs': {
+            'out_file': {
+                'type': 'File',
+                'outputBinding': {'glob': '$(inputs.a_file.nameroot).out'}
+            },
+            'out_stream': {
+                'type': 'stdout'
+            }
+        }
+    },
+    'batches': [
+        {
+            'inputs': {
+                'a_file': {
+                    'class': 'File',
+                    'connector': {
+                        'command': 'red-connector-http',
+                        'access': {'url': 'https://example.com/in_1.txt', 'method': 'GET'}
+                    }
+                },
+                'some_dirs': [
+                    {
+                        'class': 'Directory',
+                        'connector': {
+                            'command': 'red-connector-http',
+                            'access': {'url': 'https://example.com/dir_1', 'method': 'GET'}
+                        }
+                    },
+                    {
+                        'class': 'Directory',
+                        'connector': {
+                            'command': 'red-connector-http',
+                            'access': {'url': 'https://example.com/dir_2', 'method': 'GET'}
+                        }
+                    }
+                ],
+                'count': 3
+            },
+            'outputs': {
+                'out_file': {
+                    'class': 'File',
+                    'connector': {
+                        'command': 'red-connector-http',
+                        'access': {'url': 'https://example.com/out_1.txt', 'method': 'PUT'}
+                    }
+                },
+                'out_stream': {
+                    'class': 'stdout',
+                    'connector': {
+                        'command': 'red-connector-http',
+                        'access': {'url': 'https://example.com/stdout_1.txt', 'method': 'PUT'}
+                    }
+                }
+            }
+        },
+        {
+            'inputs': {
+                'a_file': {
+                    'class': 'File',
+                    'connector': {
+                        'command': 'red-connector-http',
+                        'access': {'url': 'https://example.com/in_2.txt', 'method': 'GET'}
+                    }
+                },
+                'some_dirs': []
+            }
+        }
+    ],
+    'container': {
+        'engine': 'docker',
+        'settings': {
+            'image': {'url': 'example/image'}
+        }
+    }
+}
+
+# values used to replace parts of valid data to create invalid data
+REPLACEMENT_VALUES = [None, True, False, 0, 1, 1.0, 2.5, 300, 'text', 'File', 'Directory', 'nvidia', [], ['x'], {}]
+
+
+def json_paths(data, path=()):
+    """
+    Yields the paths of all values inside the given json data as tuples of keys and list indices, starting with the
+    empty path of data itself.
+    """
+    yield path
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from json_paths(value, path + (key,))
+    elif isinstance(data, list):
+        for index, value in enumerate(data):
+            yield from json_paths(value, path + (index,))
+
+
+class FakeClock:
+    """
+    A clock, that can be given to classes taking a clock function. The time only changes, if the test sets it.
+    """
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
@@ -0,0 +1,63 @@
+import importlib.util
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import zipfile
+import zipimport
+
+from cc_core.commons.agent_bundle import build_agent_bundle
+from cc_core.commons.docker_utils import create_batch_archive, get_blue_agent_host_path
+from cc_core.commons.red_to_blue import CONTAINER_AGENT_PATH
+
+BLUE_BATCH = {
+    'command': ['touch', 'out.txt'],
+    'cli': {'outputs': {'out_file': {'type': 'File', 'outputBinding': {'glob': 'out.txt'}}}},
+    'inputs': {},
+    'outputs': {}
+}
+
+
+def test_bundle_uses_precompiled_bytecode(tmp_path):
+    bundle_path = tmp_path / 'blue_agent.py'
+    bundle_path.write_bytes(build_agent_bundle(get_blue_agent_host_path(), container_agent_path='/bundle/agent.py'))
+
+    # the file name is only set by the precompiled code object, the source would be compiled with the bundle path
+    code = zipimport.zipimporter(str(bundle_path)).get_code('__main__')
+    assert code.co_filename == '/bundle/agent.py/__main__.py'
+
+
+def test_bundle_runs_blue_batch(tmp_path):
+    with tarfile.open(fileobj=create_batch_archive(BLUE_BATCH, agent_bundle=True)) as tar_file:
+        bundle = tar_file.extractfile(CONTAINER_AGENT_PATH.lstrip('/')).read()
+
+    bundle_path = tmp_path / 'blue_agent.py'
+    bundle_path.write_bytes(bundle)
+    blue_file_path = tmp_path / 'blue_file.json'
+    blue_file_path.write_text(json.dumps(BLUE_BATCH))
+
+    process = subprocess.run([sys.executable, str(bundle_path), str(blue_file_path), '--debug'], cwd=str(tmp_path),
+                             stdout=subprocess.PIPE, universal_newlines=True)
+
+    result = json.loads(process.stdout)
+    assert result['state'] == 'succeeded'
+    assert (tmp_path / 'out.txt').exists()
+
+
+def test_bundle_without_hash_based_pycs_contains_source(tmp_path, monkeypatch):
+    monkeypatch.delattr(importlib.util, 'source_hash')
+    bundle = build_agent_bundle(get_blue_agent_host_path())
+
+    with zipfile.ZipFile(io.BytesIO(bundle)) as zip_file:
+        assert zip_file.namelist() == ['__main__.py']
+
+    bundle_path = tmp_path / 'blue_agent.py'
+    bundle_path.write_bytes(bundle)
+    blue_file_path = tmp_path / 'blue_file.json'
+    blue_file_path.write_text(json.dumps(BLUE_BATCH))
+
+    process = subprocess.run([sys.executable, str(bundle_path), str(blue_file_path), '--debug'], cwd=str(tmp_path),
+                             stdout=subprocess.PIPE, universal_newlines=True)
+
+    assert json.loads(process.stdout)['state'] == 'succeeded'
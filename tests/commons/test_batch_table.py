@@ -0,0 +1,93 @@
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons.batch_table import BatchTable
+from cc_core.commons.exceptions import RedValidationError, RedSpecificationError
+from cc_core.commons.red import red_validation
+from cc_core.commons.red_to_blue import convert_red_to_blue
+
+from tests.commons.helpers import RED_DATA
+
+
+def _create_batches(count):
+    batches = []
+    for i in range(count):
+        batch = deepcopy(RED_DATA['batches'][i % 2])
+        batch['inputs']['a_file']['connector']['access']['url'] = 'https://example.com/in_{}.txt'.format(i)
+        batches.append(batch)
+    return batches
+
+
+def test_batch_table_round_trip():
+    batches = _create_batches(10)
+
+    batch_table = BatchTable.from_batches(batches)
+
+    assert len(batch_table) == 10
+    assert list(batch_table) == batches
+    assert batch_table[-1] == batches[-1]
+
+
+def test_batch_table_deduplicates_values():
+    batch_table = BatchTable.from_batches(_create_batches(10))
+
+    assert batch_table.column('inputs', 'a_file', 'connector').distinct_count() == 10
+    assert batch_table.column('inputs', 'a_file', 'class').distinct_count() == 1
+    assert batch_table.column('inputs', 'some_dirs').distinct_count() == 2
+    assert batch_table.keys('inputs') == ['a_file', 'some_dirs', 'count']
+    assert batch_table.keys('outputs') == ['out_file', 'out_stream']
+
+
+def test_batch_table_values_are_copies():
+    batch_table = BatchTable.from_batches(_create_batches(2))
+
+    batch_table[0]['inputs']['a_file']['connector']['access']['url'] = 'changed'
+
+    assert batch_table[0]['inputs']['a_file']['connector']['access']['url'] == 'https://example.com/in_0.txt'
+
+
+def test_convert_batch_table():
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = _create_batches(6)
+    table_red_data = deepcopy(red_data)
+    table_red_data['batches'] = BatchTable.from_batches(table_red_data['batches'])
+
+    blue_batches = convert_red_to_blue(red_data, deterministic_dirnames=True)
+    table_blue_batches = convert_red_to_blue(table_red_data, deterministic_dirnames=True)
+
+    assert table_blue_batches == blue_batches
+
+
+def test_validate_batch_table():
+    red_data = deepcopy(RED_DATA)
+    batches = _create_batches(4)
+    red_data['batches'] = BatchTable.from_batches(batches)
+    red_validation(red_data, ignore_outputs=False)
+
+    batches[2]['inputs']['a_file']['connector']['invalid'] = True
+    red_data['batches'] = BatchTable.from_batches(batches)
+    with pytest.raises(RedValidationError) as e:
+        red_validation(red_data, ignore_outputs=False)
+
+    assert 'batches/2/inputs/a_file' in str(e.value)
+
+
+@pytest.mark.parametrize('path', [
+    ['inputs', 'a_file', 'connector', 'access'],
+    ['inputs', 'a_file'],
+    ['inputs'],
+    ['outputs', 'out_file', 'connector']
+])
+def test_batch_table_rejects_keys_that_are_not_strings(path):
+    batches = _create_batches(2)
+    parent = batches[0]
+    for key in path:
+        parent = parent[key]
+    parent[1] = 'x'
+    parent['1'] = 'y'
+
+    with pytest.raises(RedSpecificationError) as e:
+        BatchTable.from_batches(batches)
+
+    assert 'batches.0.{}'.format('.'.join(path)) in str(e.value)
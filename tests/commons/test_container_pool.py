@@ -0,0 +1,171 @@
+import pytest
+
+from cc_core.commons.docker_utils import ContainerPool
+
+from tests.commons.helpers import FakeClock
+
+
+class FakeContainer:
+    def __init__(self, container_id, image, command, kwargs):
+        self.id = container_id
+        self.image = image
+        self.command = command
+        self.kwargs = kwargs
+        self.removed = False
+        self.fail_remove = False
+        # filesystem changes as reported by docker diff
+        self.changes = []
+
+    def diff(self):
+        return [{'Path': path, 'Kind': 1} for path in self.changes]
+
+    def remove(self, force=False):
+        if self.fail_remove:
+            raise RuntimeError('could not remove container "{}"'.format(self.id))
+        self.removed = True
+
+
+class FakeContainers:
+    def __init__(self):
+        self.created = []
+
+    def create(self, image, command, **kwargs):
+        container = FakeContainer('container-{}'.format(len(self.created)), image, command, kwargs)
+        self.created.append(container)
+        return container
+
+
+class FakeClient:
+    def __init__(self):
+        self.containers = FakeContainers()
+
+
+@pytest.fixture
+def pool_setup():
+    client = FakeClient()
+    clock = FakeClock()
+    pool = ContainerPool(client, [], max_idle=2, idle_ttl=10, clock=clock)
+    return pool, client, clock
+
+
+def test_reusable_container_is_handed_out_again(pool_setup):
+    pool, client, _ = pool_setup
+    container = pool.acquire('image', ['run'], mem_limit='1g')
+    pool.release(container, reusable=True)
+
+    assert pool.acquire('image', ['run'], mem_limit='1g') is container
+    assert len(client.containers.created) == 1
+    assert client.containers.created[0].kwargs == {'environment': None, 'mem_limit': '1g'}
+
+
+def test_containers_are_pooled_per_configuration(pool_setup):
+    pool, client, _ = pool_setup
+    container = pool.acquire('image', ['run'], mem_limit='1g')
+    pool.release(container, reusable=True)
+
+    assert pool.acquire('image', ['run'], mem_limit='2g') is not container
+    assert pool.acquire('image', ['run'], environment={'A': '1'}) is not container
+    assert pool.acquire('other', ['run'], mem_limit='1g') is not container
+    assert len(client.containers.created) == 4
+
+
+def test_not_reusable_container_is_destroyed(pool_setup):
+    pool, _, _ = pool_setup
+    container = pool.acquire('image', ['run'])
+    pool.release(container)
+
+    assert container.removed
+    assert pool.idle_count() == 0
+
+
+def test_pool_size_is_limited(pool_setup):
+    pool, _, _ = pool_setup
+    containers = [pool.acquire('image', ['run']) for _ in range(3)]
+    for container in containers:
+        pool.release(container, reusable=True)
+
+    assert pool.idle_count() == 2
+    assert [c.removed for c in containers] == [False, False, True]
+
+
+def test_idle_containers_expire(pool_setup):
+    pool, _, clock = pool_setup
+    assert pool.prefill(5, 'image', ['run']) == 2
+
+    clock.time = 5
+    container = pool.acquire('image', ['run'])
+    pool.release(container, reusable=True)
+
+    clock.time = 12
+    assert pool.evict_expired() == 1
+    assert pool.acquire('image', ['run']) is container
+
+    clock.time = 30
+    pool.release(container, reusable=True)
+    assert pool.idle_count() == 1
+
+
+def test_release_unknown_container(pool_setup):
+    pool, _, _ = pool_setup
+    with pytest.raises(ValueError):
+        pool.release(FakeContainer('unknown', 'image', ['run'], {}))
+
+
+def test_release_unknown_container_keeps_expired_containers(pool_setup):
+    pool, client, clock = pool_setup
+    pool.prefill(1, 'image', ['run'])
+
+    clock.time = 12
+    with pytest.raises(ValueError):
+        pool.release(FakeContainer('unknown', 'image', ['run'], {}))
+
+    assert pool.idle_count() == 1
+    assert pool.evict_expired() == 1
+    assert client.containers.created[0].removed
+
+
+def test_acquire_keeps_idle_container_if_removing_expired_containers_fails(pool_setup):
+    pool, client, clock = pool_setup
+    expired_container = pool.acquire('image', ['run'], mem_limit='1g')
+    pool.release(expired_container, reusable=True)
+    expired_container.fail_remove = True
+
+    clock.time = 5
+    container = pool.acquire('image', ['run'])
+    pool.release(container, reusable=True)
+
+    clock.time = 12
+    with pytest.raises(RuntimeError):
+        pool.acquire('image', ['run'])
+
+    assert pool.acquire('image', ['run']) is container
+    assert len(client.containers.created) == 2
+
+
+def test_close_destroys_idle_containers(pool_setup):
+    pool, client, _ = pool_setup
+    pool.prefill(2, 'image', ['run'])
+    in_use = pool.acquire('image', ['run'])
+    pool.close()
+    pool.release(in_use, reusable=True)
+
+    assert all(c.removed for c in client.containers.created)
+    assert pool.idle_count() == 0
+
+
+def test_reused_container_does_not_expose_files_of_previous_batch(pool_setup):
+    pool, client, _ = pool_setup
+    container = pool.acquire('image', ['run'])
+    container.changes = ['/cc', '/cc/blue_agent.py', '/cc/blue_file.json', '/cc/inputs', '/cc/outputs']
+    pool.release(container, reusable=True)
+
+    # only paths, that are replaced by the next batch archive, were changed
+    assert pool.acquire('image', ['run']) is container
+
+    container.changes.append('/cc/outputs/result.txt')
+    pool.release(container, reusable=True)
+
+    assert container.removed
+    assert pool.idle_count() == 0
+    assert pool.acquire('image', ['run']) is not container
+    assert len(client.containers.created) == 2
@@ -0,0 +1,45 @@
+import io
+import json
+import tarfile
+
+from cc_core.commons.docker_utils import create_batch_archive, get_blue_agent_host_path
+from cc_core.commons.files import create_directory_tarinfo
+from cc_core.commons.red_to_blue import CONTAINER_AGENT_PATH, CONTAINER_BLUE_FILE_PATH, CONTAINER_OUTPUT_DIR, \
+    CONTAINER_INPUT_DIR
+
+
+def _reference_batch_archive(blue_data):
+    """
+    Writes the batch archive entry by entry with tarfile.
+    """
+    data_file = io.BytesIO()
+    tar_file = tarfile.open(mode='w', fileobj=data_file)
+    tar_file.add(get_blue_agent_host_path(), arcname=CONTAINER_AGENT_PATH, recursive=False)
+
+    blue_batch_content = json.dumps(blue_data).encode('utf-8')
+    blue_batch_tarinfo = tarfile.TarInfo(CONTAINER_BLUE_FILE_PATH)
+    blue_batch_tarinfo.size = len(blue_batch_content)
+    tar_file.addfile(blue_batch_tarinfo, io.BytesIO(blue_batch_content))
+
+    tar_file.addfile(create_directory_tarinfo(CONTAINER_OUTPUT_DIR, owner_name='cc'))
+    tar_file.addfile(create_directory_tarinfo(CONTAINER_INPUT_DIR, owner_name='cc'))
+    tar_file.close()
+    return data_file.getvalue()
+
+
+def test_batch_archive_equals_tarfile_archive():
+    for size in [0, 1, 511, 512, 513, 10000, 10240 * 3]:
+        blue_data = {'cli': {}, 'inputs': {'text': 'x' * size}}
+        assert create_batch_archive(blue_data).getvalue() == _reference_batch_archive(blue_data), size
+
+
+def test_batch_archive_contents():
+    blue_data = [{'cli': {}, 'inputs': {'a': 'ü'}}, {'cli': {}, 'inputs': {'a': 2}}]
+    with tarfile.open(fileobj=create_batch_archive(blue_data)) as tar_file:
+        # tarfile.add() removes the leading slash of the agent path
+        agent_name = CONTAINER_AGENT_PATH.lstrip('/')
+        assert tar_file.getnames() == [agent_name, CONTAINER_BLUE_FILE_PATH, CONTAINER_OUTPUT_DIR, CONTAINER_INPUT_DIR]
+        assert json.loads(tar_file.extractfile(CONTAINER_BLUE_FILE_PATH).read().decode('utf-8')) == blue_data
+        with open(get_blue_agent_host_path(), 'rb') as f:
+            assert tar_file.extractfile(agent_name).read() == f.read()
+        assert tar_file.getmember(CONTAINER_INPUT_DIR).isdir()
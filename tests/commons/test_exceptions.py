@@ -0,0 +1,55 @@
+import random
+
+from cc_core.commons.exceptions import SecretMasker, get_secret_masker, brief_exception_text, SECRET_MASK
+
+
+def test_secret_values_with_regex_characters():
+    masker = SecretMasker(['pa$$w(rd', 'a.b'])
+    assert masker.mask_text('x pa$$w(rd y a.b axb') == 'x {0} y {0} axb'.format(SECRET_MASK)
+
+
+def test_longest_secret_is_masked_first():
+    masker = SecretMasker(['secret', 'my_secret_value'])
+    assert masker.mask_text('my_secret_value secret') == '{0} {0}'.format(SECRET_MASK)
+
+
+def test_empty_and_non_string_secret_values():
+    masker = SecretMasker(['', None, 1234])
+    assert masker.mask_text('pin 1234') == 'pin {}'.format(SECRET_MASK)
+    assert SecretMasker(['', None]).mask_text('text') == 'text'
+
+
+def test_brief_exception_text_hides_secret_values():
+    text = brief_exception_text(Exception('could not login with password p+ss'), ['p+ss'])
+    assert text == '[Exception]\ncould not login with password {}'.format(SECRET_MASK)
+
+
+def test_get_secret_masker_is_cached():
+    assert get_secret_masker(['a', 'b']) is get_secret_masker(['a', 'b'])
+
+
+def test_streaming_equals_masking_whole_text():
+    rng = random.Random(42)
+    alphabet = 'abc.*'
+
+    for _ in range(500):
+        secrets = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))) for _ in range(rng.randint(1, 4))]
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 60)))
+        masker = SecretMasker(secrets)
+
+        chunks = []
+        position = 0
+        while position < len(text):
+            size = rng.randint(0, 7)
+            chunks.append(text[position:position + size])
+            position += size
+
+        assert ''.join(masker.mask_chunks(chunks)) == masker.mask_text(text), (secrets, chunks)
+
+
+def test_stream_holds_back_possible_secret_beginning():
+    stream = SecretMasker(['token']).stream()
+    # at most len('token') - 1 characters are held back
+    assert stream.feed('my tok') == 'my'
+    assert stream.feed('en!') == ' ' + SECRET_MASK
+    assert stream.flush() == '!'
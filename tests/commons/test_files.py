@@ -0,0 +1,201 @@
+import io
+import json
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons import files
+from cc_core.commons.exceptions import AgentError
+from cc_core.commons.files import load_and_read_streaming, StreamedBatches, load_and_read, read, clear_document_cache, \
+    _JsonStreamReader
+from cc_core.commons.red import red_validation
+from cc_core.commons.red_to_blue import convert_red_to_blue
+
+from tests.commons.helpers import RED_DATA
+
+
+def _write_red_file(tmp_path, red_data, name='red.json'):
+    path = tmp_path / name
+    # batches are written before the container section to check that following keys are found
+    ordered = {key: red_data[key] for key in ['redVersion', 'cli', 'batches', 'container']}
+    path.write_text(json.dumps(ordered, indent=2))
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 4096])
+def test_load_and_read_streaming(tmp_path, chunk_size):
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'][1]['inputs']['count'] = 12345
+    path = _write_red_file(tmp_path, red_data)
+
+    streamed_red_data = load_and_read_streaming(path, 'RED_FILE', chunk_size=chunk_size)
+
+    assert isinstance(streamed_red_data['batches'], StreamedBatches)
+    assert streamed_red_data['container'] == red_data['container']
+    assert streamed_red_data['cli'] == red_data['cli']
+    assert list(streamed_red_data['batches']) == red_data['batches']
+    # batches can be iterated multiple times
+    assert list(streamed_red_data['batches']) == red_data['batches']
+
+
+def test_streamed_batches_validation_and_conversion(tmp_path):
+    path = _write_red_file(tmp_path, RED_DATA)
+
+    streamed_red_data = load_and_read_streaming(path, 'RED_FILE', chunk_size=16)
+    red_validation(streamed_red_data, ignore_outputs=False)
+
+    blue_batches = convert_red_to_blue(streamed_red_data, deterministic_dirnames=True)
+    assert blue_batches == convert_red_to_blue(deepcopy(RED_DATA), deterministic_dirnames=True)
+
+
+def test_load_and_read_streaming_yaml(tmp_path):
+    path = tmp_path / 'red.yml'
+    path.write_text('redVersion: "8"\nbatches:\n  - inputs: {}\n')
+
+    red_data = load_and_read_streaming(str(path), 'RED_FILE')
+
+    assert red_data == {'redVersion': '8', 'batches': [{'inputs': {}}]}
+
+
+def test_load_and_read_streaming_invalid_json(tmp_path):
+    path = tmp_path / 'red.json'
+    path.write_text('{"redVersion": "8", "batches": [{"inputs": {}}, }')
+
+    with pytest.raises(AgentError):
+        load_and_read_streaming(str(path), 'RED_FILE', chunk_size=8)
+
+
+@pytest.mark.parametrize('text', [
+    # yaml flow style
+    '{redVersion: "8", batches: [{inputs: {a: 1}}]}',
+    # constants, that are not valid json
+    '{"redVersion": "8", "batches": [{"inputs": {"a": NaN, "b": -Infinity}}]}',
+    '{"redVersion": Infinity, "batches": []}',
+])
+def test_load_and_read_streaming_reads_like_load_and_read(tmp_path, text):
+    path = tmp_path / 'red.json'
+    path.write_text(text)
+
+    streamed_red_data = load_and_read_streaming(str(path), 'RED_FILE', chunk_size=8)
+    streamed_red_data['batches'] = list(streamed_red_data['batches'])
+
+    assert streamed_red_data == load_and_read(str(path), 'RED_FILE')
+    assert streamed_red_data['redVersion'] in ('8', 'Infinity')
+
+
+@pytest.mark.parametrize('text', [
+    '{"redVersion": "8", "redVersion": "9", "batches": []}',
+    '{"redVersion": "8", "batches": [{"inputs": {"a": 1, "a": 2}}]}',
+])
+def test_load_and_read_streaming_rejects_duplicated_keys(tmp_path, text):
+    path = tmp_path / 'red.json'
+    path.write_text(text)
+
+    # duplicated keys are rejected by the yaml parser in both cases
+    with pytest.raises(Exception) as load_and_read_error:
+        load_and_read(str(path), 'RED_FILE')
+    with pytest.raises(Exception) as streaming_error:
+        load_and_read_streaming(str(path), 'RED_FILE', chunk_size=8)
+
+    assert type(streaming_error.value) is type(load_and_read_error.value)
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_json_stream_reader_values_split_across_chunks():
+    value = {'a': [1.5e-3, -2, True, False, None, 'x\u00e9y\n', -0.25E+2], 'b': {'c': '\u00e9' * 20}}
+    text = json.dumps(value, ensure_ascii=True)
+
+    reader = _JsonStreamReader(io.StringIO(text), 1)
+
+    assert reader.decode_value() == value
+
+
+def test_json_stream_reader_does_not_read_until_eof_on_syntax_error():
+    f = CountingReader('[{"inputs": {}} {"inputs": {}}, ' + '{"inputs": {}}, ' * 1000 + ']')
+    reader = _JsonStreamReader(f, 64)
+
+    with pytest.raises(ValueError):
+        reader.decode_value()
+
+    assert f.reads <= 2
+
+
+def test_empty_streamed_batches_are_converted_like_empty_batches(tmp_path):
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = []
+    path = _write_red_file(tmp_path, red_data)
+
+    streamed_red_data = load_and_read_streaming(path, 'RED_FILE')
+
+    assert convert_red_to_blue(streamed_red_data) == []
+    assert convert_red_to_blue(red_data) == []
+
+
+def test_read_json_and_yaml():
+    assert read('{"a": [1, 2.5, null], "b": {"c": "d"}}', 'DATA') == {'a': [1, 2.5, None], 'b': {'c': 'd'}}
+    assert read('a:\n  - 1\nb: text\n', 'DATA') == {'a': [1], 'b': 'text'}
+    # json flow style, that is not valid json, is parsed by the yaml parser
+    assert read('{a: 1}', 'DATA') == {'a': 1}
+    # constants, that are not valid json, are parsed by the yaml parser as strings
+    assert read('{"a": NaN, "b": Infinity, "c": -Infinity}', 'DATA') == {'a': 'NaN', 'b': 'Infinity', 'c': '-Infinity'}
+
+    with pytest.raises(AgentError):
+        read('[1, 2]', 'DATA')
+
+
+def test_load_and_read_cache(tmp_path):
+    clear_document_cache()
+    path = tmp_path / 'data.json'
+    path.write_text(json.dumps({'value': [1]}))
+
+    data = load_and_read(str(path), 'DATA', use_cache=True)
+    data['value'].append(2)
+    # the cached document is not altered by the caller
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1]}
+
+    # a changed file is read again
+    path.write_text(json.dumps({'value': [1, 2, 3]}))
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1, 2, 3]}
+
+    with pytest.raises(AgentError):
+        load_and_read(str(tmp_path / 'missing.json'), 'DATA', use_cache=True)
+
+
+@pytest.mark.parametrize('name, text', [('data.json', '{"value": [1]}'), ('data.yml', 'value:\n  - 1\n')])
+def test_load_and_read_cache_hit_does_not_read_file(tmp_path, monkeypatch, name, text):
+    clear_document_cache()
+    path = tmp_path / name
+    path.write_text(text)
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1]}
+
+    def load(location, var_name):
+        raise AssertionError('cached file is loaded again')
+
+    monkeypatch.setattr(files, 'load', load)
+    data = load_and_read(str(path), 'DATA', use_cache=True)
+    data['value'].append(2)
+
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1]}
+
+
+def test_load_and_read_cache_does_not_copy_json(tmp_path, monkeypatch):
+    clear_document_cache()
+    path = tmp_path / 'data.json'
+    path.write_text('{"value": [1]}')
+
+    def deepcopy(data):
+        raise AssertionError('json document is copied')
+
+    monkeypatch.setattr(files, 'deepcopy', deepcopy)
+
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1]}
+    assert load_and_read(str(path), 'DATA', use_cache=True) == {'value': [1]}
@@ -0,0 +1,28 @@
+import pytest
+
+from cc_core.commons.fingerprint import canonical_fingerprint, has_only_string_keys
+from cc_core.commons.red_to_blue import batch_fingerprint
+from cc_core.commons.validation_cache import validation_fingerprint
+
+
+def test_canonical_fingerprint_ignores_key_order():
+    assert canonical_fingerprint({'a': 1, 'b': [{'c': None, 'd': 'e'}]}) == \
+        canonical_fingerprint({'b': [{'d': 'e', 'c': None}], 'a': 1})
+    assert canonical_fingerprint({'a': 1}) != canonical_fingerprint({'a': '1'})
+
+
+@pytest.mark.parametrize('data', [{1: 'a'}, {'a': [{2: 'b'}]}, {'a': object()}])
+def test_canonical_fingerprint_rejects_non_canonical_data(data):
+    with pytest.raises(ValueError):
+        canonical_fingerprint(data)
+
+
+def test_has_only_string_keys():
+    assert has_only_string_keys({'a': [{'b': 1}], 'c': 'd'})
+    assert not has_only_string_keys({'a': [{None: 1}]})
+
+
+def test_fingerprints_share_the_canonical_fingerprint():
+    batch = {'inputs': {'a': 1}, 'outputs': {}}
+    assert batch_fingerprint(batch) == canonical_fingerprint(batch)
+    assert validation_fingerprint(batch) == canonical_fingerprint(batch)
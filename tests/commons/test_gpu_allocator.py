@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from cc_core.commons.gpu_allocator import GPUAllocator
+from cc_core.commons.gpu_info import GPUDevice, GPURequirement, InsufficientGPUError
+
+from tests.commons.helpers import FakeClock
+
+
+def _devices():
+    return [GPUDevice(0, 16000, 'nvidia'), GPUDevice(1, 8000, 'nvidia')]
+
+
+def _wait_for(condition):
+    for _ in range(500):
+        if condition():
+            return
+        time.sleep(0.01)
+    raise AssertionError('condition not reached')
+
+
+def test_acquire_and_release():
+    allocator = GPUAllocator(_devices())
+
+    with allocator.acquire([GPURequirement(min_vram=4000)]) as allocation:
+        assert allocation.device_ids() == [1]
+        assert [d.device_id for d in allocator.free_devices()] == [0]
+
+    assert len(allocator.free_devices()) == 2
+    with pytest.raises(ValueError):
+        allocation.release()
+
+
+def test_impossible_requirements_fail_immediately():
+    allocator = GPUAllocator(_devices())
+    with pytest.raises(InsufficientGPUError):
+        allocator.acquire([GPURequirement(min_vram=32000)])
+
+
+def test_acquire_timeout():
+    allocator = GPUAllocator(_devices())
+    allocation = allocator.acquire([GPURequirement(), GPURequirement()])
+
+    with pytest.raises(InsufficientGPUError):
+        allocator.acquire([GPURequirement()], timeout=0)
+    with pytest.raises(InsufficientGPUError):
+        allocator.acquire([GPURequirement()], timeout=0.05)
+
+    allocation.release()
+    assert allocator.acquire([GPURequirement()], timeout=0).device_ids() == [1]
+    assert allocator.waiting() == 0
+
+
+def test_waiting_calls_are_served_in_order():
+    allocator = GPUAllocator(_devices())
+    first = allocator.acquire([GPURequirement()])
+    results = []
+
+    def acquire_both():
+        results.append(allocator.acquire([GPURequirement(), GPURequirement()], timeout=5))
+
+    thread = threading.Thread(target=acquire_both)
+    thread.start()
+    _wait_for(lambda: allocator.waiting() == 1)
+
+    # a device is free, but the earlier call for two devices is served first
+    with pytest.raises(InsufficientGPUError):
+        allocator.acquire([GPURequirement()], timeout=0.05)
+
+    first.release()
+    thread.join(5)
+    assert sorted(results[0].device_ids()) == [0, 1]
+
+
+def test_usage_metrics():
+    clock = FakeClock()
+    allocator = GPUAllocator(_devices(), clock=clock)
+
+    allocation = allocator.acquire([GPURequirement(min_vram=12000)])
+    clock.time = 3
+    allocation.release()
+    clock.time = 5
+    allocation = allocator.acquire([GPURequirement(min_vram=12000)])
+    clock.time = 6
+
+    usage = allocator.usage()
+    assert [(u['device'].device_id, u['busy'], u['busyTime'], u['allocations']) for u in usage] == [
+        (0, True, 4, 2), (1, False, 0, 0)
+    ]
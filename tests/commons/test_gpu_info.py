@@ -0,0 +1,63 @@
+import itertools
+import random
+
+import pytest
+
+from cc_core.commons.gpu_info import GPUDevice, GPURequirement, InsufficientGPUError, match_gpus
+
+
+def _brute_force_min_vram(devices, requirements):
+    """
+    Returns the minimal sum of vram of all valid assignments or None, if no assignment exists.
+    """
+    best = None
+    for permutation in itertools.permutations(devices, len(requirements)):
+        if all(r.is_sufficient(d) for r, d in zip(requirements, permutation)):
+            vram = sum(d.vram for d in permutation)
+            if best is None or vram < best:
+                best = vram
+    return best
+
+
+def test_small_requirement_does_not_take_large_device():
+    devices = [GPUDevice(0, 16000, 'nvidia'), GPUDevice(1, 8000, 'nvidia')]
+    requirements = [GPURequirement(min_vram=4000), GPURequirement(min_vram=12000)]
+
+    assert [d.device_id for d in match_gpus(devices, requirements)] == [1, 0]
+
+
+def test_insufficient_devices():
+    devices = [GPUDevice(0, 8000, 'nvidia'), GPUDevice(1, 8000, 'amd')]
+    with pytest.raises(InsufficientGPUError):
+        match_gpus(devices, [GPURequirement(vendor='nvidia'), GPURequirement(min_vram=4000, vendor='nvidia')])
+    with pytest.raises(InsufficientGPUError):
+        match_gpus(devices, [GPURequirement()] * 3)
+    with pytest.raises(InsufficientGPUError):
+        match_gpus([], [GPURequirement()])
+    assert match_gpus([], []) == []
+
+
+def test_match_gpus_is_optimal():
+    rng = random.Random(7)
+    vendors = [None, 'nvidia', 'amd']
+
+    for _ in range(1000):
+        devices = [
+            GPUDevice(j, rng.choice([2000, 4000, 8000, 12000, 16000]), rng.choice(vendors[1:]))
+            for j in range(rng.randint(1, 6))
+        ]
+        requirements = [
+            GPURequirement(min_vram=rng.choice([None, 1000, 4000, 8000, 12000]), vendor=rng.choice(vendors))
+            for _ in range(rng.randint(1, 4))
+        ]
+
+        best = _brute_force_min_vram(devices, requirements)
+        if best is None:
+            with pytest.raises(InsufficientGPUError):
+                match_gpus(devices, requirements)
+            continue
+
+        matched = match_gpus(devices, requirements)
+        assert len(set(id(d) for d in matched)) == len(requirements)
+        assert all(r.is_sufficient(d) for r, d in zip(requirements, matched))
+        assert sum(d.vram for d in matched) == best, (devices, requirements)
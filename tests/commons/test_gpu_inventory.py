@@ -0,0 +1,152 @@
+import threading
+
+import pytest
+from docker.errors import DockerException, ImageNotFound
+
+from cc_core.commons.docker_utils import GPUInventoryCache, detect_nvidia_docker_gpus, GPU_QUERY_IMAGE
+from cc_core.commons.gpu_info import GPUDevice
+
+from tests.commons.helpers import FakeClock
+
+
+class StubContainer:
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def start(self):
+        pass
+
+    def wait(self):
+        pass
+
+    def logs(self, stdout=True, stderr=False, stream=False):
+        return self.stdout
+
+    def remove(self):
+        pass
+
+
+class StubImages:
+    def __init__(self, present):
+        self.present = present
+        self.pulled = []
+
+    def get(self, name):
+        if not self.present:
+            raise ImageNotFound(name)
+
+    def pull(self, name):
+        self.pulled.append(name)
+        self.present = True
+
+
+class StubContainers:
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.created = 0
+
+    def create(self, image, command, **kwargs):
+        self.created += 1
+        return StubContainer(self.stdout)
+
+
+class StubClient:
+    def __init__(self, image_present=False):
+        self.images = StubImages(image_present)
+        self.containers = StubContainers(b'0, 8000\n1, 16000\n')
+
+
+class CountingQuery:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, client, runtimes):
+        self.calls += 1
+        return [GPUDevice(self.calls, 8000, 'nvidia')]
+
+
+def test_detect_gpus_pulls_missing_image_only():
+    client = StubClient(image_present=False)
+    gpus = detect_nvidia_docker_gpus(client, ['nvidia'])
+    assert [(gpu.device_id, gpu.vram) for gpu in gpus] == [(0, 8000), (1, 16000)]
+    assert client.images.pulled == [GPU_QUERY_IMAGE]
+
+    detect_nvidia_docker_gpus(client, ['nvidia'])
+    assert client.images.pulled == [GPU_QUERY_IMAGE]
+
+
+def test_inventory_is_cached_per_client_until_ttl():
+    clock = FakeClock()
+    query = CountingQuery()
+    cache = GPUInventoryCache(ttl=60, clock=clock, query=query)
+    client, other_client = StubClient(), StubClient()
+
+    first = cache.get_gpus(client, [])
+    assert cache.get_gpus(client, [])[0] is first[0]
+    assert query.calls == 1
+
+    cache.get_gpus(other_client, [])
+    assert query.calls == 2
+
+    clock.time = 60
+    assert cache.get_gpus(client, [])[0].device_id == 3
+
+
+def test_invalidate():
+    query = CountingQuery()
+    cache = GPUInventoryCache(query=query)
+    client = StubClient()
+
+    cache.get_gpus(client, [])
+    cache.invalidate(client)
+    cache.get_gpus(client, [])
+    cache.invalidate()
+    cache.get_gpus(client, [])
+    assert query.calls == 3
+
+
+def test_failed_query_is_not_cached():
+    calls = []
+
+    def failing_query(client, runtimes):
+        calls.append(client)
+        raise DockerException('no nvidia runtime')
+
+    cache = GPUInventoryCache(query=failing_query)
+    client = StubClient()
+    for _ in range(2):
+        with pytest.raises(DockerException):
+            cache.get_gpus(client, [])
+    assert len(calls) == 2
+
+
+def test_concurrent_callers_share_one_query():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_query(client, runtimes):
+        calls.append(client)
+        started.set()
+        release.wait(5)
+        return [GPUDevice(0, 8000, 'nvidia')]
+
+    cache = GPUInventoryCache(query=slow_query)
+    client = StubClient()
+    results = []
+
+    def get_gpus():
+        results.append(cache.get_gpus(client, []))
+
+    threads = [threading.Thread(target=get_gpus) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result[0].device_id == 0 for result in results)
@@ -0,0 +1,88 @@
+import pytest
+
+from cc_core.commons.gpu_info import GPUDevice, GPURequirement
+from cc_core.commons.gpu_placement import place_batches
+
+
+def _nodes():
+    return {
+        'small': [GPUDevice(0, 8000, 'nvidia'), GPUDevice(1, 8000, 'nvidia')],
+        'large': [GPUDevice(0, 32000, 'nvidia'), GPUDevice(1, 32000, 'nvidia')]
+    }
+
+
+def _placed_nodes(placements):
+    return [(placement.batch_index, placement.node) for placement in placements]
+
+
+def test_best_fit_keeps_large_devices_free():
+    batches = [[GPURequirement(min_vram=4000)], [GPURequirement(min_vram=16000), GPURequirement(min_vram=16000)]]
+    placements, unplaced = place_batches(_nodes(), batches, strategy='best-fit')
+
+    assert _placed_nodes(placements) == [(0, 'small'), (1, 'large')]
+    assert unplaced == []
+
+
+def test_spread_and_consolidate():
+    batches = [[GPURequirement()], [GPURequirement()]]
+
+    placements, _ = place_batches(_nodes(), batches, strategy='spread')
+    assert _placed_nodes(placements) == [(0, 'large'), (1, 'small')]
+
+    nodes = {node: [GPUDevice(i, 8000, 'nvidia') for i in range(2)] for node in ['a', 'b']}
+    placements, _ = place_batches(nodes, batches, strategy='spread')
+    assert _placed_nodes(placements) == [(0, 'a'), (1, 'b')]
+    placements, _ = place_batches(nodes, batches, strategy='consolidate')
+    assert _placed_nodes(placements) == [(0, 'a'), (1, 'a')]
+
+
+def test_consolidate_prefers_nodes_busy_from_earlier_placements():
+    nodes = {node: [GPUDevice(i, 8000, 'nvidia') for i in range(2)] for node in ['a', 'b']}
+    placements, _ = place_batches(nodes, [[GPURequirement()]], strategy='consolidate', allocated_counts={'b': 2})
+
+    assert _placed_nodes(placements) == [(0, 'b')]
+
+
+def test_greedy_placement_is_not_maximal():
+    # the single-gpu batch is spread onto the node with two devices, so the two-gpu batch does not fit anymore
+    nodes = {'a': [GPUDevice(0, 8000, 'nvidia'), GPUDevice(1, 8000, 'nvidia')], 'b': [GPUDevice(0, 8000, 'nvidia')]}
+    batches = [[GPURequirement()], [GPURequirement()] * 2]
+
+    placements, unplaced = place_batches(nodes, batches, strategy='spread', smallest_first=True)
+    assert _placed_nodes(placements) == [(0, 'a')]
+    assert unplaced == [1]
+
+    placements, unplaced = place_batches(nodes, batches, strategy='best-fit')
+    assert _placed_nodes(placements) == [(0, 'b'), (1, 'a')]
+    assert unplaced == []
+
+
+def test_unplaced_batches_are_skipped():
+    batches = [
+        [GPURequirement()] * 3,
+        [GPURequirement(min_vram=64000)],
+        [GPURequirement(min_vram=16000)],
+        [GPURequirement()]
+    ]
+    placements, unplaced = place_batches(_nodes(), batches)
+
+    assert _placed_nodes(placements) == [(2, 'large'), (3, 'small')]
+    assert placements[0].device_ids() == [0]
+    assert unplaced == [0, 1]
+
+
+def test_smallest_first_and_custom_strategy():
+    batches = [[GPURequirement()] * 2, [GPURequirement()], [GPURequirement()]]
+    nodes = {'a': [GPUDevice(i, 8000, 'nvidia') for i in range(2)]}
+
+    placements, unplaced = place_batches(nodes, batches)
+    assert unplaced == [1, 2]
+    placements, unplaced = place_batches(nodes, batches, smallest_first=True)
+    assert [p.batch_index for p in placements] == [1, 2]
+    assert unplaced == [0]
+
+    placements, _ = place_batches(_nodes(), [[GPURequirement()]], strategy=lambda candidates: candidates[-1])
+    assert placements[0].node == 'large'
+
+    with pytest.raises(ValueError):
+        place_batches(_nodes(), [], strategy='unknown')
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# dependencies, that must not be imported by importing the cc_core.commons entry points
+HEAVY_MODULES = ['jsonschema', 'ruamel.yaml', 'docker', 'requests']
+
+# generous limit of the cumulative import time of an entry point in microseconds. Importing docker alone took more than
+# 250 ms, while the entry points take about 40 ms without bytecode cache.
+IMPORT_TIME_LIMIT = 250000
+
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ENTRY_POINTS = [
+    'cc_core.commons.red',
+    'cc_core.commons.engines',
+    'cc_core.commons.files',
+    'cc_core.commons.docker_utils',
+    'cc_core.commons.templates',
+    'cc_core.commons.validation_cache',
+]
+
+
+def _import_times(module):
+    """
+    Imports the given module in a new interpreter with -X importtime.
+
+    :return: A dictionary mapping the names of all imported modules to their cumulative import time in microseconds
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True, cwd=REPOSITORY_DIR
+    )
+
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize('module', ENTRY_POINTS)
+def test_entry_point_does_not_import_heavy_dependencies(module):
+    import_times = _import_times(module)
+
+    imported_heavy_modules = [m for m in HEAVY_MODULES if m in import_times]
+    assert imported_heavy_modules == [], 'importing {} imports {}'.format(module, imported_heavy_modules)
+    assert import_times[module] < IMPORT_TIME_LIMIT
+
+
+def test_validating_valid_red_data_does_not_import_jsonschema():
+    code = '\n'.join([
+        'import json, sys',
+        'from cc_core.commons.red import red_validation',
+        'from tests.commons.helpers import RED_DATA',
+        'red_validation(json.loads(json.dumps(RED_DATA)), ignore_outputs=False)',
+        'assert "jsonschema" not in sys.modules',
+    ])
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=REPOSITORY_DIR)
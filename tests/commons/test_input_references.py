@@ -1,7 +1,8 @@
 import pytest
 
 from cc_core.commons.exceptions import InvalidInputReference
-from cc_core.commons.input_references import resolve_input_references
+from cc_core.commons.input_references import resolve_input_references, compile_input_reference, \
+    compile_input_references
 
 INPUT_LIST_TO_REFERENCE = {
     'a_file': [
@@ -138,3 +139,29 @@ def test_int_value():
     result = resolve_input_references(glob, INPUT_TO_REFERENCE)
 
     assert result == '1000'
+
+
+def test_compile_input_reference():
+    assert compile_input_reference('$(inputs.a_file["basename"])') == ('a_file', 'basename')
+    assert compile_input_reference('$(inputs.a_file[0].basename)') == ('a_file', 0, 'basename')
+
+    with pytest.raises(InvalidInputReference):
+        compile_input_reference('$(invalid.a_file)')
+
+
+def test_compiled_input_references_resolve_many():
+    compiled = compile_input_references('$(inputs.a_file.nameroot).out')
+    inputs_list = [{'a_file': {'nameroot': 'file_{}'.format(i)}} for i in range(3)]
+
+    assert compiled.resolve_many(inputs_list) == ['file_0.out', 'file_1.out', 'file_2.out']
+    assert compile_input_references('$(inputs.a_file.nameroot).out') is compiled
+
+
+def test_compiled_input_references_error_order():
+    # the first reference can not be resolved, before the malformed second reference is reached
+    glob = '$(inputs.invalid)-$(invalid.a_file)'
+
+    with pytest.raises(InvalidInputReference) as e:
+        resolve_input_references(glob, INPUT_TO_REFERENCE)
+
+    assert 'Could not resolve input reference "$(inputs.invalid)"' in str(e.value)
@@ -0,0 +1,57 @@
+import random
+import sys
+
+import pytest
+
+from cc_core.commons.exceptions import ParsingError
+from cc_core.commons.parsing import partition_all, split_into_parts
+
+
+def _reference_partition_all(s, sep):
+    """
+    Splits s by repeated calls of str.partition(), which defines the expected semantics of partition_all().
+    """
+    parts = []
+    while True:
+        head, found_sep, s = s.partition(sep)
+        parts.extend([head, found_sep])
+        if not found_sep:
+            break
+    return [p for p in parts if p]
+
+
+def test_partition_all_matches_str_partition():
+    rng = random.Random(1)
+    for _ in range(2000):
+        s = ''.join(rng.choice('ab$()') for _ in range(rng.randrange(12)))
+        sep = rng.choice(['a', 'aa', '$(', ')', 'ab'])
+        assert partition_all(s, sep) == _reference_partition_all(s, sep)
+
+
+def test_partition_all():
+    assert partition_all('a$(b)c', ['$(', ')']) == ['a', '$(', 'b', ')', 'c']
+    assert partition_all('aaa', 'aa') == ['aa', 'a']
+    assert partition_all('', ')') == []
+
+    with pytest.raises(ValueError):
+        partition_all('abc', '')
+
+
+def test_split_into_parts():
+    assert split_into_parts('a(b)cde()(fg)', '(', ')') == ['a', '(b)', 'cde', '()', '(fg)']
+    assert split_into_parts('{{a}} and {{b}}', '{{', '}}', remove_separators=True) == ['a', ' and ', 'b']
+
+    with pytest.raises(ParsingError):
+        split_into_parts('a((b))', '(', ')')
+    with pytest.raises(ParsingError):
+        split_into_parts('a(b', '(', ')')
+
+
+def test_split_into_parts_many_references():
+    number_of_references = max(10000, sys.getrecursionlimit() * 10)
+    s = '$(inputs.a)-' * number_of_references
+
+    parts = split_into_parts(s, '$(', ')')
+
+    assert len(parts) == 2 * number_of_references
+    assert parts[:2] == ['$(inputs.a)', '-']
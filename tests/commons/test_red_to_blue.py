@@ -0,0 +1,148 @@
+import json
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons.exceptions import InvalidInputReference
+from cc_core.commons.red_to_blue import convert_red_to_blue, batch_fingerprint, pack_blue_batches
+
+from tests.commons.helpers import RED_DATA
+
+
+def test_random_dirnames_differ():
+    blue_batches_1 = convert_red_to_blue(deepcopy(RED_DATA))
+    blue_batches_2 = convert_red_to_blue(deepcopy(RED_DATA))
+
+    assert blue_batches_1[0]['inputs']['a_file']['dirname'] != blue_batches_2[0]['inputs']['a_file']['dirname']
+
+
+def test_deterministic_dirnames_are_reproducible():
+    blue_batches_1 = convert_red_to_blue(deepcopy(RED_DATA), deterministic_dirnames=True)
+    blue_batches_2 = convert_red_to_blue(deepcopy(RED_DATA), deterministic_dirnames=True)
+
+    assert blue_batches_1 == blue_batches_2
+
+
+def test_deterministic_dirnames_depend_on_content():
+    blue_batches = convert_red_to_blue(deepcopy(RED_DATA), deterministic_dirnames=True)
+
+    first_file = blue_batches[0]['inputs']['a_file']
+    second_file = blue_batches[1]['inputs']['a_file']
+    assert first_file['dirname'] != second_file['dirname']
+    assert first_file['dirname'].startswith('/cc/inputs/')
+
+    first_dir, second_dir = blue_batches[0]['inputs']['some_dirs']
+    assert first_dir['path'] != second_dir['path']
+
+
+def test_deterministic_dirnames_keep_given_dirname():
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'][0]['inputs']['a_file']['dirname'] = '/tmp/given'
+
+    blue_batches = convert_red_to_blue(red_data, deterministic_dirnames=True)
+
+    assert blue_batches[0]['inputs']['a_file']['path'] == '/tmp/given/a_file'
+    assert blue_batches[0]['command'][1] == '/tmp/given/a_file'
+
+
+def test_collapse_duplicate_batches():
+    red_data = deepcopy(RED_DATA)
+    first_batch, second_batch = red_data['batches']
+    red_data['batches'] = [first_batch, second_batch, deepcopy(first_batch), deepcopy(second_batch), first_batch]
+    # null values are removed before duplicates are detected
+    red_data['batches'][3]['inputs']['count'] = None
+
+    blue_batches, batch_indices = convert_red_to_blue(red_data, collapse_duplicates=True)
+
+    assert len(blue_batches) == 2
+    assert batch_indices == [0, 1, 0, 1, 0]
+    assert blue_batches[0]['inputs']['a_file']['connector']['access']['url'] == 'https://example.com/in_1.txt'
+    assert blue_batches[1]['inputs']['a_file']['connector']['access']['url'] == 'https://example.com/in_2.txt'
+
+
+def test_batch_fingerprint_ignores_key_order():
+    batch = {'inputs': {'a': 1, 'b': 'x'}, 'outputs': {}}
+    reordered_batch = {'outputs': {}, 'inputs': {'b': 'x', 'a': 1}}
+
+    assert batch_fingerprint(batch) == batch_fingerprint(reordered_batch)
+    assert batch_fingerprint(batch) != batch_fingerprint({'inputs': {'a': 2, 'b': 'x'}, 'outputs': {}})
+
+
+def test_pack_blue_batches():
+    blue_batches = [{'index': i, 'runtime': runtime} for i, runtime in enumerate([5, 5, 20, 1, 1, 1])]
+
+    packs = pack_blue_batches(blue_batches, max_runtime=10, estimate_runtime=lambda b: b['runtime'])
+    assert [[b['index'] for b in pack] for pack in packs] == [[0, 1], [2], [3, 4, 5]]
+
+    packs = pack_blue_batches(blue_batches, max_batches=4)
+    assert [len(pack) for pack in packs] == [4, 2]
+
+    equal_sized_batches = [{'index': i} for i in range(6)]
+    batch_size = len(json.dumps(equal_sized_batches[0])) + 1
+    packs = pack_blue_batches(equal_sized_batches, max_size=2 * batch_size)
+    assert [len(pack) for pack in packs] == [2, 2, 2]
+
+
+def test_parallel_conversion():
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = red_data['batches'] * 5
+
+    serial_blue_batches = convert_red_to_blue(deepcopy(red_data), deterministic_dirnames=True)
+    parallel_blue_batches = convert_red_to_blue(red_data, deterministic_dirnames=True, processes=2, chunk_size=3)
+
+    assert parallel_blue_batches == serial_blue_batches
+
+
+def test_parallel_conversion_error_contains_batch_index():
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = [deepcopy(red_data['batches'][1]) for _ in range(4)]
+    del red_data['batches'][2]['inputs']['a_file']
+
+    with pytest.raises(InvalidInputReference) as e:
+        convert_red_to_blue(red_data, processes=2, chunk_size=1)
+
+    assert 'batch 2' in str(e.value)
+
+
+def test_serial_conversion_error_contains_batch_index():
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = [deepcopy(red_data['batches'][1]) for _ in range(4)]
+    del red_data['batches'][2]['inputs']['a_file']
+
+    with pytest.raises(InvalidInputReference) as e:
+        convert_red_to_blue(red_data)
+
+    assert 'batch 2' in str(e.value)
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_collapsed_conversion_error_contains_original_batch_index(processes):
+    red_data = deepcopy(RED_DATA)
+    red_data['batches'] = [deepcopy(red_data['batches'][1]) for _ in range(4)]
+    del red_data['batches'][3]['inputs']['a_file']
+
+    with pytest.raises(InvalidInputReference) as e:
+        convert_red_to_blue(red_data, collapse_duplicates=True, processes=processes, chunk_size=1)
+
+    assert 'batch 3' in str(e.value)
+
+
+def test_conversion_error_keeps_original_exception_as_cause():
+    red_data = deepcopy(RED_DATA)
+    del red_data['batches'][1]['inputs']['a_file']
+
+    with pytest.raises(InvalidInputReference) as e:
+        convert_red_to_blue(red_data)
+
+    assert isinstance(e.value.__cause__, InvalidInputReference)
+    assert 'batch 1' not in str(e.value.__cause__)
+
+
+def test_unexpected_conversion_errors_are_raised_unchanged():
+    red_data = deepcopy(RED_DATA)
+    del red_data['batches'][1]['inputs']
+
+    with pytest.raises(KeyError) as e:
+        convert_red_to_blue(red_data)
+
+    assert e.value.args == ('inputs',)
@@ -0,0 +1,120 @@
+import random
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons import red
+from cc_core.commons.exceptions import RedSpecificationError, RedValidationError
+from cc_core.commons.red import red_validation, BatchShape
+
+from tests.commons.helpers import RED_DATA, REPLACEMENT_VALUES, json_paths
+
+
+def _red_data_with_batches(number_of_batches):
+    red_data = deepcopy(RED_DATA)
+    first_batch, second_batch = red_data['batches']
+    red_data['batches'] = [deepcopy(first_batch if i % 2 == 0 else second_batch) for i in range(number_of_batches)]
+    return red_data
+
+
+def _mutate_batches(red_data, rng):
+    red_data = deepcopy(red_data)
+    batches = red_data['batches']
+    path = rng.choice(list(json_paths(batches))[1:])
+    parent = batches
+    for key in path[:-1]:
+        parent = parent[key]
+
+    mutation = rng.randrange(5)
+    if mutation == 4:
+        # renames a key in the cli description and in all batches, cli keys are not restricted by the red schema
+        section = rng.choice(['inputs', 'outputs'])
+        old_key = rng.choice(list(red_data['cli'][section]))
+        new_key = rng.choice(['a.b', 'with space', 'valid_key'])
+        red_data['cli'][section][new_key] = red_data['cli'][section].pop(old_key)
+        for batch in batches:
+            if old_key in batch.get(section, {}):
+                batch[section][new_key] = batch[section].pop(old_key)
+    elif mutation == 0:
+        parent[path[-1]] = deepcopy(rng.choice(REPLACEMENT_VALUES))
+    elif mutation == 1:
+        del parent[path[-1]]
+    elif mutation == 2:
+        target = parent[path[-1]]
+        if isinstance(target, dict):
+            key = rng.choice(['unknown', 'doc', 'listing', 'mount', 'size', 1])
+            target[key] = deepcopy(rng.choice(REPLACEMENT_VALUES))
+        elif isinstance(target, list):
+            target.append(deepcopy(rng.choice(REPLACEMENT_VALUES)))
+    else:
+        # mutations of the red data without batches
+        red_data[rng.choice(['redVersion', 'container', 'doc'])] = rng.choice(REPLACEMENT_VALUES)
+    return red_data
+
+
+def _validation_result(red_data, ignore_outputs):
+    try:
+        red_validation(red_data, ignore_outputs, container_requirement=True)
+    except Exception as e:
+        return type(e), str(e)
+    return None
+
+
+@pytest.mark.parametrize('ignore_outputs', [False, True])
+def test_batch_shape_validation_matches_full_validation(monkeypatch, ignore_outputs):
+    rng = random.Random(7)
+    red_data = _red_data_with_batches(4)
+    corpus = [red_data] + [_mutate_batches(red_data, rng) for _ in range(300)]
+
+    results = [_validation_result(deepcopy(r), ignore_outputs) for r in corpus]
+
+    monkeypatch.setattr(red, '_batch_shape_validation', lambda *args: False)
+    expected_results = [_validation_result(deepcopy(r), ignore_outputs) for r in corpus]
+
+    assert results == expected_results
+    assert None in results
+    assert len(set(results)) > 5
+
+
+def test_batch_shape():
+    batch_shape = BatchShape(RED_DATA['cli'])
+    first_batch, second_batch = deepcopy(RED_DATA['batches'])
+
+    assert batch_shape.matches(first_batch)
+    assert batch_shape.matches(second_batch)
+
+    # valid batches, that do not match the shape
+    first_batch['inputs']['some_dirs'][0]['listing'] = []
+    assert not batch_shape.matches(first_batch)
+    second_batch['inputs']['a_file']['size'] = 12.0
+    assert not batch_shape.matches(second_batch)
+
+
+def test_cli_job_pairs_stop_at_first_error():
+    first_batch = deepcopy(RED_DATA['batches'][0])
+    first_batch['inputs']['count'] = 'three'
+
+    def batches():
+        yield first_batch
+        raise AssertionError('batches after the first invalid batch are not read')
+
+    with pytest.raises(RedSpecificationError) as e:
+        red._check_cli_job_pairs({'cli': RED_DATA['cli'], 'batches': batches()}, ignore_outputs=False)
+
+    assert 'input key "count"' in str(e.value)
+
+
+def test_parallel_validation():
+    red_data = _red_data_with_batches(20)
+    red_validation(red_data, False, processes=2, chunk_size=3)
+
+    red_data['batches'][13]['inputs']['count'] = 'three'
+    red_data['batches'][17]['inputs']['unknown'] = 1
+    with pytest.raises(RedSpecificationError) as e:
+        red_validation(red_data, False, processes=2, chunk_size=3)
+    assert 'input key "count"' in str(e.value)
+
+    red_data['batches'][4]['inputs']['a_file']['connector'] = 'invalid'
+    with pytest.raises(RedValidationError) as e:
+        red_validation(red_data, False, processes=2)
+    assert 'batches/4/inputs/a_file' in str(e.value)
@@ -0,0 +1,90 @@
+import random
+from copy import deepcopy
+
+import pytest
+from jsonschema import Draft7Validator
+
+from cc_core.commons.schema_map import schemas
+from cc_core.commons.schemas.compiler import compile_schema, SchemaCompilationError
+from cc_core.commons.schemas.red import red_batch_schema
+
+from tests.commons.helpers import RED_DATA, REPLACEMENT_VALUES, json_paths
+
+DOCKER_SETTINGS = {
+    'version': '1',
+    'image': {'url': 'example/image', 'auth': {'username': 'user', 'password': 'secret'}},
+    'gpus': {'vendor': 'nvidia', 'devices': [{'vramMin': 1024}, {}]},
+    'ram': 2048
+}
+
+
+def _mutate(data, rng):
+    """
+    Applies a random mutation to a copy of data: a value is replaced, a key is removed or an unknown key is added.
+    """
+    data = deepcopy(data)
+    path = rng.choice(list(json_paths(data))[1:])
+    parent = data
+    for key in path[:-1]:
+        parent = parent[key]
+
+    mutation = rng.randrange(3)
+    if mutation == 0:
+        parent[path[-1]] = deepcopy(rng.choice(REPLACEMENT_VALUES))
+    elif mutation == 1:
+        del parent[path[-1]]
+    else:
+        target = parent[path[-1]]
+        if isinstance(target, dict):
+            target[rng.choice(['unknown', 'doc', 'invalid key', 'class'])] = rng.choice(REPLACEMENT_VALUES)
+        elif isinstance(target, list):
+            target.append(deepcopy(rng.choice(REPLACEMENT_VALUES)))
+    return data
+
+
+def _corpus(data, size, seed):
+    rng = random.Random(seed)
+    corpus = [data]
+    for _ in range(size):
+        mutated = _mutate(data, rng)
+        if rng.random() < 0.3:
+            mutated = _mutate(mutated, rng)
+        corpus.append(mutated)
+    return corpus
+
+
+@pytest.mark.parametrize('schema, data', [
+    (schemas['red'], RED_DATA),
+    (red_batch_schema, RED_DATA['batches'][0]),
+    (schemas['red-engine-container-docker'], DOCKER_SETTINGS)
+])
+def test_compiled_schema_matches_jsonschema(schema, data):
+    compiled_validator = compile_schema(schema)
+    validator = Draft7Validator(schema)
+
+    corpus = _corpus(data, 400, seed=42)
+    results = [compiled_validator(instance) for instance in corpus]
+
+    assert results == [validator.is_valid(instance) for instance in corpus]
+    # the corpus contains valid and invalid instances
+    assert True in results and False in results
+
+
+def test_compiled_schema_type_semantics():
+    compiled_validator = compile_schema({'type': 'integer', 'minimum': 2})
+    assert compiled_validator(2)
+    assert compiled_validator(3.0)
+    assert not compiled_validator(1)
+    assert not compiled_validator(True)
+    assert not compiled_validator(2.5)
+
+    compiled_validator = compile_schema({'enum': [1, 'a']})
+    assert compiled_validator(1)
+    assert compiled_validator(1.0)
+    assert not compiled_validator(True)
+    assert not compiled_validator([1])
+
+
+def test_unsupported_keyword():
+    with pytest.raises(SchemaCompilationError):
+        compile_schema({'type': 'string', 'maxLength': 3})
@@ -0,0 +1,56 @@
+from copy import deepcopy
+
+import jsonschema
+import pytest
+from jsonschema.exceptions import ValidationError
+
+from cc_core.commons import schema_map
+
+from tests.commons.helpers import RED_DATA
+
+
+def _invalid_red_data():
+    missing_connector = deepcopy(RED_DATA)
+    del missing_connector['batches'][0]['inputs']['a_file']['connector']
+
+    wrong_class = deepcopy(RED_DATA)
+    wrong_class['batches'][1]['inputs']['a_file']['class'] = 'Folder'
+
+    additional_key = deepcopy(RED_DATA)
+    additional_key['unknown'] = True
+
+    wrong_type = deepcopy(RED_DATA)
+    wrong_type['cli']['inputs']['count']['inputBinding']['position'] = 'first'
+
+    return [missing_connector, wrong_class, additional_key, wrong_type]
+
+
+def test_validator_is_reused():
+    assert schema_map.get_validator('red') is schema_map.get_validator('red')
+    assert schema_map.get_validator('red-batch') is not schema_map.get_validator('red')
+
+    with pytest.raises(KeyError):
+        schema_map.get_validator('unknown-schema')
+
+
+@pytest.mark.parametrize('schema_name', list(schema_map.schemas) + list(schema_map._internal_schemas))
+def test_bundled_schemas_are_valid(schema_name):
+    # get_compiled_validator() does not check schemas, so every bundled schema is checked here
+    schema = schema_map._get_schema(schema_name)
+    jsonschema.validators.validator_for(schema).check_schema(schema)
+
+
+def test_validate_accepts_valid_red_data():
+    schema_map.validate(deepcopy(RED_DATA), 'red')
+
+
+@pytest.mark.parametrize('red_data', _invalid_red_data())
+def test_validate_reports_same_error_as_jsonschema(red_data):
+    with pytest.raises(ValidationError) as expected:
+        jsonschema.validate(red_data, schema_map.schemas['red'])
+
+    with pytest.raises(ValidationError) as actual:
+        schema_map.validate(red_data, 'red')
+
+    assert actual.value.message == expected.value.message
+    assert list(actual.value.absolute_path) == list(expected.value.absolute_path)
@@ -0,0 +1,175 @@
+import random
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons.exceptions import RedSpecificationError, TemplateError
+from cc_core.commons.red import check_keys_are_strings
+from cc_core.commons.templates import walk_red_data, get_secret_values, get_template_keys, normalize_keys, \
+    compile_template, TemplateKey
+
+KEYS = ['a', 'b', 'access', 'auth', 'password', '_user', '__x', 'url', 'doc', 1]
+STRINGS = ['text', '{{host}}', 'ssh://{{user}}@{{host}}', '{{}}', '{{a}', 'x}}', '{{{{a}}}}', '']
+
+
+def _random_data(rng, depth=0):
+    choice = rng.random()
+    if depth > 4 or choice < 0.4:
+        return rng.choice(STRINGS + [None, 1, 2.5, True])
+    if choice < 0.6:
+        return [_random_data(rng, depth + 1) for _ in range(rng.randrange(3))]
+    return {rng.choice(KEYS): _random_data(rng, depth + 1) for _ in range(rng.randrange(4))}
+
+
+def _separate_traversals(data):
+    """
+    Returns the results of check_keys_are_strings, get_secret_values, get_template_keys and normalize_keys.
+    """
+    try:
+        check_keys_are_strings(data)
+    except RedSpecificationError as e:
+        return str(e)
+
+    secret_values = get_secret_values(data)
+
+    template_keys = set()
+    try:
+        get_template_keys(data, template_keys)
+        template_result = sorted((k.key, k.protected) for k in template_keys)
+    except TemplateError as e:
+        template_result = str(e)
+
+    normalized = deepcopy(data)
+    normalize_keys(normalized)
+    return secret_values, template_result, normalized
+
+
+def _single_walk(data):
+    try:
+        walk = walk_red_data(data)
+    except RedSpecificationError as e:
+        return str(e)
+
+    try:
+        walk.check_template_keys()
+        template_result = sorted((k.key, k.protected) for k in walk.template_keys)
+    except TemplateError as e:
+        template_result = str(e)
+
+    walk.normalize_keys()
+    return walk.secret_values, template_result, data
+
+
+def test_walk_red_data_matches_separate_traversals():
+    rng = random.Random(3)
+    corpus = [{'root': _random_data(rng)} for _ in range(500)]
+
+    for data in corpus:
+        assert _single_walk(deepcopy(data)) == _separate_traversals(data)
+
+
+def test_walk_red_data():
+    data = {
+        'inputs': {
+            'a': {
+                'connector': {
+                    'access': {'url': 'ssh://{{user}}@host', 'auth': {'_username': 'u', 'password': '{{pw}}'}}
+                }
+            }
+        }
+    }
+
+    walk = walk_red_data(data)
+
+    assert walk.secret_values == ['u', '{{pw}}']
+    assert sorted((k.key, k.protected) for k in walk.template_keys) == [('pw', True), ('user', False)]
+    walk.check_template_keys()
+    walk.normalize_keys()
+    assert data['inputs']['a']['connector']['access']['auth'] == {'username': 'u', 'password': '{{pw}}'}
+
+
+def test_walk_red_data_non_string_key():
+    data = {'a': [{'b': {1: 'x'}}], 2: 'y'}
+
+    with pytest.raises(RedSpecificationError) as e:
+        walk_red_data(data)
+
+    assert str(e.value) == 'The key "1" (int) in REDFILE under "a.0.b" is not of type string'
+
+
+def test_walk_red_data_deep_nesting():
+    data = value = {}
+    for _ in range(5000):
+        value['a'] = {}
+        value = value['a']
+    value['password'] = 'secret'
+
+    assert walk_red_data(data).secret_values == ['secret']
+
+
+TEMPLATE_DATA = {
+    'inputs': {
+        'a_file': {
+            'class': 'File',
+            'connector': {
+                'command': 'red-connector-ssh',
+                'access': {
+                    'host': '{{host}}',
+                    'port': '{{port}}',
+                    'url': 'ssh://{{user}}@{{host}}/data',
+                    'auth': {'username': '{{user}}', 'password': '{{password}}'}
+                }
+            }
+        },
+        'values': [1, 2, 3]
+    }
+}
+
+
+def test_template_keys_collapse():
+    template_keys = set()
+    get_template_keys(TEMPLATE_DATA, template_keys)
+
+    assert template_keys == {
+        TemplateKey('host', False), TemplateKey('port', False), TemplateKey('user', False),
+        TemplateKey('password', True)
+    }
+
+
+def test_compiled_template_fill():
+    template = compile_template(TEMPLATE_DATA)
+    values = {'host': 'example.com', 'port': 22, 'user': 'alice', 'password': 'secret'}
+
+    filled = template.fill(values)
+
+    access = filled['inputs']['a_file']['connector']['access']
+    assert access == {
+        'host': 'example.com',
+        'port': 22,
+        'url': 'ssh://alice@example.com/data',
+        'auth': {'username': 'alice', 'password': 'secret'}
+    }
+    # the template is not changed and static values are copied
+    filled['inputs']['values'].append(4)
+    assert TEMPLATE_DATA['inputs']['values'] == [1, 2, 3]
+    assert TEMPLATE_DATA['inputs']['a_file']['connector']['access']['host'] == '{{host}}'
+
+
+def test_compiled_template_fill_many():
+    template = compile_template(TEMPLATE_DATA)
+    values_list = [{'host': 'h{}'.format(i), 'port': i, 'user': 'u', 'password': 'p'} for i in range(3)]
+
+    filled = template.fill_many(values_list)
+
+    assert [f['inputs']['a_file']['connector']['access']['url'] for f in filled] == [
+        'ssh://u@h0/data', 'ssh://u@h1/data', 'ssh://u@h2/data'
+    ]
+
+
+def test_compiled_template_errors():
+    template = compile_template(TEMPLATE_DATA)
+    with pytest.raises(TemplateError):
+        template.fill({'host': 'example.com'})
+
+    with pytest.raises(TemplateError):
+        compile_template({'doc': '{{not_allowed}}'})
@@ -0,0 +1,68 @@
+from copy import deepcopy
+
+import pytest
+
+from cc_core.commons.exceptions import RedValidationError, EngineError
+from cc_core.commons.validation_cache import ValidationCache, validation_fingerprint
+
+from tests.commons.helpers import RED_DATA
+
+
+def test_validation_fingerprint():
+    assert validation_fingerprint({'a': 1, 'b': [True]}) == validation_fingerprint({'b': [True], 'a': 1})
+    assert validation_fingerprint({'a': 1}) != validation_fingerprint({'a': True})
+    assert validation_fingerprint({'a': 1}) != validation_fingerprint({'a': 1.0})
+    assert validation_fingerprint({1: 'a'}) is None
+    assert validation_fingerprint({'a': object()}) is None
+
+
+def test_red_validation_cache():
+    cache = ValidationCache()
+
+    cache.red_validation(deepcopy(RED_DATA), False)
+    cache.red_validation(deepcopy(RED_DATA), False)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # different arguments are cached separately
+    cache.red_validation(deepcopy(RED_DATA), True)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    invalid_red_data = deepcopy(RED_DATA)
+    invalid_red_data['unknown'] = True
+    with pytest.raises(RedValidationError) as first_error:
+        cache.red_validation(invalid_red_data, False)
+    with pytest.raises(RedValidationError) as second_error:
+        cache.red_validation(deepcopy(invalid_red_data), False)
+
+    assert str(first_error.value) == str(second_error.value)
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_engine_validation_cache():
+    cache = ValidationCache()
+    red_data = deepcopy(RED_DATA)
+
+    cache.engine_validation(red_data, 'container', ['docker'])
+    red_data['cli']['baseCommand'] = 'other.py'
+    cache.engine_validation(red_data, 'container', ['docker'])
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    with pytest.raises(EngineError):
+        cache.engine_validation(red_data, 'execution', ['ccfaice'])
+    with pytest.raises(EngineError):
+        cache.engine_validation(red_data, 'execution', ['ccfaice'])
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_validation_cache_eviction():
+    cache = ValidationCache(max_size=2)
+    red_data = [deepcopy(RED_DATA) for _ in range(3)]
+    for i, r in enumerate(red_data):
+        r['doc'] = str(i)
+        cache.red_validation(r, False)
+
+    assert len(cache) == 2
+    cache.red_validation(red_data[0], False)
+    assert cache.hits == 0
+    cache.red_validation(red_data[2], False)
+    assert cache.hits == 1